@@ -0,0 +1,128 @@
+"""
+Controlador para el historial de análisis automáticos (alertas, análisis y recomendaciones)
+"""
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import List
+import json
+from app.core.database import get_db
+from app.models.user import Usuario, TipoUsuario
+from app.models.ai_history import HistorialAI
+from app.schemas.ai_history import HistorialAIResponse
+from app.services.anomaly_service import AnomalyService
+from app.services.forecast_service import ForecastService
+from app.services.recurring_detection_service import RecurringDetectionService
+from app.controllers.auth_controller import get_current_user
+
+router = APIRouter()
+
+def _to_response(entry: HistorialAI) -> HistorialAIResponse:
+    """Construir la respuesta incluyendo el contenido estructurado si es JSON"""
+    datos = None
+    if entry.origen and entry.contenido:
+        try:
+            datos = json.loads(entry.contenido)
+        except (TypeError, ValueError):
+            datos = None
+
+    return HistorialAIResponse(
+        id_historial=entry.id_historial,
+        tipo=entry.tipo.value if entry.tipo else None,
+        origen=entry.origen,
+        contenido=entry.contenido,
+        datos=datos,
+        fecha=entry.fecha
+    )
+
+def _require_admin(current_user: Usuario):
+    """Verificar que el usuario es administrador del sistema"""
+    if current_user.tipo_usuario != TipoUsuario.admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Solo los administradores pueden ejecutar procesos de análisis"
+        )
+
+@router.get("/alerts", response_model=List[HistorialAIResponse])
+async def get_user_alerts(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener las alertas de gasto del usuario autenticado
+    """
+    anomaly_service = AnomalyService(db)
+    alerts = anomaly_service.get_user_alerts(current_user.id_usuario, skip, limit)
+    return [_to_response(alert) for alert in alerts]
+
+@router.post("/alerts/run", response_model=dict)
+def run_anomaly_detection(
+    months: int = Query(12, ge=4, le=36, description="Meses de historia a considerar"),
+    threshold: float = Query(3.5, gt=0, description="Z-score robusto mínimo para generar alerta"),
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Ejecutar la detección de gastos atípicos para todos los usuarios (solo administradores)
+    """
+    _require_admin(current_user)
+
+    anomaly_service = AnomalyService(db)
+    total = anomaly_service.detect_anomalies(months=months, threshold=threshold)
+    return {"alertas_generadas": total}
+
+@router.get("/forecasts", response_model=List[HistorialAIResponse])
+async def get_user_forecasts(
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener el gasto estimado del mes actual por categoría para el usuario autenticado.
+    Se sirve desde los pronósticos ya calculados por el proceso por lotes.
+    """
+    forecast_service = ForecastService(db)
+    forecasts = forecast_service.get_user_forecasts(current_user.id_usuario)
+    return [_to_response(forecast) for forecast in forecasts]
+
+@router.post("/forecasts/run", response_model=dict)
+def run_forecasts(
+    months: int = Query(24, ge=3, le=60, description="Meses de historia a considerar"),
+    alpha: float = Query(0.5, gt=0, lt=1, description="Factor de suavizado exponencial"),
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Recalcular los pronósticos de gasto para todos los usuarios (solo administradores)
+    """
+    _require_admin(current_user)
+
+    forecast_service = ForecastService(db)
+    total = forecast_service.generate_forecasts(months=months, alpha=alpha)
+    return {"pronosticos_generados": total}
+
+@router.get("/recurring", response_model=List[HistorialAIResponse])
+async def get_recurring_suggestions(
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener los gastos que parecen recurrentes pero no están marcados como tales
+    """
+    recurring_service = RecurringDetectionService(db)
+    suggestions = recurring_service.get_user_suggestions(current_user.id_usuario)
+    return [_to_response(suggestion) for suggestion in suggestions]
+
+@router.post("/recurring/run", response_model=dict)
+def run_recurring_detection(
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Recalcular las sugerencias de gasto recurrente para todos los usuarios (solo administradores)
+    """
+    _require_admin(current_user)
+
+    recurring_service = RecurringDetectionService(db)
+    total = recurring_service.detect_recurring()
+    return {"sugerencias_generadas": total}
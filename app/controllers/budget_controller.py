@@ -0,0 +1,177 @@
+"""
+Controlador para gestión de presupuestos
+"""
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import List
+from app.core.database import get_db
+from app.models.user import Usuario
+from app.schemas.budget import (
+    PresupuestoResponse, PresupuestoCreate, PresupuestoUpdate, PresupuestoEstadoResponse
+)
+from app.services.budget_service import BudgetService
+from app.services.group_service import GroupService
+from app.controllers.auth_controller import get_current_user
+
+router = APIRouter()
+
+@router.post("/", response_model=PresupuestoResponse, status_code=status.HTTP_201_CREATED)
+async def create_budget(
+    budget: PresupuestoCreate,
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Crear un presupuesto personal o grupal para una categoría y un periodo
+    """
+    budget_service = BudgetService(db)
+
+    # Si se especifica un grupo, verificar que el usuario pertenece a él
+    if budget.id_grupo:
+        if not GroupService(db).is_user_in_group(budget.id_grupo, current_user.id_usuario):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="No perteneces a este grupo"
+            )
+
+    try:
+        db_budget = budget_service.create_budget(budget, current_user.id_usuario)
+        return db_budget
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al crear presupuesto: {str(e)}"
+        )
+
+@router.get("/", response_model=List[PresupuestoResponse])
+async def get_user_budgets(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    personal_only: bool = Query(False, description="Si es True, solo muestra presupuestos personales (sin grupos)"),
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener los presupuestos creados por el usuario autenticado
+    """
+    budget_service = BudgetService(db)
+    return budget_service.get_budgets_by_user(current_user.id_usuario, skip, limit, personal_only)
+
+@router.get("/status", response_model=List[PresupuestoEstadoResponse])
+async def get_active_budgets_status(
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener el estado de los presupuestos vigentes (personales y de los grupos del usuario).
+    Lee los contadores mantenidos, sin recorrer los gastos.
+    """
+    budget_service = BudgetService(db)
+    return budget_service.get_active_budgets_status(current_user.id_usuario)
+
+@router.get("/group/{group_id}", response_model=List[PresupuestoResponse])
+async def get_group_budgets(
+    group_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener presupuestos de un grupo específico
+    """
+    budget_service = BudgetService(db)
+    return budget_service.get_budgets_by_group(group_id, current_user.id_usuario, skip, limit)
+
+@router.get("/{budget_id}", response_model=PresupuestoResponse)
+async def get_budget(
+    budget_id: int,
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener un presupuesto específico
+    """
+    budget_service = BudgetService(db)
+    budget = budget_service.get_budget_by_id(budget_id, current_user.id_usuario)
+
+    if not budget:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Presupuesto no encontrado"
+        )
+
+    return budget
+
+@router.get("/{budget_id}/status", response_model=PresupuestoEstadoResponse)
+async def get_budget_status(
+    budget_id: int,
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener cuánto se ha gastado y cuánto queda de un presupuesto
+    """
+    budget_service = BudgetService(db)
+    budget_status = budget_service.get_budget_status(budget_id, current_user.id_usuario)
+
+    if not budget_status:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Presupuesto no encontrado"
+        )
+
+    return budget_status
+
+@router.put("/{budget_id}", response_model=PresupuestoResponse)
+async def update_budget(
+    budget_id: int,
+    budget_update: PresupuestoUpdate,
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Actualizar un presupuesto
+    """
+    budget_service = BudgetService(db)
+
+    try:
+        updated_budget = budget_service.update_budget(budget_id, budget_update, current_user.id_usuario)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    if not updated_budget:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Presupuesto no encontrado"
+        )
+
+    return updated_budget
+
+@router.delete("/{budget_id}")
+async def delete_budget(
+    budget_id: int,
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Eliminar un presupuesto
+    """
+    budget_service = BudgetService(db)
+    success = budget_service.delete_budget(budget_id, current_user.id_usuario)
+
+    if not success:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Presupuesto no encontrado"
+        )
+
+    return {"message": "Presupuesto eliminado exitosamente"}
@@ -0,0 +1,114 @@
+"""
+Controlador para reglas de aportes automáticos a metas
+"""
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.core.database import get_db
+from app.models.user import Usuario
+from app.schemas.contribution_rule import ReglaAporteResponse, ReglaAporteCreate, ReglaAporteUpdate
+from app.services.contribution_rule_service import ContributionRuleService
+from app.controllers.auth_controller import get_current_user
+
+router = APIRouter()
+
+@router.post("/", response_model=ReglaAporteResponse, status_code=status.HTTP_201_CREATED)
+async def create_rule(
+    rule: ReglaAporteCreate,
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Crear una regla que aporta automáticamente a una meta al registrar ingresos
+    (porcentaje o monto fijo) o gastos (redondeo). Los aportes generados se rehacen al
+    editar el monto, la fecha o el grupo del movimiento y se revierten al eliminarlo
+    """
+    rule_service = ContributionRuleService(db)
+
+    try:
+        return rule_service.create_rule(rule, current_user.id_usuario)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.get("/", response_model=List[ReglaAporteResponse])
+async def get_user_rules(
+    id_meta: Optional[int] = Query(None, description="Solo las reglas de esta meta"),
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener las reglas de aportes del usuario autenticado
+    """
+    rule_service = ContributionRuleService(db)
+    return rule_service.get_rules_by_user(current_user.id_usuario, id_meta)
+
+@router.get("/{rule_id}", response_model=ReglaAporteResponse)
+async def get_rule(
+    rule_id: int,
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener una regla de aportes específica
+    """
+    rule_service = ContributionRuleService(db)
+    rule = rule_service.get_rule_by_id(rule_id, current_user.id_usuario)
+
+    if not rule:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Regla no encontrada"
+        )
+
+    return rule
+
+@router.put("/{rule_id}", response_model=ReglaAporteResponse)
+async def update_rule(
+    rule_id: int,
+    rule_update: ReglaAporteUpdate,
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Cambiar el valor de una regla o activarla/desactivarla
+    """
+    rule_service = ContributionRuleService(db)
+
+    try:
+        updated_rule = rule_service.update_rule(rule_id, rule_update, current_user.id_usuario)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    if not updated_rule:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Regla no encontrada"
+        )
+
+    return updated_rule
+
+@router.delete("/{rule_id}")
+async def delete_rule(
+    rule_id: int,
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Eliminar una regla de aportes (los aportes ya generados se conservan)
+    """
+    rule_service = ContributionRuleService(db)
+    success = rule_service.delete_rule(rule_id, current_user.id_usuario)
+
+    if not success:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Regla no encontrada"
+        )
+
+    return {"message": "Regla eliminada exitosamente"}
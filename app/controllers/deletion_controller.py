@@ -0,0 +1,33 @@
+"""
+Controlador para consultar el progreso de las eliminaciones
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.models.user import Usuario, TipoUsuario
+from app.schemas.deletion import EliminacionResponse
+from app.services.deletion_service import DeletionService
+from app.controllers.auth_controller import get_current_user
+
+router = APIRouter()
+
+@router.get("/{deletion_id}", response_model=EliminacionResponse)
+async def get_deletion(
+    deletion_id: int,
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener el estado de una eliminación (solo quien la solicitó o un administrador)
+    """
+    deletion = DeletionService(db).get_deletion(deletion_id)
+
+    if not deletion or (
+        deletion.id_solicitante != current_user.id_usuario and current_user.tipo_usuario != TipoUsuario.admin
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Eliminación no encontrada"
+        )
+
+    return deletion
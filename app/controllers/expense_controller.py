@@ -7,8 +7,14 @@ from typing import List, Optional
 from app.core.database import get_db
 from app.models.expense import Gasto
 from app.models.user import Usuario
-from app.schemas.expense import GastoResponse, GastoCreate, GastoUpdate
+from app.schemas.expense import (
+    GastoResponse, GastoCreate, GastoUpdate,
+    GastosDuplicadosResponse, FusionarDuplicadosRequest
+)
+from app.schemas.expense_split import DivisionGastoResponse
 from app.services.expense_service import ExpenseService
+from app.services.expense_split_service import ExpenseSplitService
+from app.services.group_service import GroupService
 from app.controllers.auth_controller import get_current_user
 
 router = APIRouter()
@@ -26,13 +32,7 @@ async def create_expense(
 
     # Si se especifica un grupo, verificar que el usuario pertenece a él
     if expense.id_grupo:
-        from app.models.user_group import UsuarioGrupo
-        user_in_group = db.query(UsuarioGrupo).filter(
-            UsuarioGrupo.id_usuario == current_user.id_usuario,
-            UsuarioGrupo.id_grupo == expense.id_grupo
-        ).first()
-
-        if not user_in_group:
+        if not GroupService(db).is_user_in_group(expense.id_grupo, current_user.id_usuario):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="No perteneces a este grupo"
@@ -41,6 +41,11 @@ async def create_expense(
     try:
         db_expense = expense_service.create_expense(expense, current_user.id_usuario)
         return db_expense
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -78,6 +83,31 @@ async def get_group_expenses(
     expenses = expense_service.get_expenses_by_group(group_id, current_user.id_usuario, skip, limit)
     return expenses
 
+@router.get("/duplicates", response_model=List[GastosDuplicadosResponse])
+async def get_duplicate_expenses(
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener los grupos de gastos duplicados del usuario autenticado
+    (misma fecha, monto y descripción normalizada)
+    """
+    expense_service = ExpenseService(db)
+    return expense_service.find_duplicates(current_user.id_usuario)
+
+@router.post("/duplicates/merge", response_model=dict)
+async def merge_duplicate_expenses(
+    request: FusionarDuplicadosRequest,
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Fusionar gastos duplicados conservando el más antiguo de cada grupo.
+    Si no se indican hashes se fusionan todos los grupos del usuario.
+    """
+    expense_service = ExpenseService(db)
+    return expense_service.merge_duplicates(current_user.id_usuario, request.hashes)
+
 @router.get("/{expense_id}", response_model=GastoResponse)
 async def get_expense(
     expense_id: int,
@@ -98,6 +128,27 @@ async def get_expense(
 
     return expense
 
+@router.get("/{expense_id}/split", response_model=List[DivisionGastoResponse])
+async def get_expense_split(
+    expense_id: int,
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener cómo se repartió un gasto de grupo entre sus miembros
+    """
+    expense_service = ExpenseService(db)
+    expense = expense_service.get_expense_by_id(expense_id, current_user.id_usuario)
+
+    if not expense:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Gasto no encontrado"
+        )
+
+    split_service = ExpenseSplitService(db)
+    return split_service.get_expense_split(expense_id)
+
 @router.put("/{expense_id}", response_model=GastoResponse)
 async def update_expense(
     expense_id: int,
@@ -112,19 +163,19 @@ async def update_expense(
 
     # Verificar que el grupo sea válido si se está actualizando
     if expense_update.id_grupo:
-        from app.models.user_group import UsuarioGrupo
-        user_in_group = db.query(UsuarioGrupo).filter(
-            UsuarioGrupo.id_usuario == current_user.id_usuario,
-            UsuarioGrupo.id_grupo == expense_update.id_grupo
-        ).first()
-
-        if not user_in_group:
+        if not GroupService(db).is_user_in_group(expense_update.id_grupo, current_user.id_usuario):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="No perteneces a este grupo"
             )
 
-    updated_expense = expense_service.update_expense(expense_id, expense_update, current_user.id_usuario)
+    try:
+        updated_expense = expense_service.update_expense(expense_id, expense_update, current_user.id_usuario)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
     if not updated_expense:
         raise HTTPException(
@@ -3,7 +3,7 @@ Controlador para gestión de aportes a metas
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.core.database import get_db
 from app.models.user import Usuario
 from app.schemas.goal_contribution import (
@@ -42,31 +42,18 @@ async def create_contribution(
 @router.get("/goal/{goal_id}", response_model=List[AporteMetaDetalleResponse])
 async def get_contributions_by_goal(
     goal_id: int,
+    before_id: Optional[int] = Query(None, description="Cursor: devolver aportes anteriores a este id"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     current_user: Usuario = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    Obtener todos los aportes de una meta específica
+    Obtener los aportes de una meta específica, del más reciente al más antiguo.
+    Para la página siguiente, enviar como `before_id` el id_aporte del último aporte recibido.
     """
     contribution_service = GoalContributionService(db)
-    contributions = contribution_service.get_contributions_by_goal(goal_id, current_user.id_usuario, skip, limit)
-    
-    # Enriquecer con nombres
-    contributions_response = []
-    for contrib in contributions:
-        contributions_response.append(AporteMetaDetalleResponse(
-            id_aporte=contrib.id_aporte,
-            id_meta=contrib.id_meta,
-            id_usuario=contrib.id_usuario,
-            monto=contrib.monto,
-            fecha=contrib.fecha,
-            nombre_usuario=contrib.usuario.nombre if contrib.usuario else None,
-            nombre_meta=contrib.meta.nombre if contrib.meta else None
-        ))
-    
-    return contributions_response
+    return contribution_service.get_contributions_by_goal(goal_id, current_user.id_usuario, skip, limit, before_id)
 
 @router.get("/user", response_model=List[AporteMetaResponse])
 async def get_user_contributions(
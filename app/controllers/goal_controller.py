@@ -3,12 +3,14 @@ Controlador para gestión de metas
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Union
 from app.core.database import get_db
 from app.models.goal import Meta
 from app.models.user import Usuario
-from app.schemas.goal import MetaResponse, MetaCreate, MetaUpdate, MetaDetalleResponse
+from app.schemas.goal import MetaResponse, MetaCreate, MetaUpdate, MetaDetalleResponse, MetaProgresoResponse, ProyeccionMetaResponse
 from app.services.goal_service import GoalService
+from app.services.goal_projection_service import GoalProjectionService
+from app.services.group_service import GroupService
 from app.controllers.auth_controller import get_current_user
 
 router = APIRouter()
@@ -26,13 +28,7 @@ async def create_goal(
 
     # Si se especifica un grupo, verificar que el usuario pertenece a él
     if goal.id_grupo:
-        from app.models.user_group import UsuarioGrupo
-        user_in_group = db.query(UsuarioGrupo).filter(
-            UsuarioGrupo.id_usuario == current_user.id_usuario,
-            UsuarioGrupo.id_grupo == goal.id_grupo
-        ).first()
-
-        if not user_in_group:
+        if not GroupService(db).is_user_in_group(goal.id_grupo, current_user.id_usuario):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="No perteneces a este grupo"
@@ -47,19 +43,25 @@ async def create_goal(
             detail=f"Error al crear meta: {str(e)}"
         )
 
-@router.get("/", response_model=List[MetaResponse])
+@router.get("/", response_model=List[Union[MetaProgresoResponse, MetaResponse]])
 async def get_user_goals(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     personal_only: bool = Query(False, description="Si es True, solo muestra metas personales (sin grupos)"),
+    include: Optional[str] = Query(None, pattern="^progress$", description="'progress' incluye el progreso de cada meta"),
     current_user: Usuario = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Obtener todas las metas del usuario autenticado.
     Si personal_only=True, solo muestra metas personales (sin grupos).
+    Con include=progress cada meta incluye porcentaje, faltante, número de aportes y
+    fecha del último aporte, calculados en la misma consulta.
     """
     goal_service = GoalService(db)
+    if include == "progress":
+        return goal_service.get_goals_with_progress(current_user.id_usuario, skip, limit, personal_only)
+
     goals = goal_service.get_goals_by_user(current_user.id_usuario, skip, limit, personal_only)
     return goals
 
@@ -85,7 +87,7 @@ async def get_goal(
     db: Session = Depends(get_db)
 ):
     """
-    Obtener una meta específica con detalles de progreso
+    Obtener una meta específica con detalles de progreso (una sola consulta, sin escrituras)
     """
     goal_service = GoalService(db)
     goal = goal_service.get_goal_by_id(goal_id, current_user.id_usuario)
@@ -96,12 +98,7 @@ async def get_goal(
             detail="Meta no encontrada"
         )
 
-    # Obtener progreso
-    progress = goal_service.get_goal_progress(goal_id, current_user.id_usuario)
-    
-    # Contar aportes
-    from app.models.goal_contribution import AporteMeta
-    total_aportes = db.query(AporteMeta).filter(AporteMeta.id_meta == goal_id).count()
+    progress = goal_service.progress_of(goal)
 
     return MetaDetalleResponse(
         id_meta=goal.id_meta,
@@ -113,8 +110,8 @@ async def get_goal(
         estado=goal.estado.value if goal.estado else None,
         id_usuario=goal.id_usuario,
         id_grupo=goal.id_grupo,
-        porcentaje_completado=progress.get('porcentaje_completado') if progress else 0.0,
-        total_aportes=total_aportes
+        porcentaje_completado=progress['porcentaje_completado'],
+        total_aportes=goal.total_aportes
     )
 
 @router.put("/{goal_id}", response_model=MetaResponse)
@@ -131,13 +128,7 @@ async def update_goal(
 
     # Verificar que el grupo sea válido si se está actualizando
     if goal_update.id_grupo is not None:
-        from app.models.user_group import UsuarioGrupo
-        user_in_group = db.query(UsuarioGrupo).filter(
-            UsuarioGrupo.id_usuario == current_user.id_usuario,
-            UsuarioGrupo.id_grupo == goal_update.id_grupo
-        ).first()
-
-        if not user_in_group:
+        if not GroupService(db).is_user_in_group(goal_update.id_grupo, current_user.id_usuario):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="No perteneces a este grupo"
@@ -193,6 +184,27 @@ async def get_goal_progress(
 
     return progress
 
+@router.get("/{goal_id}/projection", response_model=ProyeccionMetaResponse)
+async def get_goal_projection(
+    goal_id: int,
+    simulaciones: int = Query(5000, ge=100, le=20000),
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Estimar cuándo se completará una meta y la probabilidad de lograrlo antes de su
+    fecha límite, simulando el excedente mensual histórico (Monte Carlo)
+    """
+    projection = GoalProjectionService(db).get_projection(goal_id, current_user.id_usuario, simulaciones)
+
+    if not projection:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Meta no encontrada"
+        )
+
+    return projection
+
 @router.get("/status/{estado}", response_model=List[MetaResponse])
 async def get_goals_by_status(
     estado: str = Path(..., description="Estado de la meta: activa, completada, cancelada"),
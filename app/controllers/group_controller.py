@@ -1,21 +1,72 @@
 """
 Controlador para gestión de grupos
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, WebSocket, WebSocketDisconnect
 from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
+from sqlalchemy.exc import SQLAlchemyError
+from typing import List, Optional
+import asyncio
+from app.core.database import get_db, SessionLocal
+from app.core.events import group_event_hub
+from app.core.security import verify_token
+from app.jobs.process_deletions import deletion_worker
 from app.models.user import Usuario
-from app.models.user_group import RolGrupo
+from app.models.user_group import UsuarioGrupo, RolGrupo
 from app.schemas.group import (
     GrupoResponse, GrupoCreate, GrupoUpdate, 
-    GrupoDetalleResponse, MiembroGrupoResponse
+    GrupoDetalleResponse, MiembroGrupoResponse, GrupoDashboardResponse,
+    EstadisticaMiembroResponse, MiembrosLoteRequest, MiembrosLoteResponse
 )
+from app.schemas.expense_split import BalanceMiembroResponse, LiquidacionGrupoResponse
+from app.schemas.deletion import EliminacionResponse
+from app.schemas.group_activity import FeedActividadResponse
 from app.services.group_service import GroupService
+from app.services.deletion_service import DeletionService
+from app.services.expense_split_service import ExpenseSplitService
+from app.services.group_activity_service import GroupActivityService
+from app.services.group_dashboard_service import GroupDashboardService
+from app.services.group_stats_service import GroupStatsService
+from app.services.settlement_service import SettlementService
+from app.services.user_service import UserService
 from app.controllers.auth_controller import get_current_user
 
 router = APIRouter()
 
+def _member_response(member: UsuarioGrupo, usuario: Usuario) -> MiembroGrupoResponse:
+    """Construir la respuesta de un miembro a partir de su membresía y su usuario"""
+    return MiembroGrupoResponse(
+        id_usuario=usuario.id_usuario,
+        nombre=usuario.nombre,
+        correo=usuario.correo,
+        rol=member.rol.value,
+        fecha_union=member.fecha_union
+    )
+
+def _parse_role(value: str) -> RolGrupo:
+    """Convertir el rol recibido validando que sea 'admin' o 'miembro'"""
+    if value not in ["admin", "miembro"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Rol inválido. Debe ser 'admin' o 'miembro'"
+        )
+    return RolGrupo(value)
+
+def _bulk_response(requested: List[int], processed: List[int]) -> MiembrosLoteResponse:
+    """Separar los usuarios procesados de los omitidos en una operación por lotes"""
+    processed_set = set(processed)
+    return MiembrosLoteResponse(
+        procesados=processed,
+        omitidos=sorted(set(requested) - processed_set)
+    )
+
+def _require_bulk_permission(result: Optional[List[int]]):
+    """Rechazar la operación por lotes si el usuario no es administrador del grupo"""
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Solo los administradores del grupo pueden gestionar miembros"
+        )
+
 @router.post("/", response_model=GrupoResponse, status_code=status.HTTP_201_CREATED)
 async def create_group(
     group: GrupoCreate,
@@ -66,11 +117,14 @@ async def get_created_groups(
 @router.get("/{group_id}", response_model=GrupoDetalleResponse)
 async def get_group(
     group_id: int,
+    skip: int = Query(0, ge=0, description="Miembros a omitir"),
+    limit: int = Query(100, ge=1, le=1000, description="Máximo de miembros a incluir"),
     current_user: Usuario = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    Obtener detalles de un grupo específico (solo si el usuario pertenece al grupo)
+    Obtener detalles de un grupo específico (solo si el usuario pertenece al grupo).
+    La lista de miembros está paginada; `total_miembros` indica el total.
     """
     group_service = GroupService(db)
     
@@ -81,25 +135,15 @@ async def get_group(
             detail="No perteneces a este grupo"
         )
 
-    group = group_service.get_group_by_id(group_id)
+    group = group_service.get_group_with_creator(group_id)
     if not group:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Grupo no encontrado"
         )
 
-    # Obtener miembros
-    members = group_service.get_group_members(group_id)
-    miembros_response = []
-    for member in members:
-        usuario = member.usuario
-        miembros_response.append(MiembroGrupoResponse(
-            id_usuario=usuario.id_usuario,
-            nombre=usuario.nombre,
-            correo=usuario.correo,
-            rol=member.rol.value,
-            fecha_union=member.fecha_union
-        ))
+    # Obtener la página solicitada de miembros
+    members = group_service.get_group_members(group_id, skip, limit)
 
     return GrupoDetalleResponse(
         id_grupo=group.id_grupo,
@@ -108,10 +152,32 @@ async def get_group(
         fecha_creacion=group.fecha_creacion,
         creado_por=group.creado_por,
         creador_nombre=group.creador.nombre if group.creador else None,
-        total_miembros=len(miembros_response),
-        miembros=miembros_response
+        total_miembros=group.total_miembros,
+        miembros=[_member_response(member, usuario) for member, usuario in members]
     )
 
+@router.get("/{group_id}/dashboard", response_model=GrupoDashboardResponse)
+async def get_group_dashboard(
+    group_id: int,
+    recent_limit: int = Query(10, ge=1, le=50, description="Movimientos recientes a incluir"),
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener el resumen del grupo (totales, gasto por miembro, metas y movimientos recientes)
+    en una sola consulta
+    """
+    dashboard_service = GroupDashboardService(db)
+    dashboard = dashboard_service.get_dashboard(group_id, current_user.id_usuario, recent_limit)
+
+    if not dashboard or not dashboard["es_miembro"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No perteneces a este grupo"
+        )
+
+    return dashboard
+
 @router.put("/{group_id}", response_model=GrupoResponse)
 async def update_group(
     group_id: int,
@@ -133,29 +199,33 @@ async def update_group(
 
     return updated_group
 
-@router.delete("/{group_id}")
+@router.delete("/{group_id}", response_model=EliminacionResponse, status_code=status.HTTP_202_ACCEPTED)
 async def delete_group(
     group_id: int,
     current_user: Usuario = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    Eliminar un grupo (solo el creador puede eliminar)
+    Eliminar un grupo (solo el creador puede eliminar).
+    El grupo deja de estar disponible de inmediato y sus datos se eliminan en segundo
+    plano; el progreso se consulta en /api/deletions/{id_eliminacion}.
     """
-    group_service = GroupService(db)
-    success = group_service.delete_group(group_id, current_user.id_usuario)
+    deletion = DeletionService(db).request_group_deletion(group_id, current_user.id_usuario)
 
-    if not success:
+    if not deletion:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Grupo no encontrado o no tienes permisos para eliminarlo"
         )
 
-    return {"message": "Grupo eliminado exitosamente"}
+    deletion_worker.wake()
+    return deletion
 
 @router.get("/{group_id}/members", response_model=List[MiembroGrupoResponse])
 async def get_group_members(
     group_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
     current_user: Usuario = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -170,19 +240,148 @@ async def get_group_members(
             detail="No perteneces a este grupo"
         )
 
-    members = group_service.get_group_members(group_id)
-    miembros_response = []
-    for member in members:
-        usuario = member.usuario
-        miembros_response.append(MiembroGrupoResponse(
-            id_usuario=usuario.id_usuario,
-            nombre=usuario.nombre,
-            correo=usuario.correo,
-            rol=member.rol.value,
-            fecha_union=member.fecha_union
-        ))
+    members = group_service.get_group_members(group_id, skip, limit)
+    return [_member_response(member, usuario) for member, usuario in members]
+
+@router.get("/{group_id}/activity", response_model=FeedActividadResponse)
+async def get_group_activity(
+    group_id: int,
+    before_id: Optional[int] = Query(None, description="Cursor: devolver actividad anterior a este id"),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener el historial de actividad del grupo (quién hizo qué), del más reciente al más antiguo
+    """
+    group_service = GroupService(db)
+
+    if not group_service.is_user_in_group(group_id, current_user.id_usuario):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No perteneces a este grupo"
+        )
+
+    activity_service = GroupActivityService(db)
+    return activity_service.get_feed(group_id, before_id, limit)
+
+@router.get("/{group_id}/stats", response_model=List[EstadisticaMiembroResponse])
+async def get_group_stats(
+    group_id: int,
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener el gasto, ingreso y aportes de cada miembro con su participación, ranking y tendencia
+    """
+    group_service = GroupService(db)
+
+    if not group_service.is_user_in_group(group_id, current_user.id_usuario):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No perteneces a este grupo"
+        )
+
+    stats_service = GroupStatsService(db)
+    return stats_service.get_member_stats(group_id)
+
+@router.get("/{group_id}/balances", response_model=List[BalanceMiembroResponse])
+async def get_group_balances(
+    group_id: int,
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener lo que cada miembro ha pagado y lo que le corresponde de los gastos divididos
+    """
+    group_service = GroupService(db)
+
+    if not group_service.is_user_in_group(group_id, current_user.id_usuario):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No perteneces a este grupo"
+        )
+
+    split_service = ExpenseSplitService(db)
+    return split_service.get_group_balances(group_id)
+
+@router.get("/{group_id}/settlement", response_model=LiquidacionGrupoResponse)
+async def get_group_settlement(
+    group_id: int,
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener quién le paga a quién para saldar las cuentas del grupo con pocas transferencias
+    """
+    group_service = GroupService(db)
+
+    if not group_service.is_user_in_group(group_id, current_user.id_usuario):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No perteneces a este grupo"
+        )
+
+    settlement_service = SettlementService(db)
+    plan = settlement_service.get_settlement_plan(group_id)
+
+    if plan is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Grupo no encontrado"
+        )
+
+    return plan
+
+@router.post("/{group_id}/members/bulk", response_model=MiembrosLoteResponse)
+async def bulk_add_members(
+    group_id: int,
+    request: MiembrosLoteRequest,
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Agregar varios usuarios al grupo en una sola operación (solo administradores).
+    Los que ya son miembros o no existen se devuelven como omitidos.
+    """
+    rol = _parse_role(request.rol)
+    group_service = GroupService(db)
+    added = group_service.bulk_add_members(group_id, request.usuarios, rol, current_user.id_usuario)
+    _require_bulk_permission(added)
+    return _bulk_response(request.usuarios, added)
+
+@router.post("/{group_id}/members/bulk-remove", response_model=MiembrosLoteResponse)
+async def bulk_remove_members(
+    group_id: int,
+    request: MiembrosLoteRequest,
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Remover varios miembros del grupo en una sola operación (solo administradores).
+    El creador del grupo y quienes no son miembros se devuelven como omitidos.
+    """
+    group_service = GroupService(db)
+    removed = group_service.bulk_remove_members(group_id, request.usuarios, current_user.id_usuario)
+    _require_bulk_permission(removed)
+    return _bulk_response(request.usuarios, removed)
 
-    return miembros_response
+@router.put("/{group_id}/members/bulk-role", response_model=MiembrosLoteResponse)
+async def bulk_change_role(
+    group_id: int,
+    request: MiembrosLoteRequest,
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Cambiar el rol de varios miembros en una sola operación (solo administradores).
+    Quienes no son miembros o ya tienen ese rol se devuelven como omitidos.
+    """
+    rol = _parse_role(request.rol)
+    group_service = GroupService(db)
+    updated = group_service.bulk_change_role(group_id, request.usuarios, rol, current_user.id_usuario)
+    _require_bulk_permission(updated)
+    return _bulk_response(request.usuarios, updated)
 
 @router.delete("/{group_id}/members/{user_id}")
 async def remove_member(
@@ -224,14 +423,7 @@ async def change_member_role(
     Cambiar el rol de un miembro (solo administradores pueden hacerlo)
     """
     group_service = GroupService(db)
-    
-    if new_role not in ["admin", "miembro"]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Rol inválido. Debe ser 'admin' o 'miembro'"
-        )
-
-    rol = RolGrupo.admin if new_role == "admin" else RolGrupo.miembro
+    rol = _parse_role(new_role)
     success = group_service.change_member_role(group_id, user_id, rol, current_user.id_usuario)
 
     if not success:
@@ -242,3 +434,64 @@ async def change_member_role(
 
     return {"message": f"Rol cambiado a {new_role} exitosamente"}
 
+@router.websocket("/{group_id}/events")
+async def group_events(
+    websocket: WebSocket,
+    group_id: int,
+    token: str = Query(..., description="Token de acceso (los navegadores no envían cabeceras en WebSocket)")
+):
+    """
+    Recibir en tiempo real los eventos del grupo (gastos, ingresos, aportes y miembros)
+    """
+    # Sesión de corta duración: solo se usa para autorizar, no durante toda la conexión
+    db = SessionLocal()
+    close_code = status.WS_1008_POLICY_VIOLATION
+    try:
+        correo = verify_token(token, ValueError("Token inválido"))
+        user = UserService(db).get_user_by_email(correo)
+        authorized = user is not None and GroupService(db).is_user_in_group(group_id, user.id_usuario)
+    except ValueError:
+        authorized = False
+    except SQLAlchemyError:
+        # Sin base de datos no se puede autorizar: cerrar limpiamente en lugar de abortar el handshake
+        authorized = False
+        close_code = status.WS_1011_INTERNAL_ERROR
+    finally:
+        db.close()
+
+    if not authorized:
+        await websocket.close(code=close_code)
+        return
+
+    await websocket.accept()
+    queue = group_event_hub.subscribe(group_id)
+
+    async def forward_events():
+        while True:
+            event = await queue.get()
+            await websocket.send_json(event)
+            # Un miembro eliminado (solo o en lote) o un grupo eliminado deja de recibir eventos
+            datos = event["datos"]
+            if event["evento"] == "grupo_eliminado" or (
+                event["evento"] == "miembro_eliminado" and datos.get("id_usuario") == user.id_usuario
+            ) or (
+                event["evento"] == "miembros_eliminados" and user.id_usuario in datos.get("usuarios", [])
+            ):
+                await websocket.close()
+                return
+
+    async def wait_disconnect():
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            return
+
+    # Termina cuando el cliente se desconecta o deja de pertenecer al grupo
+    tasks = [asyncio.create_task(forward_events()), asyncio.create_task(wait_disconnect())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        group_event_hub.unsubscribe(group_id, queue)
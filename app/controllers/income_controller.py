@@ -9,6 +9,7 @@ from app.models.income import Ingreso
 from app.models.user import Usuario
 from app.schemas.income import IngresoResponse, IngresoCreate, IngresoUpdate
 from app.services.income_service import IncomeService
+from app.services.group_service import GroupService
 from app.controllers.auth_controller import get_current_user
 
 router = APIRouter()
@@ -26,13 +27,7 @@ async def create_income(
 
     # Si se especifica un grupo, verificar que el usuario pertenece a él
     if income.id_grupo:
-        from app.models.user_group import UsuarioGrupo
-        user_in_group = db.query(UsuarioGrupo).filter(
-            UsuarioGrupo.id_usuario == current_user.id_usuario,
-            UsuarioGrupo.id_grupo == income.id_grupo
-        ).first()
-
-        if not user_in_group:
+        if not GroupService(db).is_user_in_group(income.id_grupo, current_user.id_usuario):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="No perteneces a este grupo"
@@ -112,13 +107,7 @@ async def update_income(
 
     # Verificar que el grupo sea válido si se está actualizando
     if income_update.id_grupo:
-        from app.models.user_group import UsuarioGrupo
-        user_in_group = db.query(UsuarioGrupo).filter(
-            UsuarioGrupo.id_usuario == current_user.id_usuario,
-            UsuarioGrupo.id_grupo == income_update.id_grupo
-        ).first()
-
-        if not user_in_group:
+        if not GroupService(db).is_user_in_group(income_update.id_grupo, current_user.id_usuario):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="No perteneces a este grupo"
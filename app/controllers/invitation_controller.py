@@ -1,15 +1,21 @@
 """
 Controlador para gestión de invitaciones
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
+import base64
+import csv
+import io
+import json
+import zipfile
 from app.core.database import get_db
+from app.core.qr import qr_renderer, QR_AVAILABLE, MEDIA_TYPES
 from app.models.user import Usuario
 from app.schemas.invitation import (
     InvitacionResponse, InvitacionCreate, InvitacionDetalleResponse,
-    AceptarInvitacionRequest, QRResponse
+    AceptarInvitacionRequest, InvitacionesLoteCreate
 )
 from app.services.invitation_service import InvitationService
 from app.services.group_service import GroupService
@@ -82,6 +88,114 @@ async def create_invitation(
             detail=f"Error al crear invitación: {str(e)}"
         )
 
+# Imágenes QR que se dibujan a la vez por cada bloque de la respuesta en streaming
+BULK_QR_CHUNK = 32
+
+class _ZipStreamBuffer:
+    """Destino no posicionable para zipfile: acumula lo escrito hasta que se envía"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+async def _bulk_qr_chunks(invitations: List[dict], qr_formato: str):
+    """Recorrer las invitaciones por bloques con sus imágenes QR (None si no hay librería)"""
+    for start in range(0, len(invitations), BULK_QR_CHUNK):
+        chunk = invitations[start:start + BULK_QR_CHUNK]
+        if QR_AVAILABLE:
+            images = await qr_renderer.render_many(
+                [(inv["token"], inv["link_invitacion"]) for inv in chunk], qr_formato
+            )
+        else:
+            images = [(None, None)] * len(chunk)
+        yield list(zip(chunk, images))
+
+async def _bulk_ndjson(invitations: List[dict], qr_formato: str):
+    """Una línea JSON por invitación con su QR en base64"""
+    async for chunk in _bulk_qr_chunks(invitations, qr_formato):
+        lines = []
+        for inv, (image, _) in chunk:
+            lines.append(json.dumps({
+                **inv,
+                "qr_formato": qr_formato,
+                "qr_base64": base64.b64encode(image).decode("ascii") if image else None
+            }, default=str, ensure_ascii=False))
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+async def _bulk_zip(invitations: List[dict], qr_formato: str):
+    """ZIP con un índice CSV de los links y una imagen QR por invitación"""
+    buffer = _ZipStreamBuffer()
+    with zipfile.ZipFile(buffer, mode="w") as archive:
+        manifest = io.StringIO()
+        writer = csv.writer(manifest)
+        writer.writerow(["id_invitacion", "token", "link_invitacion", "id_usuario_invitado", "fecha_expiracion"])
+        for inv in invitations:
+            writer.writerow([
+                inv["id_invitacion"], inv["token"], inv["link_invitacion"],
+                inv["id_usuario_invitado"] or "", inv["fecha_expiracion"] or ""
+            ])
+        archive.writestr("invitaciones.csv", manifest.getvalue(), compress_type=zipfile.ZIP_DEFLATED)
+        yield buffer.pop()
+
+        async for chunk in _bulk_qr_chunks(invitations, qr_formato):
+            for inv, (image, _) in chunk:
+                if image:
+                    # Las imágenes ya están comprimidas
+                    archive.writestr(f"qr/invitacion_{inv['id_invitacion']}.{qr_formato}", image)
+            yield buffer.pop()
+    yield buffer.pop()
+
+@router.post("/bulk", status_code=status.HTTP_201_CREATED)
+async def create_invitations_bulk(
+    request: InvitacionesLoteCreate,
+    formato: str = Query("zip", pattern="^(zip|ndjson)$"),
+    qr_formato: str = Query("png", pattern="^(png|svg)$"),
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Crear varias invitaciones de un grupo a la vez (solo administradores).
+    Devuelve en streaming un ZIP (índice CSV + imágenes QR) o NDJSON (una línea por
+    invitación con su QR en base64); los QR se dibujan en paralelo mientras se envía.
+    """
+    invitation_service = InvitationService(db)
+
+    try:
+        invitations = invitation_service.create_invitations_bulk(request, current_user.id_usuario)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+
+    for inv in invitations:
+        inv["link_invitacion"] = invitation_service.get_invitation_link(inv["token"])
+
+    if formato == "ndjson":
+        return StreamingResponse(
+            _bulk_ndjson(invitations, qr_formato),
+            status_code=status.HTTP_201_CREATED,
+            media_type="application/x-ndjson"
+        )
+
+    return StreamingResponse(
+        _bulk_zip(invitations, qr_formato),
+        status_code=status.HTTP_201_CREATED,
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="invitaciones_grupo_{request.id_grupo}.zip"'}
+    )
+
 @router.get("/group/{group_id}", response_model=List[InvitacionResponse])
 async def get_group_invitations(
     group_id: int,
@@ -127,7 +241,7 @@ async def get_invitation_by_token(
     Este endpoint puede ser accedido sin autenticación para ver la invitación.
     """
     invitation_service = InvitationService(db)
-    invitation = invitation_service.get_invitation_by_token(token)
+    invitation = invitation_service.get_invitation_view(token)
     
     if not invitation:
         raise HTTPException(
@@ -135,34 +249,19 @@ async def get_invitation_by_token(
             detail="Invitación no encontrada o expirada"
         )
 
-    group = invitation.grupo
-    creador = invitation.creador
-    
-    link = invitation_service.get_invitation_link(token)
-    
-    return InvitacionDetalleResponse(
-        id_invitacion=invitation.id_invitacion,
-        id_grupo=invitation.id_grupo,
-        token=invitation.token,
-        link_invitacion=link,
-        estado=invitation.estado.value,
-        fecha_creacion=invitation.fecha_creacion,
-        fecha_expiracion=invitation.fecha_expiracion,
-        creado_por=invitation.creado_por,
-        id_usuario_invitado=invitation.id_usuario_invitado,
-        grupo_nombre=group.nombre if group else None,
-        grupo_descripcion=group.descripcion if group else None,
-        creador_nombre=creador.nombre if creador else None
-    )
+    return InvitacionDetalleResponse(**invitation)
 
-@router.get("/{invitation_id}/qr", response_model=QRResponse)
+@router.get("/{invitation_id}/qr", response_class=Response)
 async def get_invitation_qr(
     invitation_id: int,
+    formato: str = Query("png", pattern="^(png|svg)$"),
+    if_none_match: Optional[str] = Header(None),
     current_user: Usuario = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    Generar código QR para una invitación (solo administradores del grupo)
+    Obtener el código QR de una invitación como imagen PNG o SVG (solo administradores del grupo).
+    La imagen de un token nunca cambia, así que se puede guardar en caché indefinidamente.
     """
     from app.models.invitation import Invitacion
     
@@ -185,20 +284,23 @@ async def get_invitation_qr(
             detail="No tienes permisos para generar QR de esta invitación"
         )
 
-    qr_base64 = invitation_service.generate_qr_code(invitation.token)
-    link = invitation_service.get_invitation_link(invitation.token)
-
-    if not qr_base64:
+    if not QR_AVAILABLE:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="No se pudo generar el código QR. Asegúrate de tener instalada la librería 'qrcode'."
         )
 
-    return QRResponse(
-        qr_code_base64=qr_base64,
-        link_invitacion=link,
-        token=invitation.token
-    )
+    link = invitation_service.get_invitation_link(invitation.token)
+    image, digest = await qr_renderer.get_image(invitation.token, link, formato)
+
+    headers = {
+        "Cache-Control": "private, max-age=31536000, immutable",
+        "ETag": f'"{digest}"'
+    }
+    if if_none_match == headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=image, media_type=MEDIA_TYPES[formato], headers=headers)
 
 @router.post("/accept", response_model=dict)
 async def accept_invitation(
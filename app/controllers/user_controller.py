@@ -5,7 +5,10 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.models.user import Usuario
+from app.jobs.process_deletions import deletion_worker
+from app.schemas.deletion import EliminacionResponse
 from app.schemas.user import UsuarioResponse, UsuarioUpdate
+from app.services.deletion_service import DeletionService
 from app.services.user_service import UserService
 from app.controllers.auth_controller import get_current_user
 
@@ -38,29 +41,23 @@ async def update_user_profile(
 
     return updated_user
 
-@router.delete("/profile")
+@router.delete("/profile", response_model=EliminacionResponse, status_code=status.HTTP_202_ACCEPTED)
 async def delete_user_account(
     current_user: Usuario = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Eliminar la cuenta del usuario autenticado y todos sus datos relacionados
+    (incluidos los grupos que creó). La cuenta queda deshabilitada de inmediato
+    y sus datos se eliminan en segundo plano.
     """
-    user_service = UserService(db)
-
-    try:
-        success = user_service.delete_user(current_user.id_usuario)
-
-        if not success:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Usuario no encontrado"
-            )
-
-        return {"message": "Cuenta eliminada exitosamente"}
+    deletion = DeletionService(db).request_user_deletion(current_user.id_usuario)
 
-    except Exception as e:
+    if not deletion:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error al eliminar la cuenta: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Usuario no encontrado"
         )
+
+    deletion_worker.wake()
+    return deletion
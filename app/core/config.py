@@ -2,6 +2,7 @@
 Configuración central de la aplicación
 """
 import os
+import tempfile
 from typing import Optional
 from pydantic_settings import BaseSettings
 
@@ -32,6 +33,13 @@ class Settings(BaseSettings):
     # URL del frontend para links de invitación
     FRONTEND_URL: str = "http://localhost:3000"
     
+    # Códigos QR de invitaciones: directorio de caché y procesos para generarlos
+    QR_CACHE_DIR: str = os.path.join(tempfile.gettempdir(), "qr_invitaciones")
+    QR_RENDER_WORKERS: int = 2
+    
+    # Días que se conservan las invitaciones aceptadas, rechazadas o expiradas
+    INVITATION_RETENTION_DAYS: int = 90
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
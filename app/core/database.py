@@ -1,7 +1,7 @@
 """
 Configuración de la base de datos
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
@@ -15,6 +15,24 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Base para los modelos
 Base = declarative_base()
 
+# Reglas de aportes automáticos: los ingresos y gastos creados en cualquier sesión de la
+# aplicación (API y procesos en segundo plano) se evalúan una vez por transacción.
+# Los servicios se importan al usarse porque dependen de los modelos definidos sobre Base.
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_new_movements(session, flush_context):
+    from app.services.contribution_rule_service import collect_new_movements
+    collect_new_movements(session)
+
+@event.listens_for(SessionLocal, "before_commit")
+def _apply_pending_rules(session):
+    from app.services.contribution_rule_service import apply_pending_rules
+    apply_pending_rules(session)
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_pending_rules(session):
+    from app.services.contribution_rule_service import discard_pending_rules
+    discard_pending_rules(session)
+
 def get_db():
     """Función para obtener la sesión de la base de datos"""
     db = SessionLocal()
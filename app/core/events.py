@@ -0,0 +1,134 @@
+"""
+Eventos en tiempo real de los grupos usando LISTEN/NOTIFY de PostgreSQL
+"""
+import asyncio
+import json
+from collections import defaultdict
+from typing import Dict, Optional, Set
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.database import engine
+
+CANAL_EVENTOS = "eventos_grupo"
+
+# Eventos pendientes por conexión antes de descartar los más antiguos
+QUEUE_SIZE = 100
+
+# Segundos de espera antes de reintentar la conexión de escucha
+RECONNECT_DELAY = 5
+
+
+def publish_group_event(db: Session, group_id: int, evento: str, datos: dict, **extra):
+    """
+    Publicar un evento del grupo con pg_notify dentro de la transacción actual.
+    PostgreSQL solo lo entrega si la transacción hace commit; no hace commit.
+    """
+    payload = json.dumps({"id_grupo": group_id, "evento": evento, "datos": datos, **extra}, default=str)
+    db.execute(text("SELECT pg_notify(:canal, :payload)"), {"canal": CANAL_EVENTOS, "payload": payload})
+
+
+class GroupEventHub:
+    """
+    Distribuidor de eventos por grupo dentro de un proceso.
+
+    Cada proceso (worker de uvicorn) mantiene una única conexión en LISTEN y reparte
+    cada notificación a las colas de los clientes suscritos a ese grupo, así los
+    eventos publicados desde cualquier worker llegan a todos.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._connection = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Abrir la conexión de escucha y registrarla en el event loop"""
+        self._loop = asyncio.get_running_loop()
+        try:
+            self._connect()
+        except Exception as e:
+            print(f"Error iniciando la escucha de eventos de grupo: {e}")
+            self._schedule_reconnect()
+
+    async def stop(self):
+        """Cerrar la conexión de escucha"""
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        self._disconnect()
+
+    def subscribe(self, group_id: int) -> asyncio.Queue:
+        """Suscribirse a los eventos de un grupo"""
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._subscribers[group_id].add(queue)
+        return queue
+
+    def unsubscribe(self, group_id: int, queue: asyncio.Queue):
+        """Cancelar una suscripción"""
+        queues = self._subscribers.get(group_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[group_id]
+
+    def _connect(self):
+        raw = engine.raw_connection()
+        connection = raw.driver_connection
+        # La conexión de escucha es permanente: se saca del pool
+        raw.detach()
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {CANAL_EVENTOS}")
+        self._connection = connection
+        self._loop.add_reader(connection.fileno(), self._on_notify)
+
+    def _disconnect(self):
+        if self._connection is None:
+            return
+        try:
+            self._loop.remove_reader(self._connection.fileno())
+            self._connection.close()
+        except Exception:
+            pass
+        self._connection = None
+
+    def _schedule_reconnect(self):
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = self._loop.create_task(self._reconnect())
+
+    async def _reconnect(self):
+        while self._connection is None:
+            await asyncio.sleep(RECONNECT_DELAY)
+            try:
+                self._connect()
+            except Exception as e:
+                print(f"Error reconectando la escucha de eventos de grupo: {e}")
+
+    def _on_notify(self):
+        """Leer las notificaciones disponibles y repartirlas a las colas del grupo"""
+        try:
+            self._connection.poll()
+        except Exception as e:
+            print(f"Se perdió la conexión de eventos de grupo: {e}")
+            self._disconnect()
+            self._schedule_reconnect()
+            return
+
+        notifies = self._connection.notifies
+        while notifies:
+            notify = notifies.pop(0)
+            try:
+                event = json.loads(notify.payload)
+            except ValueError:
+                continue
+
+            for queue in self._subscribers.get(event.get("id_grupo"), ()):
+                if queue.full():
+                    # Cliente lento: se descarta su evento más antiguo
+                    queue.get_nowait()
+                queue.put_nowait(event)
+
+
+group_event_hub = GroupEventHub()
@@ -0,0 +1,140 @@
+"""
+Generación de códigos QR para invitaciones, con caché en memoria y en disco
+"""
+import asyncio
+import hashlib
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+try:
+    import qrcode
+    import qrcode.image.svg
+    QR_AVAILABLE = True
+except ImportError:
+    QR_AVAILABLE = False
+
+BOX_SIZE = 10
+BORDER = 5
+
+# Formatos soportados y su tipo de contenido
+MEDIA_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+
+
+def render_qr(data: str, formato: str = "png") -> bytes:
+    """
+    Dibujar el código QR de `data`. Es una función de módulo para poder
+    ejecutarse en los procesos del pool.
+    """
+    qr = qrcode.QRCode(version=1, box_size=BOX_SIZE, border=BORDER)
+    qr.add_data(data)
+    qr.make(fit=True)
+
+    buffer = io.BytesIO()
+    if formato == "svg":
+        qr.make_image(image_factory=qrcode.image.svg.SvgPathImage).save(buffer)
+    else:
+        qr.make_image(fill_color="black", back_color="white").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def content_hash(data: str, formato: str) -> str:
+    """Identificador del contenido de la imagen (sirve como nombre de archivo y ETag)"""
+    key = f"{formato}:{BOX_SIZE}:{BORDER}:{data}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class QRRenderer:
+    """
+    Entrega imágenes QR buscando primero en una LRU en memoria (por token), luego en
+    un directorio de caché direccionado por contenido y, solo si no existen, las dibuja
+    en un pool de procesos para no ocupar el event loop ni el GIL.
+    """
+
+    def __init__(self, cache_dir: str, workers: int, memory_size: int = 512):
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self._memory = LRUCache(maxsize=memory_size)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    async def get_image(self, token: str, data: str, formato: str = "png") -> Tuple[bytes, str]:
+        """Obtener la imagen QR de una invitación y su hash de contenido"""
+        cached = self._memory.get((token, formato))
+        if cached is not None:
+            return cached
+
+        digest = content_hash(data, formato)
+        path = os.path.join(self.cache_dir, f"{digest}.{formato}")
+        image = await asyncio.to_thread(self._read_file, path)
+
+        if image is None:
+            loop = asyncio.get_running_loop()
+            image = await loop.run_in_executor(self._get_pool(), render_qr, data, formato)
+            await asyncio.to_thread(self._write_file, path, image)
+
+        self._memory.set((token, formato), (image, digest))
+        return image, digest
+
+    async def render_many(self, items: List[Tuple[str, str]], formato: str = "png") -> List[Tuple[bytes, str]]:
+        """
+        Dibujar en paralelo, repartidas entre los procesos del pool, las imágenes de
+        varias invitaciones nuevas [(token, data), ...]. Se guardan en ambas cachés.
+        """
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        images = await asyncio.gather(*(
+            loop.run_in_executor(pool, render_qr, data, formato) for _, data in items
+        ))
+
+        results = []
+        for (token, data), image in zip(items, images):
+            digest = content_hash(data, formato)
+            await asyncio.to_thread(self._write_file, os.path.join(self.cache_dir, f"{digest}.{formato}"), image)
+            self._memory.set((token, formato), (image, digest))
+            results.append((image, digest))
+        return results
+
+    def shutdown(self):
+        """Detener los procesos del pool"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: los procesos no heredan conexiones ni hilos del servidor
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    @staticmethod
+    def _read_file(path: str) -> Optional[bytes]:
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _write_file(path: str, image: bytes):
+        """Escribir de forma atómica; un fallo de disco no impide responder"""
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(image)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error guardando QR en caché: {e}")
+
+
+qr_renderer = QRRenderer(settings.QR_CACHE_DIR, settings.QR_RENDER_WORKERS)
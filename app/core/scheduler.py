@@ -0,0 +1,46 @@
+"""
+Tareas periódicas ejecutadas en segundo plano por la API
+"""
+import asyncio
+from typing import Callable, Optional
+
+
+class PeriodicJob:
+    """
+    Ejecuta `func` cada `interval` segundos en un hilo, sin bloquear el event loop.
+    `wake()` adelanta la siguiente ejecución.
+    """
+
+    def __init__(self, name: str, func: Callable[[], object], interval: float):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def wake(self):
+        """Ejecutar sin esperar al siguiente intervalo"""
+        if self._wake:
+            self._wake.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.func)
+            except Exception as e:
+                print(f"Error en la tarea periódica '{self.name}': {e}")
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
@@ -0,0 +1 @@
+# Paquete de procesos por lotes (ejecutables con `python -m app.jobs.<nombre>`)
@@ -0,0 +1,20 @@
+"""
+Proceso por lotes: calcular el hash de contenido de los gastos existentes
+
+Uso: python -m app.jobs.backfill_expense_hashes
+"""
+from app.core.database import SessionLocal
+from app.services.expense_service import ExpenseService
+
+
+def main():
+    db = SessionLocal()
+    try:
+        total = ExpenseService(db).backfill_content_hashes()
+        print(f"Gastos actualizados: {total}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
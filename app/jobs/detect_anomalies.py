@@ -0,0 +1,22 @@
+"""
+Proceso por lotes: detección de gastos atípicos para todos los usuarios
+
+Uso: python -m app.jobs.detect_anomalies
+"""
+import time
+from app.core.database import SessionLocal
+from app.services.anomaly_service import AnomalyService
+
+
+def main():
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        total = AnomalyService(db).detect_anomalies()
+        print(f"Alertas generadas: {total} ({time.perf_counter() - start:.2f}s)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
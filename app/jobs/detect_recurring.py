@@ -0,0 +1,22 @@
+"""
+Proceso por lotes: detección de pagos recurrentes para todos los usuarios
+
+Uso: python -m app.jobs.detect_recurring
+"""
+import time
+from app.core.database import SessionLocal
+from app.services.recurring_detection_service import RecurringDetectionService
+
+
+def main():
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        total = RecurringDetectionService(db).detect_recurring()
+        print(f"Sugerencias generadas: {total} ({time.perf_counter() - start:.2f}s)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Proceso en segundo plano: marcar como expiradas las invitaciones vencidas y
+eliminar las invitaciones cerradas más antiguas que el periodo de retención
+
+La API lo ejecuta periódicamente; también puede ejecutarse aparte.
+
+Uso: python -m app.jobs.expire_invitations
+"""
+from app.core.database import SessionLocal
+from app.core.scheduler import PeriodicJob
+from app.services.invitation_service import InvitationService
+
+# Segundos entre barridos
+SWEEP_INTERVAL = 15 * 60
+
+
+def sweep_invitations() -> tuple:
+    db = SessionLocal()
+    try:
+        service = InvitationService(db)
+        return service.expire_invitations(), service.purge_closed_invitations()
+    finally:
+        db.close()
+
+
+invitation_sweeper = PeriodicJob("invitaciones vencidas", sweep_invitations, SWEEP_INTERVAL)
+
+
+def main():
+    expired, purged = sweep_invitations()
+    print(f"Invitaciones expiradas: {expired}, eliminadas: {purged}")
+
+
+if __name__ == "__main__":
+    main()
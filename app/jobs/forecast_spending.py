@@ -0,0 +1,22 @@
+"""
+Proceso por lotes: pronóstico del gasto mensual por categoría para todos los usuarios
+
+Uso: python -m app.jobs.forecast_spending
+"""
+import time
+from app.core.database import SessionLocal
+from app.services.forecast_service import ForecastService
+
+
+def main():
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        total = ForecastService(db).generate_forecasts()
+        print(f"Pronósticos generados: {total} ({time.perf_counter() - start:.2f}s)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Proceso en segundo plano: ejecutar las eliminaciones de grupos y cuentas solicitadas
+
+La API lo ejecuta periódicamente (y al recibir una solicitud); también puede
+ejecutarse aparte, incluso en varios procesos a la vez.
+
+Uso: python -m app.jobs.process_deletions
+"""
+from app.core.database import SessionLocal
+from app.core.scheduler import PeriodicJob
+from app.services.deletion_service import DeletionService
+
+# Segundos entre revisiones de la cola cuando no hay solicitudes nuevas
+POLL_INTERVAL = 10
+
+
+def process_deletions() -> int:
+    db = SessionLocal()
+    try:
+        return DeletionService(db).process_pending()
+    finally:
+        db.close()
+
+
+deletion_worker = PeriodicJob("eliminaciones", process_deletions, POLL_INTERVAL)
+
+
+def main():
+    total = process_deletions()
+    print(f"Eliminaciones procesadas: {total}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""
+Proceso por lotes: verificar que el monto acumulado y el número de aportes de cada
+meta coinciden con sus aportes y corregir las diferencias
+
+Uso: python -m app.jobs.reconcile_goal_totals
+"""
+from app.core.database import SessionLocal
+from app.services.goal_service import GoalService
+
+
+def main():
+    db = SessionLocal()
+    try:
+        deltas = GoalService(db).reconcile_accumulated()
+        for goal_id, (monto, cantidad) in sorted(deltas.items()):
+            print(f"Meta {goal_id}: diferencia corregida de {monto} en monto y {cantidad} en aportes")
+        print(f"Metas corregidas: {len(deltas)}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""
+Proceso por lotes: recalcular el contador de miembros de los grupos
+
+Uso: python -m app.jobs.recount_group_members
+"""
+from app.core.database import SessionLocal
+from app.services.group_service import GroupService
+
+
+def main():
+    db = SessionLocal()
+    try:
+        total = GroupService(db).recount_members()
+        print(f"Grupos corregidos: {total}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,11 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.database import engine, Base
 from app.core.config import settings
-from app.controllers import auth_controller, user_controller, income_controller, category_controller, expense_controller, group_controller, invitation_controller, goal_controller, goal_contribution_controller
+from app.core.events import group_event_hub
+from app.core.qr import qr_renderer
+from app.jobs.expire_invitations import invitation_sweeper
+from app.jobs.process_deletions import deletion_worker
+from app.controllers import auth_controller, user_controller, income_controller, category_controller, expense_controller, group_controller, invitation_controller, goal_controller, goal_contribution_controller, budget_controller, ai_history_controller, deletion_controller, contribution_rule_controller
 
 # Crear la aplicación FastAPI
 app = FastAPI(
@@ -23,10 +27,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Crear tablas en la base de datos
+# Crear tablas en la base de datos e iniciar la escucha de eventos de grupo
+# y las tareas en segundo plano (eliminaciones y barrido de invitaciones)
 @app.on_event("startup")
 async def startup_event():
     Base.metadata.create_all(bind=engine)
+    await group_event_hub.start()
+    await deletion_worker.start()
+    await invitation_sweeper.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await deletion_worker.stop()
+    await invitation_sweeper.stop()
+    await group_event_hub.stop()
+    qr_renderer.shutdown()
 
 # Incluir controladores (routers)
 app.include_router(auth_controller.router, prefix="/api/auth", tags=["autenticación"])
@@ -38,6 +53,10 @@ app.include_router(group_controller.router, prefix="/api/groups", tags=["grupos"
 app.include_router(invitation_controller.router, prefix="/api/invitations", tags=["invitaciones"])
 app.include_router(goal_controller.router, prefix="/api/goals", tags=["metas"])
 app.include_router(goal_contribution_controller.router, prefix="/api/goal-contributions", tags=["aportes-metas"])
+app.include_router(contribution_rule_controller.router, prefix="/api/contribution-rules", tags=["reglas-aportes"])
+app.include_router(budget_controller.router, prefix="/api/budgets", tags=["presupuestos"])
+app.include_router(ai_history_controller.router, prefix="/api/ai-history", tags=["historial-ai"])
+app.include_router(deletion_controller.router, prefix="/api/deletions", tags=["eliminaciones"])
 
 @app.get("/")
 async def root():
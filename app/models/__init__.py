@@ -1,7 +1,7 @@
 # Paquete de modelos
 from .user import Usuario, TipoUsuario
 from .group import Grupo
-from .expense import Gasto, MetodoPago
+from .expense import Gasto, MetodoPago, TipoDivision
 from .income import Ingreso
 from .goal import Meta, EstadoMeta
 from .category import Categoria, TipoCategoria
@@ -9,17 +9,29 @@ from .ai_history import HistorialAI, TipoHistorial
 from .goal_contribution import AporteMeta
 from .user_group import UsuarioGrupo, RolGrupo
 from .invitation import Invitacion, EstadoInvitacion
+from .budget import Presupuesto
+from .expense_split import DivisionGasto
+from .group_balance import BalanceGrupo
+from .group_activity import ActividadGrupo
+from .deletion import Eliminacion, EntidadEliminacion, EstadoEliminacion
+from .contribution_rule import ReglaAporte, TipoRegla
 
 # Exportar todas las clases para que estén disponibles
 __all__ = [
     'Usuario', 'TipoUsuario',
     'Grupo',
-    'Gasto', 'MetodoPago',
+    'Gasto', 'MetodoPago', 'TipoDivision',
     'Ingreso',
     'Meta', 'EstadoMeta',
     'Categoria', 'TipoCategoria',
     'HistorialAI', 'TipoHistorial',
     'AporteMeta',
     'UsuarioGrupo', 'RolGrupo',
-    'Invitacion', 'EstadoInvitacion'
+    'Invitacion', 'EstadoInvitacion',
+    'Presupuesto',
+    'DivisionGasto',
+    'BalanceGrupo',
+    'ActividadGrupo',
+    'Eliminacion', 'EntidadEliminacion', 'EstadoEliminacion',
+    'ReglaAporte', 'TipoRegla'
 ]
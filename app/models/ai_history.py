@@ -1,7 +1,7 @@
 """
 Modelo de HistorialAI
 """
-from sqlalchemy import Column, Integer, ForeignKey, Text, DateTime, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -20,6 +20,12 @@ class HistorialAI(Base):
     tipo = Column(Enum(TipoHistorial))
     contenido = Column(Text, nullable=False)
     fecha = Column(DateTime, default=func.now())
+    # Proceso que generó la entrada (p. ej. "anomalia_gasto"); NULL para entradas manuales
+    origen = Column(String(50))
     
     # Relaciones
     usuario = relationship("Usuario", back_populates="historial_ai")
+
+    __table_args__ = (
+        Index("idx_historial_ai_usuario_origen", "id_usuario", "origen", "fecha"),
+    )
@@ -0,0 +1,28 @@
+"""
+Modelo de Presupuesto
+"""
+from sqlalchemy import Column, Integer, Date, ForeignKey, DECIMAL, Index
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+class Presupuesto(Base):
+    __tablename__ = "presupuestos"
+
+    id_presupuesto = Column(Integer, primary_key=True, index=True)
+    id_categoria = Column(Integer, ForeignKey("categorias.id_categoria", ondelete="CASCADE"), nullable=False)
+    id_usuario = Column(Integer, ForeignKey("usuarios.id_usuario", ondelete="CASCADE"), nullable=False)
+    id_grupo = Column(Integer, ForeignKey("grupos.id_grupo", ondelete="CASCADE"))
+    monto_limite = Column(DECIMAL(12, 2), nullable=False)
+    # Contador de gasto mantenido por ExpenseService en cada escritura
+    monto_gastado = Column(DECIMAL(12, 2), nullable=False, default=0)
+    fecha_inicio = Column(Date, nullable=False)
+    fecha_fin = Column(Date, nullable=False)
+
+    # Relaciones
+    categoria = relationship("Categoria", back_populates="presupuestos")
+    usuario = relationship("Usuario", back_populates="presupuestos")
+    grupo = relationship("Grupo", back_populates="presupuestos")
+
+    __table_args__ = (
+        Index("idx_presupuestos_categoria_periodo", "id_categoria", "fecha_inicio", "fecha_fin"),
+    )
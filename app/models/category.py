@@ -25,3 +25,4 @@ class Categoria(Base):
     usuario = relationship("Usuario", back_populates="categorias_personales")
     gastos = relationship("Gasto", back_populates="categoria")
     ingresos = relationship("Ingreso", back_populates="categoria")
+    presupuestos = relationship("Presupuesto", back_populates="categoria", passive_deletes=True)
@@ -0,0 +1,31 @@
+"""
+Modelo de ReglaAporte
+"""
+from sqlalchemy import Column, Integer, ForeignKey, DECIMAL, Boolean, DateTime, Enum, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+class TipoRegla(str, enum.Enum):
+    # valor: porcentaje (0-100] de cada ingreso
+    porcentaje_ingreso = "porcentaje_ingreso"
+    # valor: monto fijo por ingreso (nunca más que el ingreso)
+    monto_fijo_ingreso = "monto_fijo_ingreso"
+    # valor: unidad de redondeo; se aporta la diferencia hasta el siguiente múltiplo del gasto
+    redondeo_gasto = "redondeo_gasto"
+
+class ReglaAporte(Base):
+    __tablename__ = "reglas_aportes"
+
+    id_regla = Column(Integer, primary_key=True, index=True)
+    id_usuario = Column(Integer, ForeignKey("usuarios.id_usuario", ondelete="CASCADE"), nullable=False)
+    id_meta = Column(Integer, ForeignKey("metas.id_meta", ondelete="CASCADE"), nullable=False)
+    tipo = Column(Enum(TipoRegla), nullable=False)
+    valor = Column(DECIMAL(12, 2), nullable=False)
+    activa = Column(Boolean, nullable=False, default=True)
+    fecha_creacion = Column(DateTime, default=func.now())
+
+    __table_args__ = (
+        # Reglas de un usuario que se evalúan al registrar sus ingresos y gastos
+        Index("idx_reglas_aportes_usuario_tipo", "id_usuario", "tipo"),
+    )
@@ -0,0 +1,42 @@
+"""
+Modelo de Eliminacion
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, Index, text
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+class EntidadEliminacion(str, enum.Enum):
+    grupo = "grupo"
+    usuario = "usuario"
+
+class EstadoEliminacion(str, enum.Enum):
+    pendiente = "pendiente"
+    en_proceso = "en_proceso"
+    completada = "completada"
+    error = "error"
+
+class Eliminacion(Base):
+    __tablename__ = "eliminaciones"
+
+    id_eliminacion = Column(Integer, primary_key=True)
+    entidad = Column(Enum(EntidadEliminacion), nullable=False)
+    id_entidad = Column(Integer, nullable=False)
+    # Sin clave foránea: el solicitante puede ser el propio usuario eliminado
+    id_solicitante = Column(Integer)
+    estado = Column(Enum(EstadoEliminacion), nullable=False, default=EstadoEliminacion.pendiente)
+    # Tabla que se está vaciando y filas eliminadas hasta ahora
+    paso = Column(String(50))
+    filas_eliminadas = Column(Integer, nullable=False, default=0)
+    error = Column(Text)
+    fecha_solicitud = Column(DateTime, nullable=False, default=func.now())
+    # Se renueva en cada lote; sirve para retomar trabajos de un proceso que se detuvo
+    fecha_actualizacion = Column(DateTime, nullable=False, default=func.now())
+    fecha_fin = Column(DateTime)
+
+    __table_args__ = (
+        Index(
+            "idx_eliminaciones_pendientes", "fecha_solicitud",
+            postgresql_where=text("estado IN ('pendiente', 'en_proceso')")
+        ),
+    )
@@ -1,10 +1,14 @@
 """
 Modelo de Gasto
 """
-from sqlalchemy import Column, Integer, String, Text, Boolean, Date, ForeignKey, DECIMAL, Enum
+from sqlalchemy import Column, Integer, String, Text, Boolean, Date, ForeignKey, DECIMAL, Enum, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from decimal import Decimal
 import enum
+import hashlib
+import re
+import unicodedata
 
 class MetodoPago(str, enum.Enum):
     efectivo = "efectivo"
@@ -12,6 +16,17 @@ class MetodoPago(str, enum.Enum):
     transferencia = "transferencia"
     otro = "otro"
 
+class TipoDivision(str, enum.Enum):
+    igual = "igual"
+    porcentaje = "porcentaje"
+    exacto = "exacto"
+
+# Palabras que varían entre cargos de un mismo concepto y no deben distinguirlos
+PALABRAS_IGNORADAS = {
+    'enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio', 'julio', 'agosto',
+    'septiembre', 'setiembre', 'octubre', 'noviembre', 'diciembre'
+}
+
 class Gasto(Base):
     __tablename__ = "gastos"
     
@@ -25,8 +40,33 @@ class Gasto(Base):
     id_categoria = Column(Integer, ForeignKey("categorias.id_categoria"))
     id_usuario = Column(Integer, ForeignKey("usuarios.id_usuario"), nullable=False)
     id_grupo = Column(Integer, ForeignKey("grupos.id_grupo"))
+    # Hash de (usuario, fecha, monto, descripción normalizada) para detectar duplicados
+    hash_contenido = Column(String(64))
+    # Forma en que se repartió un gasto de grupo (NULL si no está dividido)
+    tipo_division = Column(Enum(TipoDivision))
     
     # Relaciones
     categoria = relationship("Categoria", back_populates="gastos")
     usuario = relationship("Usuario", back_populates="gastos")
     grupo = relationship("Grupo", back_populates="gastos")
+    divisiones = relationship("DivisionGasto", back_populates="gasto", passive_deletes=True)
+
+    __table_args__ = (
+        Index("idx_gastos_usuario_hash", "id_usuario", "hash_contenido"),
+        Index("idx_gastos_grupo_fecha", "id_grupo", "fecha"),
+    )
+
+    @staticmethod
+    def normalizar_descripcion(descripcion: str) -> str:
+        """Normalizar una descripción para comparar gastos (minúsculas, sin tildes, dígitos, signos ni meses)"""
+        texto = unicodedata.normalize('NFKD', descripcion or '')
+        texto = ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+        texto = re.sub(r'[^a-z ]+', ' ', texto)
+        return ' '.join(p for p in texto.split() if p not in PALABRAS_IGNORADAS)
+
+    @staticmethod
+    def calcular_hash(id_usuario: int, fecha, monto, descripcion: str) -> str:
+        """Calcular el hash de contenido que identifica gastos duplicados"""
+        monto_normalizado = Decimal(str(monto)).quantize(Decimal('0.01'))
+        clave = f"{id_usuario}|{fecha.isoformat()}|{monto_normalizado}|{Gasto.normalizar_descripcion(descripcion)}"
+        return hashlib.sha256(clave.encode('utf-8')).hexdigest()
@@ -0,0 +1,23 @@
+"""
+Modelo de DivisionGasto
+"""
+from sqlalchemy import Column, Integer, ForeignKey, DECIMAL, UniqueConstraint
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+class DivisionGasto(Base):
+    __tablename__ = "divisiones_gastos"
+
+    id_division = Column(Integer, primary_key=True, index=True)
+    id_gasto = Column(Integer, ForeignKey("gastos.id_gasto", ondelete="CASCADE"), nullable=False)
+    id_usuario = Column(Integer, ForeignKey("usuarios.id_usuario", ondelete="CASCADE"), nullable=False)
+    monto = Column(DECIMAL(12, 2), nullable=False)
+    porcentaje = Column(DECIMAL(5, 2))
+
+    # Relaciones
+    gasto = relationship("Gasto", back_populates="divisiones")
+    usuario = relationship("Usuario")
+
+    __table_args__ = (
+        UniqueConstraint("id_gasto", "id_usuario", name="uq_divisiones_gastos_gasto_usuario"),
+    )
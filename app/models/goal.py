@@ -18,6 +18,8 @@ class Meta(Base):
     nombre = Column(String(100), nullable=False)
     monto_objetivo = Column(DECIMAL(12, 2), nullable=False)
     monto_acumulado = Column(DECIMAL(12, 2), default=0)
+    # Número de aportes; se mantiene junto con monto_acumulado al registrar aportes
+    total_aportes = Column(Integer, nullable=False, default=0)
     fecha_inicio = Column(Date)
     fecha_fin = Column(Date)
     estado = Column(Enum(EstadoMeta))
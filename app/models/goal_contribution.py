@@ -1,7 +1,7 @@
 """
 Modelo de AporteMeta
 """
-from sqlalchemy import Column, Integer, ForeignKey, Date, DECIMAL
+from sqlalchemy import Column, Integer, ForeignKey, Date, DECIMAL, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -14,7 +14,20 @@ class AporteMeta(Base):
     id_usuario = Column(Integer, ForeignKey("usuarios.id_usuario"), nullable=False)
     monto = Column(DECIMAL(12, 2), nullable=False)
     fecha = Column(Date, default=func.current_date())
+    # Ingreso o gasto que generó el aporte mediante una regla automática (NULL para aportes manuales)
+    id_ingreso = Column(Integer, ForeignKey("ingresos.id_ingreso", ondelete="SET NULL"))
+    id_gasto = Column(Integer, ForeignKey("gastos.id_gasto", ondelete="SET NULL"))
     
     # Relaciones
     meta = relationship("Meta", back_populates="aportes")
     usuario = relationship("Usuario", back_populates="aportes_metas")
+
+    __table_args__ = (
+        # Aportes de una meta por fecha: listados y fecha del último aporte
+        Index("idx_aportes_metas_meta_fecha", "id_meta", "fecha"),
+        # Listado paginado por cursor de los aportes de una meta
+        Index("idx_aportes_metas_meta_id", "id_meta", "id_aporte"),
+        # Aportes automáticos de un movimiento: se revierten al editarlo o eliminarlo
+        Index("idx_aportes_metas_ingreso", "id_ingreso", postgresql_where=text("id_ingreso IS NOT NULL")),
+        Index("idx_aportes_metas_gasto", "id_gasto", postgresql_where=text("id_gasto IS NOT NULL")),
+    )
@@ -1,7 +1,7 @@
 """
 Modelo de Grupo
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -14,6 +14,12 @@ class Grupo(Base):
     descripcion = Column(Text)
     fecha_creacion = Column(DateTime, default=func.now())
     creado_por = Column(Integer, ForeignKey("usuarios.id_usuario"), nullable=False)
+    # Se incrementa con cada cambio en los datos del grupo; sirve de clave para cachés
+    version_datos = Column(Integer, nullable=False, default=0)
+    # Número de miembros, mantenido al agregar o quitar miembros
+    total_miembros = Column(Integer, nullable=False, default=0)
+    # Marcado mientras un proceso en segundo plano elimina el grupo y sus datos
+    eliminando = Column(Boolean, nullable=False, default=False)
     
     # Relaciones
     creador = relationship("Usuario", back_populates="grupos_creados")
@@ -22,3 +28,4 @@ class Grupo(Base):
     metas_grupales = relationship("Meta", back_populates="grupo")
     usuarios_grupos = relationship("UsuarioGrupo", back_populates="grupo")
     invitaciones = relationship("Invitacion", back_populates="grupo")
+    presupuestos = relationship("Presupuesto", back_populates="grupo", passive_deletes=True)
@@ -0,0 +1,27 @@
+"""
+Modelo de ActividadGrupo
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class ActividadGrupo(Base):
+    __tablename__ = "actividad_grupo"
+
+    id_actividad = Column(Integer, primary_key=True)
+    id_grupo = Column(Integer, ForeignKey("grupos.id_grupo", ondelete="CASCADE"), nullable=False)
+    # Usuario que realizó la acción (NULL si ya no existe)
+    id_usuario = Column(Integer, ForeignKey("usuarios.id_usuario", ondelete="SET NULL"))
+    evento = Column(String(50), nullable=False)
+    # Datos del evento en JSON (ids, montos, descripciones)
+    datos = Column(Text, nullable=False)
+    fecha = Column(DateTime, nullable=False, default=func.now())
+
+    # Relaciones
+    grupo = relationship("Grupo")
+    usuario = relationship("Usuario")
+
+    __table_args__ = (
+        Index("idx_actividad_grupo_grupo_id", "id_grupo", "id_actividad"),
+    )
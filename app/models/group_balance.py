@@ -0,0 +1,19 @@
+"""
+Modelo de BalanceGrupo
+"""
+from sqlalchemy import Column, Integer, ForeignKey, DECIMAL
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+class BalanceGrupo(Base):
+    __tablename__ = "balances_grupos"
+
+    id_grupo = Column(Integer, ForeignKey("grupos.id_grupo", ondelete="CASCADE"), primary_key=True)
+    id_usuario = Column(Integer, ForeignKey("usuarios.id_usuario", ondelete="CASCADE"), primary_key=True)
+    # Totales mantenidos incrementalmente al crear, editar o eliminar gastos divididos
+    total_pagado = Column(DECIMAL(12, 2), nullable=False, default=0)
+    total_adeudado = Column(DECIMAL(12, 2), nullable=False, default=0)
+
+    # Relaciones
+    grupo = relationship("Grupo")
+    usuario = relationship("Usuario")
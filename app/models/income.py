@@ -1,7 +1,7 @@
 """
 Modelo de Ingreso
 """
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, DECIMAL
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, DECIMAL, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -21,3 +21,7 @@ class Ingreso(Base):
     categoria = relationship("Categoria", back_populates="ingresos")
     usuario = relationship("Usuario", back_populates="ingresos")
     grupo = relationship("Grupo", back_populates="ingresos")
+
+    __table_args__ = (
+        Index("idx_ingresos_grupo_fecha", "id_grupo", "fecha"),
+    )
@@ -1,7 +1,7 @@
 """
 Modelo de Invitación a Grupo
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Boolean, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -32,6 +32,14 @@ class Invitacion(Base):
     grupo = relationship("Grupo", back_populates="invitaciones")
     creador = relationship("Usuario", foreign_keys=[creado_por], back_populates="invitaciones_creadas")
     usuario_invitado = relationship("Usuario", foreign_keys=[id_usuario_invitado], back_populates="invitaciones_recibidas")
+
+    __table_args__ = (
+        # Solo las invitaciones pendientes que pueden vencer: lo que recorre el barrido de expiración
+        Index(
+            "idx_invitaciones_pendientes_expiracion", "fecha_expiracion",
+            postgresql_where=text("estado = 'pendiente' AND fecha_expiracion IS NOT NULL")
+        ),
+    )
     
     @staticmethod
     def generar_token() -> str:
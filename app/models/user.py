@@ -1,7 +1,7 @@
 """
 Modelo de Usuario
 """
-from sqlalchemy import Column, Integer, String, DateTime, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Enum, Boolean
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -22,6 +22,8 @@ class Usuario(Base):
     fecha_registro = Column(DateTime, default=func.now())
     foto_perfil = Column(String(255))
     tipo_usuario = Column(Enum(TipoUsuario), default=TipoUsuario.normal)
+    # Marcado mientras un proceso en segundo plano elimina la cuenta y sus datos
+    eliminando = Column(Boolean, nullable=False, default=False)
     
     # Relaciones
     grupos_creados = relationship("Grupo", back_populates="creador")
@@ -34,3 +36,4 @@ class Usuario(Base):
     usuarios_grupos = relationship("UsuarioGrupo", back_populates="usuario")
     invitaciones_creadas = relationship("Invitacion", foreign_keys="Invitacion.creado_por", back_populates="creador")
     invitaciones_recibidas = relationship("Invitacion", foreign_keys="Invitacion.id_usuario_invitado", back_populates="usuario_invitado")
+    presupuestos = relationship("Presupuesto", back_populates="usuario", passive_deletes=True)
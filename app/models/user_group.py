@@ -1,7 +1,7 @@
 """
 Modelo de UsuarioGrupo
 """
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -22,3 +22,7 @@ class UsuarioGrupo(Base):
     # Relaciones
     usuario = relationship("Usuario", back_populates="usuarios_grupos")
     grupo = relationship("Grupo", back_populates="usuarios_grupos")
+
+    __table_args__ = (
+        Index("idx_usuarios_grupos_grupo", "id_grupo", "fecha_union"),
+    )
@@ -0,0 +1,17 @@
+"""
+Esquemas para HistorialAI
+"""
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class HistorialAIResponse(BaseModel):
+    id_historial: int
+    tipo: Optional[str] = None
+    origen: Optional[str] = None
+    contenido: str
+    datos: Optional[dict] = None
+    fecha: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,43 @@
+"""
+Esquemas para Presupuesto
+"""
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date
+from decimal import Decimal
+
+class PresupuestoBase(BaseModel):
+    id_categoria: int
+    monto_limite: Decimal
+    fecha_inicio: date
+    fecha_fin: date
+
+class PresupuestoCreate(PresupuestoBase):
+    id_grupo: Optional[int] = None
+
+class PresupuestoResponse(PresupuestoBase):
+    id_presupuesto: int
+    monto_gastado: Decimal
+    id_usuario: int
+    id_grupo: Optional[int]
+
+    class Config:
+        from_attributes = True
+
+class PresupuestoUpdate(BaseModel):
+    id_categoria: Optional[int] = None
+    monto_limite: Optional[Decimal] = None
+    fecha_inicio: Optional[date] = None
+    fecha_fin: Optional[date] = None
+
+class PresupuestoEstadoResponse(BaseModel):
+    id_presupuesto: int
+    id_categoria: int
+    id_grupo: Optional[int] = None
+    fecha_inicio: date
+    fecha_fin: date
+    monto_limite: float
+    monto_gastado: float
+    disponible: float
+    porcentaje_usado: float
+    excedido: bool
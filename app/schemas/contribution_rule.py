@@ -0,0 +1,36 @@
+"""
+Esquemas para ReglaAporte
+"""
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional
+from datetime import datetime
+from decimal import Decimal
+
+class ReglaAporteBase(BaseModel):
+    id_meta: int
+    # porcentaje_ingreso, monto_fijo_ingreso o redondeo_gasto
+    tipo: str
+    # Porcentaje, monto fijo o unidad de redondeo según el tipo
+    valor: Decimal = Field(..., gt=0)
+
+class ReglaAporteCreate(ReglaAporteBase):
+    activa: bool = True
+
+    @model_validator(mode="after")
+    def check_valor(self):
+        if self.tipo == "porcentaje_ingreso" and self.valor > 100:
+            raise ValueError("El porcentaje debe estar entre 0 y 100")
+        return self
+
+class ReglaAporteUpdate(BaseModel):
+    valor: Optional[Decimal] = Field(None, gt=0)
+    activa: Optional[bool] = None
+
+class ReglaAporteResponse(ReglaAporteBase):
+    id_regla: int
+    id_usuario: int
+    activa: bool
+    fecha_creacion: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,21 @@
+"""
+Esquemas para Eliminacion
+"""
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class EliminacionResponse(BaseModel):
+    id_eliminacion: int
+    entidad: str
+    id_entidad: int
+    estado: str
+    # Tabla que se está vaciando y filas eliminadas hasta ahora
+    paso: Optional[str] = None
+    filas_eliminadas: int
+    error: Optional[str] = None
+    fecha_solicitud: datetime
+    fecha_fin: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -2,9 +2,10 @@
 Esquemas para Gasto
 """
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 from datetime import date
 from decimal import Decimal
+from app.schemas.expense_split import DivisionGastoCreate
 
 class GastoBase(BaseModel):
     descripcion: str
@@ -17,12 +18,15 @@ class GastoBase(BaseModel):
 class GastoCreate(GastoBase):
     id_categoria: Optional[int]
     id_grupo: Optional[int]
+    division: Optional[DivisionGastoCreate] = None  # Solo para gastos de grupo
 
 class GastoResponse(GastoBase):
     id_gasto: int
     id_categoria: Optional[int]
     id_usuario: int
     id_grupo: Optional[int]
+    tipo_division: Optional[str] = None
+    posible_duplicado: bool = False
     
     class Config:
         from_attributes = True
@@ -36,3 +40,13 @@ class GastoUpdate(BaseModel):
     recurrente: Optional[bool] = None
     id_categoria: Optional[int] = None
     id_grupo: Optional[int] = None
+    division: Optional[DivisionGastoCreate] = None
+
+class GastosDuplicadosResponse(BaseModel):
+    hash_contenido: str
+    id_grupo: Optional[int] = None
+    cantidad: int
+    gastos: List[GastoResponse]
+
+class FusionarDuplicadosRequest(BaseModel):
+    hashes: Optional[List[str]] = None  # Si se omite se fusionan todos los grupos
@@ -0,0 +1,44 @@
+"""
+Esquemas para DivisionGasto, BalanceGrupo y liquidación de grupos
+"""
+from pydantic import BaseModel
+from typing import Optional, List
+from decimal import Decimal
+
+class ParticipanteDivision(BaseModel):
+    id_usuario: int
+    porcentaje: Optional[Decimal] = None  # Requerido si la división es por porcentaje
+    monto: Optional[Decimal] = None  # Requerido si la división es exacta
+
+class DivisionGastoCreate(BaseModel):
+    tipo: str = "igual"  # igual, porcentaje o exacto
+    # Si se omite en una división igual se reparte entre todos los miembros del grupo
+    participantes: Optional[List[ParticipanteDivision]] = None
+
+class DivisionGastoResponse(BaseModel):
+    id_usuario: int
+    monto: Decimal
+    porcentaje: Optional[Decimal] = None
+
+    class Config:
+        from_attributes = True
+
+class BalanceMiembroResponse(BaseModel):
+    id_usuario: int
+    nombre: Optional[str] = None
+    total_pagado: float
+    total_adeudado: float
+    saldo: float  # Positivo: le deben; negativo: debe
+
+class TransferenciaResponse(BaseModel):
+    id_usuario_origen: int
+    nombre_origen: Optional[str] = None
+    id_usuario_destino: int
+    nombre_destino: Optional[str] = None
+    monto: float
+
+class LiquidacionGrupoResponse(BaseModel):
+    id_grupo: int
+    version_datos: int
+    total_transferencias: int
+    transferencias: List[TransferenciaResponse]
@@ -40,3 +40,25 @@ class MetaDetalleResponse(MetaResponse):
     class Config:
         from_attributes = True
 
+class MetaProgresoResponse(MetaResponse):
+    porcentaje_completado: float
+    faltante: Decimal
+    total_aportes: int
+    fecha_ultimo_aporte: Optional[date]
+
+class ProyeccionMetaResponse(BaseModel):
+    id_meta: int
+    faltante: float
+    # Historia usada: aporte y excedente (ingresos - gastos) mensual promedio y la
+    # fracción del excedente que se destina a la meta
+    meses_historial: int
+    aporte_mensual_promedio: float
+    excedente_mensual_promedio: float
+    tasa_ahorro: float
+    simulaciones: int
+    # Probabilidad de completar la meta antes de fecha_fin (None si no tiene fecha_fin)
+    probabilidad_en_plazo: Optional[float] = None
+    # Percentiles 50, 10 y 90 de la fecha de cumplimiento (None si es poco probable)
+    fecha_estimada: Optional[date] = None
+    fecha_optimista: Optional[date] = None
+    fecha_pesimista: Optional[date] = None
@@ -17,6 +17,9 @@ class AporteMetaResponse(AporteMetaBase):
     id_aporte: int
     id_meta: int
     id_usuario: int
+    # Movimiento que generó el aporte si vino de una regla automática
+    id_ingreso: Optional[int] = None
+    id_gasto: Optional[int] = None
     
     class Config:
         from_attributes = True
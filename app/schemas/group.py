@@ -1,9 +1,9 @@
 """
 Esquemas para Grupo
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 
 class GrupoBase(BaseModel):
     nombre: str
@@ -34,6 +34,15 @@ class MiembroGrupoResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class MiembrosLoteRequest(BaseModel):
+    usuarios: List[int] = Field(..., min_length=1, max_length=500)
+    # Solo se usa al agregar o cambiar el rol: 'admin' o 'miembro'
+    rol: str = "miembro"
+
+class MiembrosLoteResponse(BaseModel):
+    procesados: List[int]
+    omitidos: List[int]
+
 class GrupoDetalleResponse(GrupoResponse):
     creador_nombre: Optional[str] = None
     total_miembros: int = 0
@@ -42,3 +51,56 @@ class GrupoDetalleResponse(GrupoResponse):
     class Config:
         from_attributes = True
 
+
+class GastoMiembroResponse(BaseModel):
+    id_usuario: int
+    nombre: str
+    rol: Optional[str] = None
+    total_gastado: float
+    cantidad_gastos: int
+
+class ProgresoMetaResponse(BaseModel):
+    id_meta: int
+    nombre: str
+    monto_objetivo: float
+    monto_acumulado: float
+    porcentaje_completado: float
+    estado: Optional[str] = None
+    fecha_fin: Optional[date] = None
+
+class MovimientoRecienteResponse(BaseModel):
+    tipo: str
+    id: int
+    descripcion: str
+    monto: float
+    fecha: date
+    id_usuario: int
+
+class GrupoDashboardResponse(BaseModel):
+    id_grupo: int
+    nombre: str
+    total_miembros: int
+    total_gastos: float
+    cantidad_gastos: int
+    total_ingresos: float
+    cantidad_ingresos: int
+    balance: float
+    miembros: List[GastoMiembroResponse]
+    metas: List[ProgresoMetaResponse]
+    movimientos_recientes: List[MovimientoRecienteResponse]
+
+class EstadisticaMiembroResponse(BaseModel):
+    id_usuario: int
+    nombre: str
+    total_gastado: float
+    total_ingresado: float
+    total_aportado: float
+    # Porcentaje sobre el total del grupo (None si el grupo no tiene movimientos de ese tipo)
+    participacion_gasto: Optional[float] = None
+    participacion_ingreso: Optional[float] = None
+    participacion_aportes: Optional[float] = None
+    ranking_gasto: int
+    gasto_reciente: float
+    gasto_anterior: float
+    # Variación porcentual del gasto reciente frente al periodo anterior (None sin gasto anterior)
+    tendencia_gasto: Optional[float] = None
@@ -0,0 +1,19 @@
+"""
+Esquemas para ActividadGrupo
+"""
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+class ActividadGrupoResponse(BaseModel):
+    id_actividad: int
+    evento: str
+    id_usuario: Optional[int] = None
+    nombre_usuario: Optional[str] = None
+    datos: Dict[str, Any]
+    fecha: datetime
+
+class FeedActividadResponse(BaseModel):
+    actividades: List[ActividadGrupoResponse]
+    # Pasar como `before_id` para obtener la página siguiente (None si no hay más)
+    siguiente_cursor: Optional[int] = None
@@ -1,8 +1,8 @@
 """
 Esquemas para Invitación
 """
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
 from datetime import datetime
 
 class InvitacionBase(BaseModel):
@@ -12,6 +12,19 @@ class InvitacionBase(BaseModel):
 class InvitacionCreate(InvitacionBase):
     dias_expiracion: Optional[int] = 7  # Por defecto 7 días
 
+class InvitacionesLoteCreate(BaseModel):
+    id_grupo: int
+    # Número de links anónimos, o una invitación por cada usuario indicado
+    cantidad: Optional[int] = Field(None, ge=1, le=500)
+    usuarios_invitados: Optional[List[int]] = Field(None, min_length=1, max_length=500)
+    dias_expiracion: Optional[int] = 7
+
+    @model_validator(mode="after")
+    def check_destinatarios(self):
+        if self.cantidad is None and not self.usuarios_invitados:
+            raise ValueError("Indica 'cantidad' o 'usuarios_invitados'")
+        return self
+
 class InvitacionResponse(BaseModel):
     id_invitacion: int
     id_grupo: int
@@ -36,9 +49,3 @@ class InvitacionDetalleResponse(InvitacionResponse):
 
 class AceptarInvitacionRequest(BaseModel):
     token: str
-
-class QRResponse(BaseModel):
-    qr_code_base64: str
-    link_invitacion: str
-    token: str
-
@@ -0,0 +1,107 @@
+"""
+Servicio para detección de anomalías de gasto
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from typing import List, Optional
+from datetime import date, datetime
+import json
+import numpy as np
+from app.models.ai_history import HistorialAI, TipoHistorial
+from app.models.category import Categoria
+from app.services.spending_series_service import SpendingSeriesService, month_start
+
+ORIGEN_ANOMALIA = "anomalia_gasto"
+
+# Constante que hace la MAD comparable con la desviación estándar de una normal
+MAD_SCALE = 0.6745
+
+# sqrt(pi/2): lleva la desviación absoluta media a la escala de la desviación estándar de una normal
+MEAN_AD_SCALE = 1.2533
+
+
+class AnomalyService:
+    """Servicio para detectar gastos atípicos y registrarlos como alertas"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def detect_anomalies(
+        self,
+        months: int = 12,
+        threshold: float = 3.5,
+        min_history: int = 3,
+        end_date: Optional[date] = None
+    ) -> int:
+        """
+        Marcar el gasto del mes actual que se aleja de la historia del usuario en esa categoría.
+
+        Se calcula el z-score robusto (mediana y MAD) de todas las series en una sola
+        pasada vectorizada y se insertan las alertas en bloque. Las alertas se fechan al
+        inicio del mes analizado, así volver a analizar un mes (también uno pasado con
+        `end_date`) reemplaza sus alertas en lugar de duplicarlas.
+        """
+        end_date = end_date or date.today()
+        keys, matrix, periods = SpendingSeriesService(self.db).load_monthly_category_series(months, end_date)
+
+        history = matrix[:, :-1]
+        current = matrix[:, -1]
+
+        median = np.median(history, axis=1)
+        mad = np.median(np.abs(history - median[:, None]), axis=1)
+        # Si la MAD es 0 (gasto casi constante) se usa la desviación absoluta media
+        mean_ad = np.mean(np.abs(history - median[:, None]), axis=1) * MEAN_AD_SCALE
+        scale = np.where(mad > 0, mad / MAD_SCALE, mean_ad)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            score = np.where(scale > 0, (current - median) / scale, 0.0)
+
+        active_months = np.count_nonzero(history, axis=1)
+        flagged = np.flatnonzero((score > threshold) & (current > 0) & (active_months >= min_history))
+
+        period_start = datetime.combine(periods[-1], datetime.min.time())
+        period_end = datetime.combine(month_start(periods[-1], 1), datetime.min.time())
+        self.db.query(HistorialAI).filter(
+            HistorialAI.origen == ORIGEN_ANOMALIA,
+            HistorialAI.fecha >= period_start,
+            HistorialAI.fecha < period_end
+        ).delete(synchronize_session=False)
+
+        if len(flagged):
+            category_ids = {int(category_id) for category_id in keys[flagged, 1]}
+            names = dict(self.db.query(Categoria.id_categoria, Categoria.nombre).filter(
+                Categoria.id_categoria.in_(category_ids)
+            ).all())
+
+            periodo = periods[-1].strftime('%Y-%m')
+            rows = []
+            for i in flagged:
+                user_id, category_id = int(keys[i, 0]), int(keys[i, 1])
+                nombre = names.get(category_id, "sin nombre")
+                rows.append({
+                    "id_usuario": user_id,
+                    "tipo": TipoHistorial.alerta,
+                    "origen": ORIGEN_ANOMALIA,
+                    "fecha": period_start,
+                    "contenido": json.dumps({
+                        "id_categoria": category_id,
+                        "categoria": nombre,
+                        "periodo": periodo,
+                        "monto": round(float(current[i]), 2),
+                        "mediana": round(float(median[i]), 2),
+                        "puntaje": round(float(score[i]), 2),
+                        "mensaje": f"Tu gasto en {nombre} este mes ({current[i]:.2f}) es inusualmente alto "
+                                   f"frente a tu mediana mensual ({median[i]:.2f})"
+                    }, ensure_ascii=False)
+                })
+            self.db.execute(insert(HistorialAI), rows)
+
+        self.db.commit()
+        return len(flagged)
+
+    def get_user_alerts(self, user_id: int, skip: int = 0, limit: int = 100) -> List[HistorialAI]:
+        """Obtener las alertas de gasto de un usuario, de la más reciente a la más antigua"""
+        return self.db.query(HistorialAI).filter(
+            HistorialAI.id_usuario == user_id,
+            HistorialAI.tipo == TipoHistorial.alerta
+        ).order_by(HistorialAI.fecha.desc(), HistorialAI.id_historial.desc()).offset(skip).limit(limit).all()
@@ -0,0 +1,205 @@
+"""
+Servicio para gestión de presupuestos
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import func, update
+from typing import List, Optional
+from datetime import date
+from decimal import Decimal
+from app.models.budget import Presupuesto
+from app.models.expense import Gasto
+from app.models.user_group import UsuarioGrupo
+from app.schemas.budget import PresupuestoCreate, PresupuestoUpdate
+from app.services.group_service import GroupService
+
+
+class BudgetService:
+    """Servicio para operaciones de presupuestos"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_budget(self, budget_data: PresupuestoCreate, user_id: int) -> Presupuesto:
+        """Crear nuevo presupuesto con su contador de gasto inicializado"""
+        if budget_data.fecha_fin < budget_data.fecha_inicio:
+            raise ValueError("La fecha de fin debe ser posterior a la fecha de inicio")
+
+        db_budget = Presupuesto(
+            id_categoria=budget_data.id_categoria,
+            id_usuario=user_id,
+            id_grupo=budget_data.id_grupo,
+            monto_limite=budget_data.monto_limite,
+            fecha_inicio=budget_data.fecha_inicio,
+            fecha_fin=budget_data.fecha_fin
+        )
+        # Única suma sobre gastos: a partir de aquí el contador se mantiene incrementalmente
+        db_budget.monto_gastado = self._sum_matching_expenses(db_budget)
+
+        self.db.add(db_budget)
+        self.db.commit()
+        self.db.refresh(db_budget)
+        return db_budget
+
+    def get_budget_by_id(self, budget_id: int, user_id: int) -> Optional[Presupuesto]:
+        """Obtener presupuesto por ID (del usuario o de un grupo al que pertenece)"""
+        budget = self.db.query(Presupuesto).filter(
+            Presupuesto.id_presupuesto == budget_id
+        ).first()
+
+        if not budget:
+            return None
+
+        # Si es presupuesto personal del usuario
+        if budget.id_usuario == user_id and not budget.id_grupo:
+            return budget
+
+        # Si es presupuesto de grupo, verificar que el usuario pertenece al grupo
+        if budget.id_grupo and self._is_user_in_group(budget.id_grupo, user_id):
+            return budget
+
+        return None
+
+    def get_budgets_by_user(self, user_id: int, skip: int = 0, limit: int = 100, personal_only: bool = False) -> List[Presupuesto]:
+        """Obtener presupuestos creados por un usuario (personales o todos incluyendo grupos)"""
+        query = self.db.query(Presupuesto).filter(
+            Presupuesto.id_usuario == user_id
+        )
+
+        if personal_only:
+            query = query.filter(Presupuesto.id_grupo.is_(None))
+
+        return query.offset(skip).limit(limit).all()
+
+    def get_budgets_by_group(self, group_id: int, user_id: int, skip: int = 0, limit: int = 100) -> List[Presupuesto]:
+        """Obtener presupuestos de un grupo (solo si el usuario pertenece al grupo)"""
+        if not self._is_user_in_group(group_id, user_id):
+            return []
+
+        return self.db.query(Presupuesto).filter(
+            Presupuesto.id_grupo == group_id
+        ).offset(skip).limit(limit).all()
+
+    def update_budget(self, budget_id: int, budget_data: PresupuestoUpdate, user_id: int) -> Optional[Presupuesto]:
+        """Actualizar presupuesto (del usuario o de un grupo al que pertenece)"""
+        budget = self.get_budget_by_id(budget_id, user_id)
+        if not budget:
+            return None
+
+        update_data = budget_data.dict(exclude_unset=True)
+        for field, value in update_data.items():
+            setattr(budget, field, value)
+
+        if budget.fecha_fin < budget.fecha_inicio:
+            self.db.rollback()
+            raise ValueError("La fecha de fin debe ser posterior a la fecha de inicio")
+
+        # Si cambia lo que se cuenta, el contador se vuelve a sembrar una sola vez
+        if {'id_categoria', 'fecha_inicio', 'fecha_fin'} & update_data.keys():
+            budget.monto_gastado = self._sum_matching_expenses(budget)
+
+        self.db.commit()
+        self.db.refresh(budget)
+        return budget
+
+    def delete_budget(self, budget_id: int, user_id: int) -> bool:
+        """Eliminar presupuesto"""
+        budget = self.get_budget_by_id(budget_id, user_id)
+        if not budget:
+            return False
+
+        self.db.delete(budget)
+        self.db.commit()
+        return True
+
+    def get_budget_status(self, budget_id: int, user_id: int) -> Optional[dict]:
+        """Obtener estado de un presupuesto leyendo su contador"""
+        budget = self.get_budget_by_id(budget_id, user_id)
+        if not budget:
+            return None
+
+        return self._build_status(budget)
+
+    def get_active_budgets_status(self, user_id: int, on_date: Optional[date] = None) -> List[dict]:
+        """Obtener estado de los presupuestos vigentes del usuario (personales y de sus grupos)"""
+        on_date = on_date or date.today()
+        user_groups = self.db.query(UsuarioGrupo.id_grupo).filter(
+            UsuarioGrupo.id_usuario == user_id
+        )
+
+        budgets = self.db.query(Presupuesto).filter(
+            ((Presupuesto.id_usuario == user_id) & Presupuesto.id_grupo.is_(None))
+            | Presupuesto.id_grupo.in_(user_groups),
+            Presupuesto.fecha_inicio <= on_date,
+            Presupuesto.fecha_fin >= on_date
+        ).all()
+
+        return [self._build_status(budget) for budget in budgets]
+
+    def apply_expense_delta(self, expense: Gasto, delta: Decimal):
+        """
+        Sumar `delta` al contador de los presupuestos que cubren el gasto.
+        Se ejecuta como UPDATE atómico dentro de la transacción del gasto; no hace commit.
+        """
+        if not expense.id_categoria or not delta:
+            return
+
+        query = update(Presupuesto).where(
+            Presupuesto.id_categoria == expense.id_categoria,
+            Presupuesto.fecha_inicio <= expense.fecha,
+            Presupuesto.fecha_fin >= expense.fecha
+        )
+
+        if expense.id_grupo:
+            query = query.where(Presupuesto.id_grupo == expense.id_grupo)
+        else:
+            query = query.where(
+                Presupuesto.id_grupo.is_(None),
+                Presupuesto.id_usuario == expense.id_usuario
+            )
+
+        self.db.execute(
+            query.values(monto_gastado=Presupuesto.monto_gastado + delta),
+            execution_options={"synchronize_session": False}
+        )
+
+    def _sum_matching_expenses(self, budget: Presupuesto) -> Decimal:
+        """Sumar los gastos existentes que cubre un presupuesto"""
+        query = self.db.query(func.sum(Gasto.monto)).filter(
+            Gasto.id_categoria == budget.id_categoria,
+            Gasto.fecha >= budget.fecha_inicio,
+            Gasto.fecha <= budget.fecha_fin
+        )
+
+        if budget.id_grupo:
+            query = query.filter(Gasto.id_grupo == budget.id_grupo)
+        else:
+            query = query.filter(
+                Gasto.id_grupo.is_(None),
+                Gasto.id_usuario == budget.id_usuario
+            )
+
+        result = query.scalar()
+        return Decimal(str(result)) if result else Decimal('0.00')
+
+    def _build_status(self, budget: Presupuesto) -> dict:
+        """Construir el estado de un presupuesto a partir de sus columnas"""
+        limite = budget.monto_limite or Decimal('0.00')
+        gastado = budget.monto_gastado or Decimal('0.00')
+        porcentaje = float((gastado / limite) * 100) if limite > 0 else 0.0
+
+        return {
+            "id_presupuesto": budget.id_presupuesto,
+            "id_categoria": budget.id_categoria,
+            "id_grupo": budget.id_grupo,
+            "fecha_inicio": budget.fecha_inicio,
+            "fecha_fin": budget.fecha_fin,
+            "monto_limite": float(limite),
+            "monto_gastado": float(gastado),
+            "disponible": float(limite - gastado) if gastado < limite else 0.0,
+            "porcentaje_usado": round(porcentaje, 2),
+            "excedido": gastado > limite
+        }
+
+    def _is_user_in_group(self, group_id: int, user_id: int) -> bool:
+        """Verificar si un usuario pertenece a un grupo (que no esté en proceso de eliminación)"""
+        return GroupService(self.db).is_user_in_group(group_id, user_id)
@@ -0,0 +1,260 @@
+"""
+Servicio para reglas de aportes automáticos a metas
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, delete, case, cast, func, literal, null, or_, union_all, true, Integer
+from typing import Dict, List, Optional, Tuple
+from collections import defaultdict
+from decimal import Decimal
+from app.models.contribution_rule import ReglaAporte, TipoRegla
+from app.models.expense import Gasto
+from app.models.goal import Meta, EstadoMeta
+from app.models.goal_contribution import AporteMeta
+from app.models.income import Ingreso
+from app.schemas.contribution_rule import ReglaAporteCreate, ReglaAporteUpdate
+from app.services.goal_service import GoalService
+from app.services.group_activity_service import GroupActivityService
+
+INCOME_RULES = (TipoRegla.porcentaje_ingreso, TipoRegla.monto_fijo_ingreso)
+
+# Clave de Session.info con los ingresos y gastos creados en la transacción actual
+PENDING_KEY = "reglas_aportes_pendientes"
+
+
+class ContributionRuleService:
+    """Servicio para definir reglas de aportes y ejecutarlas sobre ingresos y gastos nuevos"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_rule(self, rule_data: ReglaAporteCreate, user_id: int) -> ReglaAporte:
+        """Crear una regla sobre una meta activa a la que el usuario tiene acceso"""
+        try:
+            tipo = TipoRegla(rule_data.tipo)
+        except ValueError:
+            raise ValueError("Tipo de regla inválido. Debe ser: porcentaje_ingreso, monto_fijo_ingreso o redondeo_gasto")
+
+        meta = GoalService(self.db).get_goal_by_id(rule_data.id_meta, user_id)
+        if not meta:
+            raise ValueError("Meta no encontrada")
+        if meta.estado != EstadoMeta.activa:
+            raise ValueError("Solo se pueden crear reglas para metas activas")
+
+        db_rule = ReglaAporte(
+            id_usuario=user_id,
+            id_meta=meta.id_meta,
+            tipo=tipo,
+            valor=rule_data.valor,
+            activa=rule_data.activa
+        )
+        self.db.add(db_rule)
+        self.db.commit()
+        self.db.refresh(db_rule)
+        return db_rule
+
+    def get_rule_by_id(self, rule_id: int, user_id: int) -> Optional[ReglaAporte]:
+        """Obtener una regla del usuario autenticado"""
+        return self.db.query(ReglaAporte).filter(
+            ReglaAporte.id_regla == rule_id,
+            ReglaAporte.id_usuario == user_id
+        ).first()
+
+    def get_rules_by_user(self, user_id: int, goal_id: Optional[int] = None) -> List[ReglaAporte]:
+        """Obtener las reglas del usuario, opcionalmente solo las de una meta"""
+        query = self.db.query(ReglaAporte).filter(ReglaAporte.id_usuario == user_id)
+        if goal_id is not None:
+            query = query.filter(ReglaAporte.id_meta == goal_id)
+        return query.order_by(ReglaAporte.id_regla).all()
+
+    def update_rule(self, rule_id: int, rule_data: ReglaAporteUpdate, user_id: int) -> Optional[ReglaAporte]:
+        """Cambiar el valor de una regla o activarla/desactivarla"""
+        rule = self.get_rule_by_id(rule_id, user_id)
+        if not rule:
+            return None
+
+        update_data = rule_data.dict(exclude_unset=True)
+        valor = update_data.get("valor")
+        if valor is not None and rule.tipo == TipoRegla.porcentaje_ingreso and valor > 100:
+            raise ValueError("El porcentaje debe estar entre 0 y 100")
+
+        for field, value in update_data.items():
+            if value is not None:
+                setattr(rule, field, value)
+
+        self.db.commit()
+        self.db.refresh(rule)
+        return rule
+
+    def delete_rule(self, rule_id: int, user_id: int) -> bool:
+        """Eliminar una regla (los aportes que ya generó se conservan)"""
+        rule = self.get_rule_by_id(rule_id, user_id)
+        if not rule:
+            return False
+
+        self.db.delete(rule)
+        self.db.commit()
+        return True
+
+    def apply_rules(self, income_ids: List[int], expense_ids: List[int]) -> Dict[int, Tuple[Decimal, int]]:
+        """
+        Generar los aportes de las reglas activas para los ingresos y gastos indicados con un
+        solo INSERT ... SELECT, y actualizar el acumulado de todas las metas afectadas con un
+        solo UPDATE. Cada regla aplica a los movimientos de su usuario en el mismo ámbito que
+        la meta (personales para metas personales, del grupo para metas grupales), solo
+        mientras la meta está activa. Cada aporte guarda el ingreso o gasto que lo generó.
+        Devuelve {id_meta: (monto, cantidad)}; no hace commit.
+        """
+        sources = []
+        if income_ids:
+            sources.append(self._rule_matches(
+                Ingreso, Ingreso.id_ingreso.in_(income_ids), ReglaAporte.tipo.in_(INCOME_RULES),
+                Ingreso.id_ingreso, cast(null(), Integer),
+                case(
+                    (
+                        ReglaAporte.tipo == TipoRegla.porcentaje_ingreso,
+                        func.round(Ingreso.monto * ReglaAporte.valor / 100, 2)
+                    ),
+                    else_=func.least(ReglaAporte.valor, Ingreso.monto)
+                )
+            ))
+        if expense_ids:
+            sources.append(self._rule_matches(
+                Gasto, Gasto.id_gasto.in_(expense_ids), ReglaAporte.tipo == TipoRegla.redondeo_gasto,
+                cast(null(), Integer), Gasto.id_gasto,
+                func.ceil(Gasto.monto / ReglaAporte.valor) * ReglaAporte.valor - Gasto.monto
+            ))
+        if not sources:
+            return {}
+
+        generated = union_all(*sources).subquery()
+        rows = self.db.execute(
+            insert(AporteMeta).from_select(
+                [
+                    AporteMeta.id_meta, AporteMeta.id_usuario, AporteMeta.monto, AporteMeta.fecha,
+                    AporteMeta.id_ingreso, AporteMeta.id_gasto
+                ],
+                select(
+                    generated.c.id_meta, generated.c.id_usuario, generated.c.monto, generated.c.fecha,
+                    generated.c.id_ingreso, generated.c.id_gasto
+                ).where(generated.c.monto > 0)
+            ).returning(AporteMeta.id_meta, AporteMeta.id_usuario, AporteMeta.monto)
+        ).all()
+        return self._apply_totals(rows, 1, "aportes_automaticos")
+
+    def revert_rules(self, income_ids: List[int], expense_ids: List[int]) -> Dict[int, Tuple[Decimal, int]]:
+        """
+        Eliminar los aportes automáticos generados por los ingresos y gastos indicados y
+        descontarlos de sus metas con un solo UPDATE. Devuelve {id_meta: (monto, cantidad)}
+        con los cambios aplicados (negativos); no hace commit.
+        """
+        conditions = []
+        if income_ids:
+            conditions.append(AporteMeta.id_ingreso.in_(income_ids))
+        if expense_ids:
+            conditions.append(AporteMeta.id_gasto.in_(expense_ids))
+        if not conditions:
+            return {}
+
+        rows = self.db.execute(
+            delete(AporteMeta).where(or_(*conditions)).returning(
+                AporteMeta.id_meta, AporteMeta.id_usuario, AporteMeta.monto
+            ),
+            execution_options={"synchronize_session": False}
+        ).all()
+        return self._apply_totals(rows, -1, "aportes_automaticos_revertidos")
+
+    def recompute_rules(self, income_ids: List[int], expense_ids: List[int]) -> None:
+        """
+        Rehacer los aportes automáticos de movimientos ya existentes que cambiaron de monto,
+        fecha o ámbito: se revierten los anteriores y se evalúan las reglas de nuevo (sin commit)
+        """
+        self.db.flush()
+        self.revert_rules(income_ids, expense_ids)
+        self.apply_rules(income_ids, expense_ids)
+
+    def _apply_totals(self, rows, sign: int, evento: str) -> Dict[int, Tuple[Decimal, int]]:
+        """Aplicar a las metas los aportes creados (sign=1) o eliminados (sign=-1)"""
+        if not rows:
+            return {}
+
+        deltas = defaultdict(lambda: (Decimal(0), 0))
+        by_user = defaultdict(lambda: (Decimal(0), 0))
+        for goal_id, user_id, monto in rows:
+            total, cantidad = deltas[goal_id]
+            deltas[goal_id] = (total + sign * monto, cantidad + sign)
+            total, cantidad = by_user[(goal_id, user_id)]
+            by_user[(goal_id, user_id)] = (total + monto, cantidad + 1)
+
+        GoalService(self.db).apply_contribution_deltas(deltas)
+        self._record_activity(by_user, evento)
+        return dict(deltas)
+
+    def _rule_matches(self, model, movement_filter, rule_filter, id_ingreso, id_gasto, amount):
+        """Pares (regla activa, movimiento) con el monto que la regla aporta a su meta"""
+        return select(
+            ReglaAporte.id_meta,
+            model.id_usuario,
+            amount.label("monto"),
+            model.fecha,
+            id_ingreso.label("id_ingreso"),
+            id_gasto.label("id_gasto")
+        ).select_from(model).join(
+            ReglaAporte, ReglaAporte.id_usuario == model.id_usuario
+        ).join(
+            Meta, Meta.id_meta == ReglaAporte.id_meta
+        ).where(
+            movement_filter,
+            rule_filter,
+            ReglaAporte.activa == true(),
+            Meta.estado == literal(EstadoMeta.activa, Meta.estado.type),
+            Meta.id_grupo.is_not_distinct_from(model.id_grupo)
+        )
+
+    def _record_activity(self, by_user: Dict[Tuple[int, int], Tuple[Decimal, int]], evento: str):
+        """Registrar un evento por meta grupal y usuario con los aportes automáticos (sin commit)"""
+        goal_ids = {goal_id for goal_id, _ in by_user}
+        groups = dict(self.db.query(Meta.id_meta, Meta.id_grupo).filter(
+            Meta.id_meta.in_(goal_ids),
+            Meta.id_grupo.isnot(None)
+        ).all())
+        if not groups:
+            return
+
+        activity_service = GroupActivityService(self.db)
+        for (goal_id, user_id), (monto, cantidad) in by_user.items():
+            if goal_id in groups:
+                activity_service.record(groups[goal_id], evento, user_id, {
+                    "id_meta": goal_id,
+                    "monto": monto,
+                    "cantidad": cantidad,
+                    "id_usuario": user_id
+                })
+
+
+
+def collect_new_movements(session: Session):
+    """Anotar los ingresos y gastos insertados en el flush que acaba de terminar"""
+    incomes = [obj.id_ingreso for obj in session.new if isinstance(obj, Ingreso)]
+    expenses = [obj.id_gasto for obj in session.new if isinstance(obj, Gasto)]
+    if incomes or expenses:
+        pending = session.info.setdefault(PENDING_KEY, ([], []))
+        pending[0].extend(incomes)
+        pending[1].extend(expenses)
+
+
+def apply_pending_rules(session: Session):
+    """
+    Ejecutar las reglas una sola vez por transacción, justo antes del commit: una carga
+    de muchos ingresos o gastos genera sus aportes en una sola pasada. Solo se adelanta
+    el flush si quedan ingresos o gastos nuevos sin enviar.
+    """
+    if any(isinstance(obj, (Ingreso, Gasto)) for obj in session.new):
+        session.flush()
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending:
+        ContributionRuleService(session).apply_rules(*pending)
+
+
+def discard_pending_rules(session: Session):
+    """Olvidar los movimientos anotados de una transacción revertida"""
+    session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,332 @@
+"""
+Servicio para eliminar grupos y cuentas de usuario en segundo plano
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update, delete, func, or_, and_
+from typing import Optional
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from app.core.events import publish_group_event
+from app.models.ai_history import HistorialAI
+from app.models.budget import Presupuesto
+from app.models.category import Categoria
+from app.models.contribution_rule import ReglaAporte
+from app.models.deletion import Eliminacion, EntidadEliminacion, EstadoEliminacion
+from app.models.expense import Gasto
+from app.models.expense_split import DivisionGasto
+from app.models.goal import Meta
+from app.models.goal_contribution import AporteMeta
+from app.models.group import Grupo
+from app.models.group_activity import ActividadGrupo
+from app.models.group_balance import BalanceGrupo
+from app.models.income import Ingreso
+from app.models.invitation import Invitacion
+from app.models.user import Usuario
+from app.models.user_group import UsuarioGrupo
+from app.services.expense_service import ExpenseService
+from app.services.expense_split_service import ExpenseSplitService
+from app.services.goal_service import GoalService
+from app.services.group_activity_service import GroupActivityService
+from app.services.group_service import GroupService
+from app.services.invitation_service import forget_invitation_views
+
+# Filas por sentencia DELETE; acota el tiempo que se mantienen los bloqueos
+BATCH_SIZE = 1000
+
+# Un trabajo en proceso sin avances durante este tiempo se considera abandonado y se retoma
+LEASE = timedelta(minutes=5)
+
+ACTIVE_STATES = (EstadoEliminacion.pendiente, EstadoEliminacion.en_proceso)
+
+
+class DeletionService:
+    """Servicio para solicitar y ejecutar eliminaciones por lotes"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def request_group_deletion(self, group_id: int, user_id: int) -> Optional[Eliminacion]:
+        """Marcar un grupo para eliminación (solo el creador); None si no existe o no tiene permisos"""
+        group = self.db.query(Grupo).filter(Grupo.id_grupo == group_id).first()
+        if not group or group.creado_por != user_id:
+            return None
+
+        job = self._enqueue(EntidadEliminacion.grupo, group, group_id, user_id)
+        self._forget_invitation_views(Invitacion.id_grupo == group_id)
+        return job
+
+    def request_user_deletion(self, user_id: int) -> Optional[Eliminacion]:
+        """
+        Marcar una cuenta para eliminación. Los grupos que creó el usuario se eliminan
+        con ella, como indica la clave foránea grupos.creado_por.
+        """
+        user = self.db.query(Usuario).filter(Usuario.id_usuario == user_id).first()
+        if not user:
+            return None
+
+        self.db.query(Grupo).filter(Grupo.creado_por == user_id).update(
+            {Grupo.eliminando: True}, synchronize_session=False
+        )
+        job = self._enqueue(EntidadEliminacion.usuario, user, user_id, user_id)
+        self._forget_invitation_views(self._user_invitations(user_id))
+        return job
+
+    def get_deletion(self, deletion_id: int) -> Optional[Eliminacion]:
+        """Obtener el estado de una eliminación"""
+        return self.db.query(Eliminacion).filter(Eliminacion.id_eliminacion == deletion_id).first()
+
+    def process_pending(self, max_jobs: Optional[int] = None) -> int:
+        """
+        Ejecutar las eliminaciones pendientes (y las abandonadas por otro proceso).
+        Varios procesos pueden ejecutarlo a la vez: cada trabajo se reclama con
+        FOR UPDATE SKIP LOCKED. Devuelve el número de trabajos procesados.
+        """
+        processed = 0
+        while max_jobs is None or processed < max_jobs:
+            job = self._claim_next()
+            if job is None:
+                break
+
+            try:
+                if job.entidad == EntidadEliminacion.grupo:
+                    self._delete_group(job, job.id_entidad)
+                else:
+                    self._delete_user(job, job.id_entidad)
+                self._finish(job, EstadoEliminacion.completada)
+            except Exception as e:
+                self.db.rollback()
+                self._finish(job, EstadoEliminacion.error, str(e))
+            processed += 1
+
+        return processed
+
+    def _enqueue(self, entidad: EntidadEliminacion, entity, entity_id: int, requester_id: int) -> Eliminacion:
+        """Marcar la entidad y crear su trabajo de eliminación (o devolver el que ya existe)"""
+        existing = self.db.query(Eliminacion).filter(
+            Eliminacion.entidad == entidad,
+            Eliminacion.id_entidad == entity_id,
+            Eliminacion.estado.in_(ACTIVE_STATES)
+        ).first()
+        if existing:
+            return existing
+
+        entity.eliminando = True
+        job = Eliminacion(entidad=entidad, id_entidad=entity_id, id_solicitante=requester_id)
+        self.db.add(job)
+
+        if entidad == EntidadEliminacion.grupo:
+            publish_group_event(self.db, entity_id, "grupo_eliminado", {"id_grupo": entity_id})
+
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def _claim_next(self) -> Optional[Eliminacion]:
+        """Reclamar el siguiente trabajo pendiente o abandonado"""
+        candidate = select(Eliminacion.id_eliminacion).where(
+            or_(
+                Eliminacion.estado == EstadoEliminacion.pendiente,
+                and_(
+                    Eliminacion.estado == EstadoEliminacion.en_proceso,
+                    Eliminacion.fecha_actualizacion < func.now() - LEASE
+                )
+            )
+        ).order_by(Eliminacion.fecha_solicitud).limit(1).with_for_update(skip_locked=True).scalar_subquery()
+
+        job_id = self.db.execute(
+            update(Eliminacion).where(Eliminacion.id_eliminacion == candidate).values(
+                estado=EstadoEliminacion.en_proceso,
+                fecha_actualizacion=func.now()
+            ).returning(Eliminacion.id_eliminacion),
+            execution_options={"synchronize_session": False}
+        ).scalar()
+        self.db.commit()
+
+        if job_id is None:
+            return None
+        return self.db.get(Eliminacion, job_id)
+
+    def _delete_group(self, job: Eliminacion, group_id: int):
+        """Vaciar por lotes las tablas del grupo y eliminarlo"""
+        group_goals = select(Meta.id_meta).where(Meta.id_grupo == group_id)
+        group_expenses = select(Gasto.id_gasto).where(Gasto.id_grupo == group_id)
+
+        self._delete_in_batches(job, AporteMeta.id_aporte, AporteMeta.id_meta.in_(group_goals))
+        self._delete_in_batches(job, ReglaAporte.id_regla, ReglaAporte.id_meta.in_(group_goals))
+        self._delete_in_batches(job, DivisionGasto.id_division, DivisionGasto.id_gasto.in_(group_expenses))
+        self._delete_in_batches(job, Gasto.id_gasto, Gasto.id_grupo == group_id)
+        self._delete_in_batches(job, Ingreso.id_ingreso, Ingreso.id_grupo == group_id)
+        self._delete_in_batches(job, ActividadGrupo.id_actividad, ActividadGrupo.id_grupo == group_id)
+        self._delete_in_batches(job, Meta.id_meta, Meta.id_grupo == group_id)
+        self._delete_in_batches(job, Presupuesto.id_presupuesto, Presupuesto.id_grupo == group_id)
+        self._delete_invitations(job, Invitacion.id_grupo == group_id)
+
+        # Tablas acotadas por el número de miembros y el propio grupo: una sola sentencia
+        deleted = self._delete_where(BalanceGrupo, BalanceGrupo.id_grupo == group_id)
+        deleted += self._delete_where(UsuarioGrupo, UsuarioGrupo.id_grupo == group_id)
+        deleted += self._delete_where(Grupo, Grupo.id_grupo == group_id)
+        self._advance(job, "grupos", deleted)
+        self.db.commit()
+
+    def _delete_user(self, job: Eliminacion, user_id: int):
+        """Eliminar los grupos creados por el usuario, vaciar por lotes sus datos y eliminarlo"""
+        created_groups = [group_id for (group_id,) in self.db.query(Grupo.id_grupo).filter(Grupo.creado_por == user_id)]
+        for group_id in created_groups:
+            self._delete_group(job, group_id)
+
+        user_goals = select(Meta.id_meta).where(Meta.id_usuario == user_id)
+
+        self._delete_user_contributions(job, user_id)
+        self._delete_in_batches(job, AporteMeta.id_aporte, AporteMeta.id_meta.in_(user_goals))
+        self._delete_in_batches(
+            job, ReglaAporte.id_regla,
+            or_(ReglaAporte.id_usuario == user_id, ReglaAporte.id_meta.in_(user_goals))
+        )
+        self._delete_in_batches(job, HistorialAI.id_historial, HistorialAI.id_usuario == user_id)
+        # En los grupos que siguen existiendo se revierten balances y presupuestos
+        self._reassign_user_shares(job, user_id)
+        self._remove_user_group_expenses(job, user_id)
+        # Los gastos personales solo afectan presupuestos del propio usuario
+        self._delete_in_batches(job, Gasto.id_gasto, Gasto.id_usuario == user_id)
+        self._delete_in_batches(job, Ingreso.id_ingreso, Ingreso.id_usuario == user_id)
+        self._delete_in_batches(job, Presupuesto.id_presupuesto, Presupuesto.id_usuario == user_id)
+        self._delete_in_batches(job, Meta.id_meta, Meta.id_usuario == user_id)
+        self._delete_invitations(job, or_(Invitacion.creado_por == user_id, Invitacion.id_usuario_invitado == user_id))
+        self._delete_in_batches(job, Categoria.id_categoria, Categoria.id_usuario == user_id)
+
+        # Salir de los grupos restantes avisando a sus miembros
+        group_ids = [group_id for (group_id,) in self.db.query(UsuarioGrupo.id_grupo).filter(
+            UsuarioGrupo.id_usuario == user_id
+        )]
+        GroupService(self.db).adjust_member_count(group_ids, -1)
+        activity_service = GroupActivityService(self.db)
+        for group_id in group_ids:
+            activity_service.record(group_id, "miembro_eliminado", user_id, {"id_usuario": user_id})
+
+        deleted = self._delete_where(BalanceGrupo, BalanceGrupo.id_usuario == user_id)
+        deleted += self._delete_where(UsuarioGrupo, UsuarioGrupo.id_usuario == user_id)
+        deleted += self._delete_where(Usuario, Usuario.id_usuario == user_id)
+        self._advance(job, "usuarios", deleted)
+        self.db.commit()
+
+    def _delete_in_batches(self, job: Eliminacion, key, condition):
+        """Eliminar las filas que cumplen `condition` en lotes de BATCH_SIZE, una transacción por lote"""
+        table = key.class_
+        while True:
+            batch = select(key).where(condition).limit(BATCH_SIZE).scalar_subquery()
+            deleted = self._delete_where(table, key.in_(batch))
+            self._advance(job, table.__tablename__, deleted)
+            self.db.commit()
+            if deleted < BATCH_SIZE:
+                return
+
+    def _delete_user_contributions(self, job: Eliminacion, user_id: int):
+        """
+        Eliminar por lotes los aportes del usuario descontándolos del acumulado de sus
+        metas (incluidas las de grupos que no se eliminan), en la transacción de cada lote
+        """
+        goal_service = GoalService(self.db)
+        while True:
+            batch = select(AporteMeta.id_aporte).where(AporteMeta.id_usuario == user_id).limit(BATCH_SIZE).scalar_subquery()
+            rows = self.db.execute(
+                delete(AporteMeta).where(AporteMeta.id_aporte.in_(batch)).returning(AporteMeta.id_meta, AporteMeta.monto),
+                execution_options={"synchronize_session": False}
+            ).all()
+
+            deltas = defaultdict(lambda: (Decimal(0), 0))
+            for goal_id, monto in rows:
+                total, cantidad = deltas[goal_id]
+                deltas[goal_id] = (total - monto, cantidad - 1)
+            goal_service.apply_contribution_deltas(deltas)
+
+            self._advance(job, AporteMeta.__tablename__, len(rows))
+            self.db.commit()
+            if len(rows) < BATCH_SIZE:
+                return
+
+    def _reassign_user_shares(self, job: Eliminacion, user_id: int):
+        """Pasar por lotes al pagador las partes del usuario en gastos de otros miembros"""
+        split_service = ExpenseSplitService(self.db)
+        while True:
+            moved = split_service.reassign_shares_to_payer(user_id, BATCH_SIZE)
+            self._advance(job, DivisionGasto.__tablename__, moved)
+            self.db.commit()
+            if moved < BATCH_SIZE:
+                return
+
+    def _remove_user_group_expenses(self, job: Eliminacion, user_id: int):
+        """
+        Eliminar por lotes los gastos de grupo del usuario como lo hace ExpenseService:
+        revirtiendo su división en los balances y su monto en los presupuestos del grupo
+        """
+        expense_service = ExpenseService(self.db)
+        while True:
+            expenses = self.db.query(Gasto).filter(
+                Gasto.id_usuario == user_id,
+                Gasto.id_grupo.isnot(None)
+            ).order_by(Gasto.id_gasto).limit(BATCH_SIZE).all()
+
+            for expense in expenses:
+                expense_service._remove_expense(expense, user_id)
+            self._advance(job, Gasto.__tablename__, len(expenses))
+            self.db.commit()
+            if len(expenses) < BATCH_SIZE:
+                return
+
+    def _delete_invitations(self, job: Eliminacion, condition):
+        """Eliminar invitaciones por lotes descartando sus vistas cacheadas por token"""
+        while True:
+            batch = select(Invitacion.id_invitacion).where(condition).limit(BATCH_SIZE).scalar_subquery()
+            tokens = self.db.execute(
+                delete(Invitacion).where(Invitacion.id_invitacion.in_(batch)).returning(Invitacion.token),
+                execution_options={"synchronize_session": False}
+            ).scalars().all()
+            self._advance(job, Invitacion.__tablename__, len(tokens))
+            self.db.commit()
+            forget_invitation_views(tokens)
+            if len(tokens) < BATCH_SIZE:
+                return
+
+    @staticmethod
+    def _user_invitations(user_id: int):
+        """Invitaciones que desaparecen con la cuenta: de sus grupos, creadas por él o para él"""
+        return or_(
+            Invitacion.id_grupo.in_(select(Grupo.id_grupo).where(Grupo.creado_por == user_id)),
+            Invitacion.creado_por == user_id,
+            Invitacion.id_usuario_invitado == user_id
+        )
+
+    def _forget_invitation_views(self, condition):
+        """Descartar las vistas cacheadas de las invitaciones que quedan invalidadas por una eliminación"""
+        forget_invitation_views(self.db.execute(select(Invitacion.token).where(condition)).scalars())
+
+    def _delete_where(self, model, condition) -> int:
+        return self.db.execute(
+            delete(model).where(condition),
+            execution_options={"synchronize_session": False}
+        ).rowcount
+
+    def _advance(self, job: Eliminacion, paso: str, deleted: int):
+        """Registrar el avance y renovar el plazo del trabajo (en la transacción del lote)"""
+        self.db.execute(
+            update(Eliminacion).where(Eliminacion.id_eliminacion == job.id_eliminacion).values(
+                paso=paso,
+                filas_eliminadas=Eliminacion.filas_eliminadas + deleted,
+                fecha_actualizacion=func.now()
+            ),
+            execution_options={"synchronize_session": False}
+        )
+
+    def _finish(self, job: Eliminacion, estado: EstadoEliminacion, error: Optional[str] = None):
+        self.db.execute(
+            update(Eliminacion).where(Eliminacion.id_eliminacion == job.id_eliminacion).values(
+                estado=estado,
+                paso=None if estado == EstadoEliminacion.completada else Eliminacion.paso,
+                error=error,
+                fecha_actualizacion=func.now(),
+                fecha_fin=func.now()
+            ),
+            execution_options={"synchronize_session": False}
+        )
+        self.db.commit()
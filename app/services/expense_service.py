@@ -5,6 +5,11 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.models.expense import Gasto
 from app.schemas.expense import GastoCreate, GastoUpdate
+from app.services.budget_service import BudgetService
+from app.services.contribution_rule_service import ContributionRuleService
+from app.services.expense_split_service import ExpenseSplitService
+from app.services.group_activity_service import GroupActivityService
+from app.services.group_service import GroupService
 
 
 class ExpenseService:
@@ -12,15 +17,44 @@ class ExpenseService:
 
     def __init__(self, db: Session):
         self.db = db
+        self.budget_service = BudgetService(db)
+        self.split_service = ExpenseSplitService(db)
 
     def create_expense(self, expense_data: GastoCreate, user_id: int) -> Gasto:
         """Crear nuevo gasto"""
+        if expense_data.division and not expense_data.id_grupo:
+            raise ValueError("Solo se pueden dividir gastos de grupo")
+
         db_expense = Gasto(
-            **expense_data.dict(),
+            **expense_data.dict(exclude={'division'}),
             id_usuario=user_id
         )
+        db_expense.hash_contenido = Gasto.calcular_hash(
+            user_id, db_expense.fecha, db_expense.monto, db_expense.descripcion
+        )
+
+        # Marcar si ya existe un gasto con el mismo contenido en el mismo ámbito (consulta por índice)
+        db_expense.posible_duplicado = self.db.query(Gasto.id_gasto).filter(
+            Gasto.id_usuario == user_id,
+            Gasto.hash_contenido == db_expense.hash_contenido,
+            Gasto.id_grupo.is_not_distinct_from(db_expense.id_grupo)
+        ).first() is not None
 
         self.db.add(db_expense)
+
+        # Actualizar contadores de presupuestos en la misma transacción
+        self.budget_service.apply_expense_delta(db_expense, db_expense.monto)
+
+        # Crear las partes de la división junto con el gasto
+        if expense_data.division:
+            self.db.flush()
+            try:
+                self.split_service.create_split(db_expense, expense_data.division)
+            except ValueError:
+                self.db.rollback()
+                raise
+
+        self._record_activity(db_expense, "gasto_creado", user_id)
         self.db.commit()
         self.db.refresh(db_expense)
         return db_expense
@@ -40,12 +74,7 @@ class ExpenseService:
         
         # Si es gasto de grupo, verificar que el usuario pertenece al grupo
         if expense.id_grupo:
-            from app.models.user_group import UsuarioGrupo
-            user_in_group = self.db.query(UsuarioGrupo).filter(
-                UsuarioGrupo.id_usuario == user_id,
-                UsuarioGrupo.id_grupo == expense.id_grupo
-            ).first()
-            if user_in_group:
+            if GroupService(self.db).is_user_in_group(expense.id_grupo, user_id):
                 return expense
         
         return None
@@ -97,10 +126,40 @@ class ExpenseService:
             if not user_in_group:
                 return None
 
-        update_data = expense_data.dict(exclude_unset=True)
+        update_data = expense_data.dict(exclude_unset=True, exclude={'division'})
+        affects_budgets = bool({'monto', 'fecha', 'id_categoria', 'id_grupo'} & update_data.keys())
+
+        previous_monto = expense.monto
+        previous_group = expense.id_grupo
+
+        # Revertir el gasto anterior de los presupuestos y aplicar el nuevo
+        if affects_budgets:
+            self.budget_service.apply_expense_delta(expense, -expense.monto)
+
         for field, value in update_data.items():
             setattr(expense, field, value)
 
+        if affects_budgets:
+            self.budget_service.apply_expense_delta(expense, expense.monto)
+
+        # Rehacer la división si cambia el monto, el grupo o la propia división
+        if expense_data.division or (expense.tipo_division and {'monto', 'id_grupo'} & update_data.keys()):
+            self._resplit_expense(expense, previous_monto, previous_group, expense_data.division)
+
+        # Rehacer los aportes automáticos (redondeo) si cambia lo que evalúan las reglas
+        if {'monto', 'fecha', 'id_grupo'} & update_data.keys():
+            ContributionRuleService(self.db).recompute_rules([], [expense.id_gasto])
+
+        if {'monto', 'fecha', 'descripcion'} & update_data.keys():
+            expense.hash_contenido = Gasto.calcular_hash(
+                expense.id_usuario, expense.fecha, expense.monto, expense.descripcion
+            )
+
+        # Avisar al grupo anterior si el gasto cambió de grupo
+        if previous_group and previous_group != expense.id_grupo:
+            self._record_activity(expense, "gasto_eliminado", user_id, previous_group)
+        self._record_activity(expense, "gasto_actualizado", user_id)
+
         self.db.commit()
         self.db.refresh(expense)
         return expense
@@ -111,7 +170,7 @@ class ExpenseService:
         if not expense:
             return False
 
-        self.db.delete(expense)
+        self._remove_expense(expense, user_id)
         self.db.commit()
         return True
 
@@ -216,3 +275,123 @@ class ExpenseService:
             Gasto.id_categoria == category_id
         ).offset(skip).limit(limit).all()
 
+    def find_duplicates(self, user_id: int) -> List[dict]:
+        """
+        Obtener los grupos de gastos duplicados de un usuario (GROUP BY sobre el hash y el
+        grupo): un gasto personal y uno de grupo con el mismo contenido no son duplicados
+        """
+        from sqlalchemy import func
+        groups = self.db.query(
+            Gasto.hash_contenido,
+            Gasto.id_grupo,
+            func.count(Gasto.id_gasto)
+        ).filter(
+            Gasto.id_usuario == user_id,
+            Gasto.hash_contenido.isnot(None)
+        ).group_by(Gasto.hash_contenido, Gasto.id_grupo).having(func.count(Gasto.id_gasto) > 1).all()
+
+        if not groups:
+            return []
+
+        expenses = self.db.query(Gasto).filter(
+            Gasto.id_usuario == user_id,
+            Gasto.hash_contenido.in_({content_hash for content_hash, _, _ in groups})
+        ).order_by(Gasto.id_gasto).all()
+
+        by_key = {}
+        for expense in expenses:
+            by_key.setdefault((expense.hash_contenido, expense.id_grupo), []).append(expense)
+
+        return [
+            {
+                "hash_contenido": content_hash,
+                "id_grupo": group_id,
+                "cantidad": count,
+                "gastos": by_key.get((content_hash, group_id), [])
+            }
+            for content_hash, group_id, count in groups
+        ]
+
+    def merge_duplicates(self, user_id: int, hashes: Optional[List[str]] = None) -> dict:
+        """
+        Fusionar gastos duplicados de un usuario: en cada grupo se conserva el gasto más
+        antiguo y se eliminan los demás, revirtiendo su efecto en presupuestos y balances.
+        """
+        duplicates = self.find_duplicates(user_id)
+        if hashes is not None:
+            duplicates = [group for group in duplicates if group["hash_contenido"] in set(hashes)]
+
+        removed = 0
+        for group in duplicates:
+            kept, *extra = group["gastos"]
+            for expense in extra:
+                kept.recurrente = kept.recurrente or expense.recurrente
+                kept.nota = kept.nota or expense.nota
+                self._remove_expense(expense, user_id)
+                removed += 1
+
+        self.db.commit()
+        return {"grupos_fusionados": len(duplicates), "gastos_eliminados": removed}
+
+    def backfill_content_hashes(self, batch_size: int = 1000) -> int:
+        """Calcular el hash de contenido de los gastos que aún no lo tienen, por lotes"""
+        total = 0
+        while True:
+            expenses = self.db.query(Gasto).filter(
+                Gasto.hash_contenido.is_(None)
+            ).order_by(Gasto.id_gasto).limit(batch_size).all()
+
+            if not expenses:
+                return total
+
+            for expense in expenses:
+                expense.hash_contenido = Gasto.calcular_hash(
+                    expense.id_usuario, expense.fecha, expense.monto, expense.descripcion
+                )
+            self.db.commit()
+            total += len(expenses)
+
+    def _remove_expense(self, expense: Gasto, actor_id: int):
+        """Eliminar un gasto revirtiendo su efecto en presupuestos, balances y aportes automáticos (sin commit)"""
+        self.budget_service.apply_expense_delta(expense, -expense.monto)
+        self.split_service.remove_split(expense)
+        ContributionRuleService(self.db).revert_rules([], [expense.id_gasto])
+        self._record_activity(expense, "gasto_eliminado", actor_id)
+        self.db.delete(expense)
+
+    def _record_activity(self, expense: Gasto, evento: str, actor_id: int, group_id: Optional[int] = None):
+        """Registrar la acción sobre el gasto en la actividad de su grupo (sin commit)"""
+        group_id = expense.id_grupo if group_id is None else group_id
+        if not group_id:
+            return
+
+        if expense.id_gasto is None:
+            self.db.flush()
+        GroupActivityService(self.db).record(group_id, evento, actor_id, {
+            "id_gasto": expense.id_gasto,
+            "descripcion": expense.descripcion,
+            "monto": expense.monto,
+            "fecha": expense.fecha,
+            "id_usuario": expense.id_usuario
+        })
+
+    def _resplit_expense(self, expense: Gasto, previous_monto, previous_group, division=None):
+        """Revertir la división con los valores con que se aplicó y aplicar la nueva"""
+        tipo = expense.tipo_division
+        shares = self.split_service.remove_split(expense, previous_monto, previous_group)
+
+        if not expense.id_grupo:
+            if division:
+                self.db.rollback()
+                raise ValueError("Solo se pueden dividir gastos de grupo")
+            return
+
+        try:
+            if not division:
+                if not shares:
+                    return
+                division = self.split_service.previous_division(tipo, shares)
+            self.split_service.create_split(expense, division)
+        except ValueError:
+            self.db.rollback()
+            raise
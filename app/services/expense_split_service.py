@@ -0,0 +1,240 @@
+"""
+Servicio para división de gastos de grupo y balances por miembro
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+from typing import Dict, List, Optional, Tuple
+from collections import defaultdict
+from decimal import Decimal, ROUND_DOWN
+from app.models.expense import Gasto, TipoDivision
+from app.models.expense_split import DivisionGasto
+from app.models.group_balance import BalanceGrupo
+from app.models.user import Usuario
+from app.models.user_group import UsuarioGrupo
+from app.schemas.expense_split import DivisionGastoCreate, ParticipanteDivision
+from app.services.group_service import GroupService
+
+CENT = Decimal('0.01')
+
+
+class ExpenseSplitService:
+    """Servicio para repartir gastos de grupo y mantener los balances de sus miembros"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_split(self, expense: Gasto, division: DivisionGastoCreate):
+        """
+        Crear las partes de un gasto de grupo y actualizar los balances.
+        Se ejecuta dentro de la transacción del gasto; no hace commit.
+        """
+        if not expense.id_grupo:
+            raise ValueError("Solo se pueden dividir gastos de grupo")
+
+        try:
+            tipo = TipoDivision(division.tipo)
+        except ValueError:
+            raise ValueError("Tipo de división inválido. Debe ser: igual, porcentaje o exacto")
+
+        shares = self._compute_shares(expense, tipo, division.participantes)
+
+        self.db.add_all([
+            DivisionGasto(id_gasto=expense.id_gasto, id_usuario=user_id, monto=monto, porcentaje=porcentaje)
+            for user_id, monto, porcentaje in shares
+        ])
+        expense.tipo_division = tipo
+
+        deltas = {user_id: (Decimal('0'), monto) for user_id, monto, _ in shares}
+        paid, owed = deltas.get(expense.id_usuario, (Decimal('0'), Decimal('0')))
+        deltas[expense.id_usuario] = (paid + expense.monto, owed)
+        self._apply_balance_deltas(expense.id_grupo, deltas)
+
+    def remove_split(self, expense: Gasto, monto: Optional[Decimal] = None, group_id: Optional[int] = None) -> List[DivisionGasto]:
+        """
+        Eliminar las partes de un gasto y revertir su efecto en los balances.
+        `monto` y `group_id` permiten revertir con los valores previos a una edición.
+        Devuelve las partes eliminadas; no hace commit.
+        """
+        if not expense.tipo_division:
+            return []
+
+        monto = expense.monto if monto is None else monto
+        group_id = expense.id_grupo if group_id is None else group_id
+
+        shares = self.db.query(DivisionGasto).filter(
+            DivisionGasto.id_gasto == expense.id_gasto
+        ).all()
+
+        deltas = {share.id_usuario: (Decimal('0'), -share.monto) for share in shares}
+        paid, owed = deltas.get(expense.id_usuario, (Decimal('0'), Decimal('0')))
+        deltas[expense.id_usuario] = (paid - monto, owed)
+        self._apply_balance_deltas(group_id, deltas)
+
+        self.db.query(DivisionGasto).filter(
+            DivisionGasto.id_gasto == expense.id_gasto
+        ).delete(synchronize_session=False)
+        expense.tipo_division = None
+        return shares
+
+    def reassign_shares_to_payer(self, user_id: int, limit: int) -> int:
+        """
+        Pasar al pagador de cada gasto la parte que `user_id` tiene en gastos de otros
+        miembros (hasta `limit` partes) y ajustar los balances de ambos: el gasto sigue
+        repartido por su monto completo y los balances del grupo siguen cuadrando.
+        Se usa al eliminar una cuenta. Devuelve las partes movidas; no hace commit.
+        """
+        shares = self.db.query(
+            DivisionGasto.id_division,
+            DivisionGasto.id_gasto,
+            DivisionGasto.monto,
+            DivisionGasto.porcentaje,
+            Gasto.id_usuario,
+            Gasto.id_grupo
+        ).join(Gasto, Gasto.id_gasto == DivisionGasto.id_gasto).filter(
+            DivisionGasto.id_usuario == user_id,
+            Gasto.id_usuario != user_id
+        ).order_by(DivisionGasto.id_division).limit(limit).all()
+        if not shares:
+            return 0
+
+        statement = insert(DivisionGasto).values([
+            {"id_gasto": id_gasto, "id_usuario": payer_id, "monto": monto, "porcentaje": porcentaje}
+            for _, id_gasto, monto, porcentaje, payer_id, _ in shares
+        ])
+        statement = statement.on_conflict_do_update(
+            index_elements=[DivisionGasto.id_gasto, DivisionGasto.id_usuario],
+            set_={
+                "monto": DivisionGasto.monto + statement.excluded.monto,
+                "porcentaje": DivisionGasto.porcentaje + statement.excluded.porcentaje
+            }
+        )
+        self.db.execute(statement)
+
+        deltas_by_group = defaultdict(dict)
+        for _, _, monto, _, payer_id, group_id in shares:
+            deltas = deltas_by_group[group_id]
+            for member_id, owed in ((payer_id, monto), (user_id, -monto)):
+                paid, total = deltas.get(member_id, (Decimal('0'), Decimal('0')))
+                deltas[member_id] = (paid, total + owed)
+        for group_id, deltas in deltas_by_group.items():
+            self._apply_balance_deltas(group_id, deltas)
+
+        self.db.query(DivisionGasto).filter(
+            DivisionGasto.id_division.in_([share.id_division for share in shares])
+        ).delete(synchronize_session=False)
+        return len(shares)
+
+    def previous_division(self, tipo: TipoDivision, shares: List[DivisionGasto]) -> DivisionGastoCreate:
+        """Reconstruir la definición de una división para volver a aplicarla con otro monto"""
+        if tipo == TipoDivision.exacto:
+            raise ValueError("Para cambiar el monto de un gasto con división exacta indica la nueva división")
+
+        participantes = [
+            ParticipanteDivision(id_usuario=share.id_usuario, porcentaje=share.porcentaje)
+            for share in shares
+        ]
+        if tipo == TipoDivision.porcentaje and participantes:
+            # Los porcentajes se guardan con 2 decimales (33.333 -> 33.33): el último participante
+            # absorbe la diferencia para que la división reconstruida siga sumando 100
+            participantes[-1].porcentaje = Decimal('100') - sum(p.porcentaje for p in participantes[:-1])
+
+        return DivisionGastoCreate(tipo=tipo.value, participantes=participantes)
+
+    def get_expense_split(self, expense_id: int) -> List[DivisionGasto]:
+        """Obtener las partes de un gasto"""
+        return self.db.query(DivisionGasto).filter(
+            DivisionGasto.id_gasto == expense_id
+        ).order_by(DivisionGasto.id_usuario).all()
+
+    def get_group_balances(self, group_id: int) -> List[dict]:
+        """Obtener los balances de los miembros de un grupo leyendo los totales mantenidos"""
+        rows = self.db.query(BalanceGrupo, Usuario.nombre).join(
+            Usuario, Usuario.id_usuario == BalanceGrupo.id_usuario
+        ).filter(
+            BalanceGrupo.id_grupo == group_id
+        ).order_by(BalanceGrupo.id_usuario).all()
+
+        return [
+            {
+                "id_usuario": balance.id_usuario,
+                "nombre": nombre,
+                "total_pagado": float(balance.total_pagado),
+                "total_adeudado": float(balance.total_adeudado),
+                "saldo": float(balance.total_pagado - balance.total_adeudado)
+            }
+            for balance, nombre in rows
+        ]
+
+    def _compute_shares(
+        self,
+        expense: Gasto,
+        tipo: TipoDivision,
+        participantes: Optional[List[ParticipanteDivision]]
+    ) -> List[Tuple[int, Decimal, Optional[Decimal]]]:
+        """Calcular (id_usuario, monto, porcentaje) de cada parte"""
+        monto = Decimal(str(expense.monto)).quantize(CENT)
+        members = {
+            user_id for (user_id,) in self.db.query(UsuarioGrupo.id_usuario).filter(
+                UsuarioGrupo.id_grupo == expense.id_grupo
+            )
+        }
+
+        if not participantes:
+            if tipo != TipoDivision.igual:
+                raise ValueError("Debes indicar los participantes de la división")
+            participantes = [ParticipanteDivision(id_usuario=user_id) for user_id in sorted(members)]
+
+        user_ids = [p.id_usuario for p in participantes]
+        if len(set(user_ids)) != len(user_ids):
+            raise ValueError("Un participante aparece más de una vez en la división")
+        if not set(user_ids) <= members:
+            raise ValueError("Todos los participantes deben pertenecer al grupo")
+
+        if tipo == TipoDivision.exacto:
+            if any(p.monto is None for p in participantes):
+                raise ValueError("Cada participante debe tener un monto en una división exacta")
+            montos = [Decimal(str(p.monto)).quantize(CENT) for p in participantes]
+            if sum(montos) != monto:
+                raise ValueError("La suma de las partes debe ser igual al monto del gasto")
+            return [(p.id_usuario, m, None) for p, m in zip(participantes, montos)]
+
+        if tipo == TipoDivision.porcentaje:
+            if any(p.porcentaje is None for p in participantes):
+                raise ValueError("Cada participante debe tener un porcentaje")
+            porcentajes = [Decimal(str(p.porcentaje)) for p in participantes]
+            if sum(porcentajes) != Decimal('100'):
+                raise ValueError("Los porcentajes deben sumar 100")
+        else:
+            porcentajes = [Decimal('100') / len(participantes)] * len(participantes)
+
+        montos = [(monto * pct / 100).quantize(CENT, rounding=ROUND_DOWN) for pct in porcentajes]
+        # Repartir los centavos sobrantes del redondeo entre los primeros participantes
+        remainder = int((monto - sum(montos)) / CENT)
+        for i in range(remainder):
+            montos[i % len(montos)] += CENT
+
+        return [
+            (p.id_usuario, m, pct.quantize(CENT) if tipo == TipoDivision.porcentaje else None)
+            for p, m, pct in zip(participantes, montos, porcentajes)
+        ]
+
+    def _apply_balance_deltas(self, group_id: int, deltas: Dict[int, Tuple[Decimal, Decimal]]):
+        """Sumar (pagado, adeudado) a los balances con un único INSERT ... ON CONFLICT DO UPDATE"""
+        if not deltas:
+            return
+
+        statement = insert(BalanceGrupo).values([
+            {"id_grupo": group_id, "id_usuario": user_id, "total_pagado": paid, "total_adeudado": owed}
+            for user_id, (paid, owed) in deltas.items()
+        ])
+        statement = statement.on_conflict_do_update(
+            index_elements=[BalanceGrupo.id_grupo, BalanceGrupo.id_usuario],
+            set_={
+                "total_pagado": BalanceGrupo.total_pagado + statement.excluded.total_pagado,
+                "total_adeudado": BalanceGrupo.total_adeudado + statement.excluded.total_adeudado
+            }
+        )
+        self.db.execute(statement)
+
+        # Invalida las cachés que dependen de los balances (p. ej. la liquidación)
+        GroupService(self.db).bump_data_version(group_id)
@@ -0,0 +1,134 @@
+"""
+Servicio para pronóstico de gasto mensual por categoría
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from typing import List, Optional
+from datetime import date, datetime
+import json
+import numpy as np
+from app.models.ai_history import HistorialAI, TipoHistorial
+from app.models.category import Categoria
+from app.models.user import Usuario
+from app.services.spending_series_service import SpendingSeriesService, month_start
+
+ORIGEN_PRONOSTICO = "pronostico_gasto"
+
+
+def exponential_smoothing(matrix: np.ndarray, alpha: float):
+    """
+    Suavizado exponencial simple sobre cada fila de `matrix`.
+    Devuelve el nivel final (pronóstico del siguiente mes) y el error absoluto
+    medio de los pronósticos a un paso dentro de la muestra.
+    """
+    level = matrix[:, 0].copy()
+    errors = np.zeros(matrix.shape[0])
+    for t in range(1, matrix.shape[1]):
+        errors += np.abs(matrix[:, t] - level)
+        level = alpha * matrix[:, t] + (1 - alpha) * level
+    return level, errors / max(matrix.shape[1] - 1, 1)
+
+
+def seasonal_naive(matrix: np.ndarray, season: int = 12):
+    """
+    Pronóstico estacional ingenuo (mismo mes del año anterior) y su error absoluto medio.
+    Si no hay historia suficiente el error es infinito para que no se elija.
+    """
+    if matrix.shape[1] <= season:
+        return np.zeros(matrix.shape[0]), np.full(matrix.shape[0], np.inf)
+    forecast = matrix[:, -season]
+    errors = np.mean(np.abs(matrix[:, season:] - matrix[:, :-season]), axis=1)
+    return forecast, errors
+
+
+class ForecastService:
+    """Servicio para calcular y servir pronósticos de gasto"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def generate_forecasts(
+        self,
+        months: int = 24,
+        alpha: float = 0.5,
+        min_active_months: int = 2,
+        batch_size: int = 5000,
+        today: Optional[date] = None
+    ) -> int:
+        """
+        Pronosticar el gasto del mes actual para cada usuario y categoría y guardarlo
+        como entradas de análisis. Los usuarios se procesan por lotes de `batch_size`;
+        dentro de cada lote todas las series se ajustan a la vez. Por serie se elige el
+        modelo (suavizado exponencial o estacional ingenuo) con menor error histórico.
+        """
+        today = today or date.today()
+        target = month_start(today)
+        last_complete = month_start(today, -1)
+        series_service = SpendingSeriesService(self.db)
+        # Las entradas se fechan al inicio del mes pronosticado, el mismo que se usa al leerlas
+        stamp = datetime.combine(target, datetime.min.time())
+
+        # Reemplazar los pronósticos ya calculados para este mes (sin tocar meses posteriores)
+        self.db.query(HistorialAI).filter(
+            HistorialAI.origen == ORIGEN_PRONOSTICO,
+            HistorialAI.fecha >= stamp,
+            HistorialAI.fecha < datetime.combine(month_start(target, 1), datetime.min.time())
+        ).delete(synchronize_session=False)
+
+        user_ids = [user_id for (user_id,) in self.db.query(Usuario.id_usuario).order_by(Usuario.id_usuario)]
+        total = 0
+
+        for start in range(0, len(user_ids), batch_size):
+            keys, matrix, _ = series_service.load_monthly_category_series(
+                months, last_complete, user_ids[start:start + batch_size]
+            )
+            if not len(keys):
+                continue
+
+            active = np.count_nonzero(matrix, axis=1) >= min_active_months
+            keys, matrix = keys[active], matrix[active]
+            if not len(keys):
+                continue
+
+            ses_forecast, ses_error = exponential_smoothing(matrix, alpha)
+            snaive_forecast, snaive_error = seasonal_naive(matrix)
+            use_seasonal = snaive_error < ses_error
+            forecast = np.where(use_seasonal, snaive_forecast, ses_forecast)
+
+            names = dict(self.db.query(Categoria.id_categoria, Categoria.nombre).filter(
+                Categoria.id_categoria.in_({int(category_id) for category_id in keys[:, 1]})
+            ).all())
+
+            rows = []
+            for i in range(len(keys)):
+                category_id = int(keys[i, 1])
+                rows.append({
+                    "id_usuario": int(keys[i, 0]),
+                    "tipo": TipoHistorial.analisis,
+                    "origen": ORIGEN_PRONOSTICO,
+                    "fecha": stamp,
+                    "contenido": json.dumps({
+                        "id_categoria": category_id,
+                        "categoria": names.get(category_id, "sin nombre"),
+                        "periodo": target.strftime('%Y-%m'),
+                        "monto_estimado": round(float(forecast[i]), 2),
+                        "gasto_mes_anterior": round(float(matrix[i, -1]), 2),
+                        "modelo": "estacional_ingenuo" if use_seasonal[i] else "suavizado_exponencial"
+                    }, ensure_ascii=False)
+                })
+
+            self.db.execute(insert(HistorialAI), rows)
+            total += len(rows)
+
+        self.db.commit()
+        return total
+
+    def get_user_forecasts(self, user_id: int, today: Optional[date] = None) -> List[HistorialAI]:
+        """Obtener los pronósticos del mes actual ya calculados para un usuario"""
+        target = month_start(today or date.today())
+        return self.db.query(HistorialAI).filter(
+            HistorialAI.id_usuario == user_id,
+            HistorialAI.origen == ORIGEN_PRONOSTICO,
+            HistorialAI.fecha >= datetime.combine(target, datetime.min.time()),
+            HistorialAI.fecha < datetime.combine(month_start(target, 1), datetime.min.time())
+        ).order_by(HistorialAI.id_historial).all()
@@ -5,8 +5,11 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.models.goal_contribution import AporteMeta
 from app.models.goal import Meta
+from app.models.user import Usuario
 from app.schemas.goal_contribution import AporteMetaCreate, AporteMetaUpdate
-from decimal import Decimal
+from app.services.goal_service import GoalService
+from app.services.group_activity_service import GroupActivityService
+from app.services.group_service import GroupService
 
 
 class GoalContributionService:
@@ -22,18 +25,12 @@ class GoalContributionService:
         if not meta:
             raise ValueError("Meta no encontrada")
         
-        # Verificar acceso a la meta
-        if meta.id_usuario != user_id:
-            if meta.id_grupo:
-                from app.models.user_group import UsuarioGrupo
-                user_in_group = self.db.query(UsuarioGrupo).filter(
-                    UsuarioGrupo.id_usuario == user_id,
-                    UsuarioGrupo.id_grupo == meta.id_grupo
-                ).first()
-                if not user_in_group:
-                    raise ValueError("No tienes acceso a esta meta")
-            else:
+        # Verificar acceso a la meta (las de grupos en proceso de eliminación no reciben aportes)
+        if meta.id_grupo:
+            if not GroupService(self.db).is_user_in_group(meta.id_grupo, user_id):
                 raise ValueError("No tienes acceso a esta meta")
+        elif meta.id_usuario != user_id:
+            raise ValueError("No tienes acceso a esta meta")
         
         # Verificar que la meta esté activa
         if meta.estado.value != "activa":
@@ -47,34 +44,31 @@ class GoalContributionService:
         )
 
         self.db.add(db_contribution)
+        # Actualizar monto acumulado de la meta en la misma transacción
+        GoalService(self.db).apply_contribution_deltas({meta.id_meta: (db_contribution.monto, 1)})
+        if meta.id_grupo:
+            self._record_activity(db_contribution, "aporte_creado", meta.id_grupo)
         self.db.commit()
         self.db.refresh(db_contribution)
         
-        # Actualizar monto acumulado de la meta
-        self._update_goal_accumulated(contribution_data.id_meta)
-        
         return db_contribution
 
-    def _update_goal_accumulated(self, goal_id: int):
-        """Actualizar monto acumulado de una meta"""
-        from sqlalchemy import func
-        
-        total_aportes = self.db.query(func.sum(AporteMeta.monto)).filter(
-            AporteMeta.id_meta == goal_id
-        ).scalar()
-        
-        meta = self.db.query(Meta).filter(Meta.id_meta == goal_id).first()
-        if meta:
-            monto_acumulado = Decimal(str(total_aportes)) if total_aportes else Decimal('0.00')
-            meta.monto_acumulado = monto_acumulado
-            
-            # Verificar si se completó
-            from app.models.goal import EstadoMeta
-            if monto_acumulado >= meta.monto_objetivo and meta.estado == EstadoMeta.activa:
-                meta.estado = EstadoMeta.completada
-            
-            self.db.commit()
-            self.db.refresh(meta)
+    def _record_activity(self, contribution: AporteMeta, evento: str, group_id: Optional[int] = None):
+        """Registrar la acción sobre el aporte en la actividad del grupo de su meta, si es grupal (sin commit)"""
+        if group_id is None:
+            group_id = self.db.query(Meta.id_grupo).filter(Meta.id_meta == contribution.id_meta).scalar()
+        if not group_id:
+            return
+
+        if contribution.id_aporte is None:
+            self.db.flush()
+        GroupActivityService(self.db).record(group_id, evento, contribution.id_usuario, {
+            "id_aporte": contribution.id_aporte,
+            "id_meta": contribution.id_meta,
+            "monto": contribution.monto,
+            "fecha": contribution.fecha,
+            "id_usuario": contribution.id_usuario
+        })
 
     def get_contribution_by_id(self, contribution_id: int, user_id: int) -> Optional[AporteMeta]:
         """Obtener aporte por ID (solo del usuario autenticado)"""
@@ -84,28 +78,36 @@ class GoalContributionService:
         ).first()
         return contribution
 
-    def get_contributions_by_goal(self, goal_id: int, user_id: int, skip: int = 0, limit: int = 100) -> List[AporteMeta]:
-        """Obtener todos los aportes de una meta (solo si el usuario tiene acceso)"""
-        # Verificar acceso a la meta
-        meta = self.db.query(Meta).filter(Meta.id_meta == goal_id).first()
+    def get_contributions_by_goal(self, goal_id: int, user_id: int, skip: int = 0, limit: int = 100,
+                                  before_id: Optional[int] = None) -> List[dict]:
+        """
+        Obtener una página de aportes de una meta (solo si el usuario tiene acceso), del más
+        reciente al más antiguo, con el nombre de quien aportó y de la meta.
+        La paginación es por cursor (`before_id`, el id_aporte del último aporte recibido) sobre
+        el índice (id_meta, id_aporte); los nombres se leen en la misma consulta que la página.
+        """
+        meta = GoalService(self.db).get_goal_by_id(goal_id, user_id)
         if not meta:
             return []
-        
-        if meta.id_usuario != user_id:
-            if meta.id_grupo:
-                from app.models.user_group import UsuarioGrupo
-                user_in_group = self.db.query(UsuarioGrupo).filter(
-                    UsuarioGrupo.id_usuario == user_id,
-                    UsuarioGrupo.id_grupo == meta.id_grupo
-                ).first()
-                if not user_in_group:
-                    return []
-            else:
-                return []
-        
-        return self.db.query(AporteMeta).filter(
-            AporteMeta.id_meta == goal_id
-        ).offset(skip).limit(limit).all()
+
+        query = self.db.query(
+            AporteMeta.id_aporte,
+            AporteMeta.id_meta,
+            AporteMeta.id_usuario,
+            AporteMeta.monto,
+            AporteMeta.fecha,
+            AporteMeta.id_ingreso,
+            AporteMeta.id_gasto,
+            Usuario.nombre.label("nombre_usuario")
+        ).outerjoin(
+            Usuario, Usuario.id_usuario == AporteMeta.id_usuario
+        ).filter(AporteMeta.id_meta == goal_id)
+
+        if before_id is not None:
+            query = query.filter(AporteMeta.id_aporte < before_id)
+
+        rows = query.order_by(AporteMeta.id_aporte.desc()).offset(skip).limit(limit).all()
+        return [{**row._asdict(), "nombre_meta": meta.nombre} for row in rows]
 
     def get_contributions_by_user(self, user_id: int, skip: int = 0, limit: int = 100) -> List[AporteMeta]:
         """Obtener todos los aportes de un usuario"""
@@ -119,16 +121,17 @@ class GoalContributionService:
         if not contribution:
             return None
 
+        previous_monto = contribution.monto
         update_data = contribution_data.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(contribution, field, value)
 
+        # Actualizar monto acumulado de la meta con la diferencia
+        GoalService(self.db).apply_contribution_deltas({contribution.id_meta: (contribution.monto - previous_monto, 0)})
+        self._record_activity(contribution, "aporte_actualizado")
         self.db.commit()
         self.db.refresh(contribution)
         
-        # Actualizar monto acumulado de la meta
-        self._update_goal_accumulated(contribution.id_meta)
-        
         return contribution
 
     def delete_contribution(self, contribution_id: int, user_id: int) -> bool:
@@ -137,13 +140,12 @@ class GoalContributionService:
         if not contribution:
             return False
 
-        goal_id = contribution.id_meta
+        # Actualizar monto acumulado de la meta en la misma transacción
+        GoalService(self.db).apply_contribution_deltas({contribution.id_meta: (-contribution.monto, -1)})
+        self._record_activity(contribution, "aporte_eliminado")
         self.db.delete(contribution)
         self.db.commit()
         
-        # Actualizar monto acumulado de la meta
-        self._update_goal_accumulated(goal_id)
-        
         return True
 
     def get_total_contributions_by_goal(self, goal_id: int, user_id: int) -> float:
@@ -0,0 +1,167 @@
+"""
+Servicio para proyectar cuándo se completará una meta (simulación de Monte Carlo)
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, literal, union_all
+from typing import Optional
+from datetime import date
+from decimal import Decimal
+import numpy as np
+from app.core.cache import LRUCache
+from app.models.expense import Gasto
+from app.models.goal import Meta, EstadoMeta
+from app.models.goal_contribution import AporteMeta
+from app.models.income import Ingreso
+from app.services.goal_service import GoalService
+from app.services.spending_series_service import month_start
+
+# Meses de historia con que se estima el excedente mensual y el ritmo de aportes
+HISTORY_MONTHS = 12
+
+# Meses simulados como máximo; más allá se considera que la meta no se alcanza
+MAX_HORIZON_MONTHS = 120
+
+# Proyecciones indexadas por el estado de la meta (cambia con cada aporte) y el día
+_projection_cache = LRUCache(maxsize=2048)
+
+
+def simulate_completion(surpluses: np.ndarray, rate: float, remaining: float,
+                        horizon: int, simulations: int, seed: int) -> np.ndarray:
+    """
+    Simular `simulations` trayectorias de `horizon` meses en una sola operación: cada mes
+    toma al azar un excedente histórico (bootstrap) y aporta a la meta la fracción `rate`
+    de lo positivo. Devuelve, por trayectoria, el mes (1..horizon) en que se alcanza
+    `remaining`, o 0 si no se alcanza.
+    """
+    rng = np.random.default_rng(seed)
+    samples = rng.choice(surpluses, size=(simulations, horizon))
+    saved = np.cumsum(np.clip(samples, 0, None) * rate, axis=1)
+
+    reached = saved >= remaining
+    months = reached.argmax(axis=1) + 1
+    months[~reached.any(axis=1)] = 0
+    return months
+
+
+class GoalProjectionService:
+    """Servicio para estimar la fecha de cumplimiento de una meta"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_projection(self, goal_id: int, user_id: int, simulations: int = 5000,
+                       today: Optional[date] = None) -> Optional[dict]:
+        """
+        Proyectar la fecha en que se completará una meta a partir del excedente mensual
+        (ingresos - gastos) de su dueño, o del grupo si es grupal, y de la parte de ese
+        excedente que históricamente se destinó a la meta.
+
+        El resultado se reutiliza mientras la meta no reciba aportes nuevos (y durante el día).
+        """
+        goal = GoalService(self.db).get_goal_by_id(goal_id, user_id)
+        if not goal:
+            return None
+
+        today = today or date.today()
+        cache_key = (
+            goal.id_meta, goal.total_aportes, goal.monto_acumulado, goal.monto_objetivo,
+            goal.fecha_fin, goal.estado, today, simulations
+        )
+        projection = _projection_cache.get(cache_key)
+        if projection is not None:
+            return projection
+
+        projection = self._project(goal, simulations, today)
+        _projection_cache.set(cache_key, projection)
+        return projection
+
+    def _project(self, goal: Meta, simulations: int, today: date) -> dict:
+        contributions, surpluses = self._load_history(goal, today)
+        remaining = float(goal.monto_objetivo - (goal.monto_acumulado or Decimal('0.00')))
+        months_to_deadline = None
+        if goal.fecha_fin:
+            months_to_deadline = (goal.fecha_fin.year - today.year) * 12 + goal.fecha_fin.month - today.month
+
+        positive_surplus = float(np.clip(surpluses, 0, None).sum())
+        rate = min(float(contributions.sum()) / positive_surplus, 1.0) if positive_surplus > 0 else 0.0
+
+        projection = {
+            "id_meta": goal.id_meta,
+            "faltante": max(remaining, 0.0),
+            "meses_historial": HISTORY_MONTHS,
+            "aporte_mensual_promedio": round(float(contributions.mean()), 2),
+            "excedente_mensual_promedio": round(float(surpluses.mean()), 2),
+            "tasa_ahorro": round(rate, 4),
+            "simulaciones": simulations,
+            "probabilidad_en_plazo": None,
+            "fecha_estimada": None,
+            "fecha_optimista": None,
+            "fecha_pesimista": None
+        }
+
+        if remaining <= 0 or goal.estado == EstadoMeta.completada:
+            projection.update(probabilidad_en_plazo=1.0, fecha_estimada=today, fecha_optimista=today, fecha_pesimista=today)
+            return projection
+
+        if rate <= 0:
+            # Sin aportes o sin excedente no hay ritmo que proyectar
+            if months_to_deadline is not None:
+                projection["probabilidad_en_plazo"] = 0.0
+            return projection
+
+        horizon = min(max(months_to_deadline or 0, 60), MAX_HORIZON_MONTHS)
+        months = simulate_completion(surpluses, rate, remaining, horizon, simulations, seed=goal.id_meta)
+        reached = months[months > 0]
+
+        if months_to_deadline is not None:
+            on_time = np.count_nonzero((months > 0) & (months <= months_to_deadline))
+            projection["probabilidad_en_plazo"] = round(on_time / simulations, 4)
+
+        # Percentiles sobre todas las trayectorias: las que no llegan cuentan como "después del horizonte"
+        if len(reached) > simulations // 2:
+            completion = np.where(months > 0, months, horizon + 1)
+            for key, percentile in (("fecha_optimista", 10), ("fecha_estimada", 50), ("fecha_pesimista", 90)):
+                month = int(np.percentile(completion, percentile))
+                projection[key] = month_start(today, month) if month <= horizon else None
+
+        return projection
+
+    def _load_history(self, goal: Meta, today: date):
+        """
+        Cargar con una sola consulta los aportes a la meta y el excedente mensual de los
+        últimos HISTORY_MONTHS meses completos. Devuelve dos arreglos (aportes, excedentes).
+        """
+        start = month_start(today, -HISTORY_MONTHS)
+        end = month_start(today)
+
+        if goal.id_grupo:
+            income_owner = Ingreso.id_grupo == goal.id_grupo
+            expense_owner = Gasto.id_grupo == goal.id_grupo
+        else:
+            income_owner = Ingreso.id_usuario == goal.id_usuario
+            expense_owner = Gasto.id_usuario == goal.id_usuario
+
+        def monthly(kind: str, model, amount, condition):
+            period = func.date_trunc("month", model.fecha)
+            return select(literal(kind).label("tipo"), period.label("mes"), func.sum(amount).label("total")).where(
+                condition, model.fecha >= start, model.fecha < end
+            ).group_by(period)
+
+        statement = union_all(
+            monthly("aporte", AporteMeta, AporteMeta.monto, AporteMeta.id_meta == goal.id_meta),
+            monthly("ingreso", Ingreso, Ingreso.monto, income_owner),
+            monthly("gasto", Gasto, Gasto.monto, expense_owner)
+        )
+
+        contributions = np.zeros(HISTORY_MONTHS)
+        surpluses = np.zeros(HISTORY_MONTHS)
+        for tipo, mes, total in self.db.execute(statement):
+            index = (mes.year - start.year) * 12 + mes.month - start.month
+            if tipo == "aporte":
+                contributions[index] += float(total)
+            elif tipo == "ingreso":
+                surpluses[index] += float(total)
+            else:
+                surpluses[index] -= float(total)
+
+        return contributions, surpluses
@@ -2,8 +2,12 @@
 Servicio para gestión de metas
 """
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import select, update, values, column, case, and_, or_, exists, func, literal, Integer, Numeric
+from typing import Dict, List, Optional, Tuple
 from app.models.goal import Meta, EstadoMeta
+from app.models.goal_contribution import AporteMeta
+from app.models.group import Grupo
+from app.models.user_group import UsuarioGrupo
 from app.schemas.goal import MetaCreate, MetaUpdate
 from decimal import Decimal
 
@@ -33,29 +37,26 @@ class GoalService:
         return db_goal
 
     def get_goal_by_id(self, goal_id: int, user_id: int) -> Optional[Meta]:
-        """Obtener meta por ID (del usuario o de un grupo al que pertenece)"""
-        goal = self.db.query(Meta).filter(
-            Meta.id_meta == goal_id
+        """Obtener meta por ID (del usuario o de un grupo al que pertenece) en una sola consulta"""
+        return self.db.query(Meta).filter(
+            Meta.id_meta == goal_id,
+            self._accessible_by(user_id)
         ).first()
-        
-        if not goal:
-            return None
-        
-        # Si es meta personal del usuario
-        if goal.id_usuario == user_id and not goal.id_grupo:
-            return goal
-        
-        # Si es meta de grupo, verificar que el usuario pertenece al grupo
-        if goal.id_grupo:
-            from app.models.user_group import UsuarioGrupo
-            user_in_group = self.db.query(UsuarioGrupo).filter(
+
+    def _accessible_by(self, user_id: int):
+        """
+        Condición de acceso: meta personal del usuario o meta de un grupo al que pertenece
+        (que no esté en proceso de eliminación)
+        """
+        return or_(
+            and_(Meta.id_grupo.is_(None), Meta.id_usuario == user_id),
+            exists().where(
+                UsuarioGrupo.id_grupo == Meta.id_grupo,
                 UsuarioGrupo.id_usuario == user_id,
-                UsuarioGrupo.id_grupo == goal.id_grupo
-            ).first()
-            if user_in_group:
-                return goal
-        
-        return None
+                Grupo.id_grupo == UsuarioGrupo.id_grupo,
+                Grupo.eliminando.is_(False)
+            )
+        )
 
     def get_goals_by_user(self, user_id: int, skip: int = 0, limit: int = 100, personal_only: bool = False) -> List[Meta]:
         """Obtener todas las metas de un usuario (personales o todas incluyendo grupos)"""
@@ -66,7 +67,44 @@ class GoalService:
         if personal_only:
             query = query.filter(Meta.id_grupo.is_(None))
         
-        return query.offset(skip).limit(limit).all()
+        return query.order_by(Meta.id_meta).offset(skip).limit(limit).all()
+
+    def get_goals_with_progress(self, user_id: int, skip: int = 0, limit: int = 100, personal_only: bool = False) -> List[dict]:
+        """
+        Obtener las metas de un usuario con su progreso en una sola consulta agrupada:
+        el monto y el número de aportes salen de las columnas mantenidas y la fecha del
+        último aporte del MAX sobre aportes_metas (índice por meta y fecha)
+        """
+        query = self.db.query(Meta, func.max(AporteMeta.fecha)).outerjoin(
+            AporteMeta, AporteMeta.id_meta == Meta.id_meta
+        ).filter(
+            Meta.id_usuario == user_id
+        )
+
+        if personal_only:
+            query = query.filter(Meta.id_grupo.is_(None))
+
+        rows = query.group_by(Meta.id_meta).order_by(Meta.id_meta).offset(skip).limit(limit).all()
+
+        goals = []
+        for goal, fecha_ultimo_aporte in rows:
+            monto_acumulado = goal.monto_acumulado or Decimal('0.00')
+            goals.append({
+                "id_meta": goal.id_meta,
+                "nombre": goal.nombre,
+                "monto_objetivo": goal.monto_objetivo,
+                "monto_acumulado": monto_acumulado,
+                "fecha_inicio": goal.fecha_inicio,
+                "fecha_fin": goal.fecha_fin,
+                "estado": goal.estado.value if goal.estado else None,
+                "id_usuario": goal.id_usuario,
+                "id_grupo": goal.id_grupo,
+                "porcentaje_completado": self.progress_of(goal)["porcentaje_completado"],
+                "faltante": max(goal.monto_objetivo - monto_acumulado, Decimal('0.00')),
+                "total_aportes": goal.total_aportes,
+                "fecha_ultimo_aporte": fecha_ultimo_aporte
+            })
+        return goals
 
     def get_goals_by_group(self, group_id: int, user_id: int, skip: int = 0, limit: int = 100) -> List[Meta]:
         """Obtener metas de un grupo (solo si el usuario pertenece al grupo)"""
@@ -92,12 +130,8 @@ class GoalService:
 
         # Verificar que el grupo sea válido si se está actualizando
         if goal_data.id_grupo is not None:
-            from app.models.user_group import UsuarioGrupo
-            user_in_group = self.db.query(UsuarioGrupo).filter(
-                UsuarioGrupo.id_usuario == user_id,
-                UsuarioGrupo.id_grupo == goal_data.id_grupo
-            ).first()
-            if not user_in_group:
+            from app.services.group_service import GroupService
+            if not GroupService(self.db).is_user_in_group(goal_data.id_grupo, user_id):
                 return None
 
         update_data = goal_data.dict(exclude_unset=True)
@@ -124,32 +158,21 @@ class GoalService:
         return True
 
     def get_goal_progress(self, goal_id: int, user_id: int) -> Optional[dict]:
-        """Obtener progreso de una meta"""
+        """
+        Obtener progreso de una meta a partir de las columnas mantenidas al registrar
+        aportes (monto_acumulado y total_aportes): una sola consulta y sin escrituras
+        """
         goal = self.get_goal_by_id(goal_id, user_id)
         if not goal:
             return None
-        
-        # Calcular monto acumulado desde aportes
-        from app.models.goal_contribution import AporteMeta
-        from sqlalchemy import func
-        
-        total_aportes = self.db.query(func.sum(AporteMeta.monto)).filter(
-            AporteMeta.id_meta == goal_id
-        ).scalar()
-        
-        monto_acumulado = Decimal(str(total_aportes)) if total_aportes else Decimal('0.00')
-        
-        # Actualizar monto acumulado en la meta si es diferente
-        if goal.monto_acumulado != monto_acumulado:
-            goal.monto_acumulado = monto_acumulado
-            # Verificar si se completó
-            if monto_acumulado >= goal.monto_objetivo and goal.estado == EstadoMeta.activa:
-                goal.estado = EstadoMeta.completada
-            self.db.commit()
-            self.db.refresh(goal)
-        
+
+        return self.progress_of(goal)
+
+    def progress_of(self, goal: Meta) -> dict:
+        """Calcular el progreso de una meta ya cargada"""
+        monto_acumulado = goal.monto_acumulado or Decimal('0.00')
         porcentaje = float((monto_acumulado / goal.monto_objetivo) * 100) if goal.monto_objetivo > 0 else 0.0
-        
+
         return {
             "id_meta": goal.id_meta,
             "nombre": goal.nombre,
@@ -157,9 +180,68 @@ class GoalService:
             "monto_acumulado": float(monto_acumulado),
             "porcentaje_completado": round(porcentaje, 2),
             "estado": goal.estado.value if goal.estado else None,
-            "faltante": float(goal.monto_objetivo - monto_acumulado) if monto_acumulado < goal.monto_objetivo else 0.0
+            "faltante": float(goal.monto_objetivo - monto_acumulado) if monto_acumulado < goal.monto_objetivo else 0.0,
+            "total_aportes": goal.total_aportes
         }
 
+    def apply_contribution_deltas(self, deltas: Dict[int, Tuple[Decimal, int]]) -> Dict[int, tuple]:
+        """
+        Aplicar a cada meta el cambio en sus aportes {id_meta: (monto, cantidad)} sobre
+        monto_acumulado y total_aportes, con un único UPDATE ... FROM (VALUES ...) RETURNING.
+        En la misma sentencia, las metas activas que alcanzan el objetivo pasan a
+        completadas. Devuelve {id_meta: (monto_acumulado, estado)}; no hace commit.
+        """
+        deltas = {goal_id: (monto, cantidad) for goal_id, (monto, cantidad) in deltas.items() if monto or cantidad}
+        if not deltas:
+            return {}
+
+        changes = values(
+            column("id_meta", Integer), column("monto", Numeric(12, 2)), column("cantidad", Integer), name="cambios"
+        ).data([(goal_id, monto, cantidad) for goal_id, (monto, cantidad) in deltas.items()])
+        nuevo_monto = func.coalesce(Meta.monto_acumulado, 0) + changes.c.monto
+
+        rows = self.db.execute(
+            update(Meta).where(Meta.id_meta == changes.c.id_meta).values(
+                monto_acumulado=nuevo_monto,
+                total_aportes=Meta.total_aportes + changes.c.cantidad,
+                estado=case(
+                    (
+                        and_(Meta.estado == EstadoMeta.activa, nuevo_monto >= Meta.monto_objetivo),
+                        literal(EstadoMeta.completada, Meta.estado.type)
+                    ),
+                    else_=Meta.estado
+                )
+            ).returning(Meta.id_meta, Meta.monto_acumulado, Meta.estado),
+            execution_options={"synchronize_session": False}
+        )
+        return {goal_id: (monto, estado) for goal_id, monto, estado in rows}
+
+    def reconcile_accumulated(self) -> Dict[int, Tuple[Decimal, int]]:
+        """
+        Comparar monto_acumulado y total_aportes de todas las metas con sus aportes y
+        corregir las diferencias. Devuelve {id_meta: (diferencia de monto, diferencia de cantidad)}.
+        """
+        totals = select(
+            AporteMeta.id_meta,
+            func.sum(AporteMeta.monto).label("monto"),
+            func.count().label("cantidad")
+        ).group_by(AporteMeta.id_meta).subquery()
+        amount_drift = func.coalesce(totals.c.monto, 0) - func.coalesce(Meta.monto_acumulado, 0)
+        count_drift = func.coalesce(totals.c.cantidad, 0) - Meta.total_aportes
+
+        # Una sola lectura: los totales y los acumulados salen de la misma instantánea, así
+        # que aplicar la diferencia como incremento es correcto aunque haya aportes concurrentes
+        rows = self.db.execute(
+            select(Meta.id_meta, amount_drift, count_drift).outerjoin(
+                totals, totals.c.id_meta == Meta.id_meta
+            ).where(or_(amount_drift != 0, count_drift != 0))
+        ).all()
+
+        deltas = {goal_id: (monto, cantidad) for goal_id, monto, cantidad in rows}
+        self.apply_contribution_deltas(deltas)
+        self.db.commit()
+        return deltas
+
     def get_goals_by_status(self, user_id: int, estado: str, personal_only: bool = False) -> List[Meta]:
         """Obtener metas por estado"""
         query = self.db.query(Meta).filter(
@@ -0,0 +1,76 @@
+"""
+Servicio para el historial de actividad de los grupos
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from typing import Optional
+import json
+from app.core.events import publish_group_event
+from app.models.group_activity import ActividadGrupo
+from app.models.user import Usuario
+
+
+class GroupActivityService:
+    """Servicio para registrar y consultar quién hizo qué en un grupo"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record(self, group_id: int, evento: str, actor_id: Optional[int], datos: dict) -> int:
+        """
+        Registrar una acción en el historial del grupo, incrementar su versión de datos
+        (invalida las cachés del grupo) y notificarla en tiempo real.
+        Se ejecuta dentro de la transacción de la escritura; no hace commit.
+        """
+        from app.services.group_service import GroupService
+        GroupService(self.db).bump_data_version(group_id)
+
+        id_actividad, fecha = self.db.execute(
+            insert(ActividadGrupo).values(
+                id_grupo=group_id,
+                id_usuario=actor_id,
+                evento=evento,
+                datos=json.dumps(datos, default=str, ensure_ascii=False)
+            ).returning(ActividadGrupo.id_actividad, ActividadGrupo.fecha)
+        ).one()
+
+        publish_group_event(
+            self.db, group_id, evento, datos,
+            id_actividad=id_actividad, id_usuario=actor_id, fecha=fecha
+        )
+        return id_actividad
+
+    def get_feed(self, group_id: int, before_id: Optional[int] = None, limit: int = 50) -> dict:
+        """
+        Obtener una página del historial del grupo, del más reciente al más antiguo.
+        La paginación es por cursor (`before_id`) sobre el índice (id_grupo, id_actividad),
+        y los nombres de los usuarios se resuelven con una sola consulta por página.
+        """
+        query = self.db.query(ActividadGrupo).filter(ActividadGrupo.id_grupo == group_id)
+        if before_id is not None:
+            query = query.filter(ActividadGrupo.id_actividad < before_id)
+
+        # Se lee una fila extra para saber si hay más páginas
+        rows = query.order_by(ActividadGrupo.id_actividad.desc()).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        actor_ids = {row.id_usuario for row in rows if row.id_usuario is not None}
+        names = dict(self.db.query(Usuario.id_usuario, Usuario.nombre).filter(
+            Usuario.id_usuario.in_(actor_ids)
+        ).all()) if actor_ids else {}
+
+        return {
+            "actividades": [
+                {
+                    "id_actividad": row.id_actividad,
+                    "evento": row.evento,
+                    "id_usuario": row.id_usuario,
+                    "nombre_usuario": names.get(row.id_usuario),
+                    "datos": json.loads(row.datos),
+                    "fecha": row.fecha
+                }
+                for row in rows
+            ],
+            "siguiente_cursor": rows[-1].id_actividad if has_more else None
+        }
@@ -0,0 +1,150 @@
+"""
+Servicio para el resumen (dashboard) de un grupo
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, case, literal, literal_column, union_all, exists, and_, text
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from typing import Optional
+from app.models.expense import Gasto
+from app.models.goal import Meta
+from app.models.group import Grupo
+from app.models.income import Ingreso
+from app.models.user import Usuario
+from app.models.user_group import UsuarioGrupo
+
+EMPTY_JSON_ARRAY = text("'[]'::json")
+
+
+class GroupDashboardService:
+    """Servicio para obtener en una sola consulta todo lo que muestra la pantalla de un grupo"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_dashboard(self, group_id: int, user_id: int, recent_limit: int = 10) -> Optional[dict]:
+        """
+        Obtener totales, gasto por miembro, progreso de metas y movimientos recientes del grupo.
+
+        Todo se calcula en una única sentencia con CTEs; `es_miembro` indica si `user_id`
+        pertenece al grupo para que el llamador autorice sin otra consulta.
+        Devuelve None si el grupo no existe.
+        """
+        gastos_por_usuario = select(
+            Gasto.id_usuario,
+            func.sum(Gasto.monto).label("total"),
+            func.count(Gasto.id_gasto).label("cantidad")
+        ).where(
+            Gasto.id_grupo == group_id
+        ).group_by(Gasto.id_usuario).cte("gastos_por_usuario")
+
+        ingresos = select(
+            func.coalesce(func.sum(Ingreso.monto), 0).label("total"),
+            func.count(Ingreso.id_ingreso).label("cantidad")
+        ).where(Ingreso.id_grupo == group_id).cte("ingresos_grupo")
+
+        miembros = select(
+            Usuario.id_usuario,
+            Usuario.nombre,
+            UsuarioGrupo.rol,
+            func.coalesce(gastos_por_usuario.c.total, 0).label("total_gastado"),
+            func.coalesce(gastos_por_usuario.c.cantidad, 0).label("cantidad_gastos")
+        ).select_from(UsuarioGrupo).join(
+            Usuario, Usuario.id_usuario == UsuarioGrupo.id_usuario
+        ).outerjoin(
+            gastos_por_usuario, gastos_por_usuario.c.id_usuario == UsuarioGrupo.id_usuario
+        ).where(UsuarioGrupo.id_grupo == group_id).cte("miembros")
+
+        metas = select(
+            Meta.id_meta,
+            Meta.nombre,
+            Meta.monto_objetivo,
+            func.coalesce(Meta.monto_acumulado, 0).label("monto_acumulado"),
+            Meta.estado,
+            Meta.fecha_fin,
+            case(
+                (Meta.monto_objetivo > 0,
+                 func.round(func.coalesce(Meta.monto_acumulado, 0) * 100 / Meta.monto_objetivo, 2)),
+                else_=0
+            ).label("porcentaje_completado")
+        ).where(Meta.id_grupo == group_id).cte("metas_grupo")
+
+        # Cada rama se limita antes de unirlas para aprovechar el índice (id_grupo, fecha)
+        ultimos_gastos = select(
+            literal("gasto").label("tipo"),
+            Gasto.id_gasto.label("id"),
+            Gasto.descripcion,
+            Gasto.monto,
+            Gasto.fecha,
+            Gasto.id_usuario
+        ).where(Gasto.id_grupo == group_id).order_by(
+            Gasto.fecha.desc(), Gasto.id_gasto.desc()
+        ).limit(recent_limit)
+        ultimos_ingresos = select(
+            literal("ingreso").label("tipo"),
+            Ingreso.id_ingreso.label("id"),
+            Ingreso.descripcion,
+            Ingreso.monto,
+            Ingreso.fecha,
+            Ingreso.id_usuario
+        ).where(Ingreso.id_grupo == group_id).order_by(
+            Ingreso.fecha.desc(), Ingreso.id_ingreso.desc()
+        ).limit(recent_limit)
+        recientes = union_all(
+            ultimos_gastos.subquery().select(), ultimos_ingresos.subquery().select()
+        ).order_by(
+            literal_column("fecha").desc(), literal_column("id").desc()
+        ).limit(recent_limit).cte("recientes")
+
+        statement = select(
+            Grupo.id_grupo,
+            Grupo.nombre,
+            Grupo.total_miembros,
+            exists().where(
+                and_(UsuarioGrupo.id_grupo == Grupo.id_grupo, UsuarioGrupo.id_usuario == user_id)
+            ).label("es_miembro"),
+            select(func.coalesce(func.sum(gastos_por_usuario.c.total), 0)).scalar_subquery().label("total_gastos"),
+            select(func.coalesce(func.sum(gastos_por_usuario.c.cantidad), 0)).scalar_subquery().label("cantidad_gastos"),
+            select(ingresos.c.total).scalar_subquery().label("total_ingresos"),
+            select(ingresos.c.cantidad).scalar_subquery().label("cantidad_ingresos"),
+            select(func.coalesce(func.json_agg(aggregate_order_by(
+                func.json_build_object(
+                    "id_usuario", miembros.c.id_usuario,
+                    "nombre", miembros.c.nombre,
+                    "rol", miembros.c.rol,
+                    "total_gastado", miembros.c.total_gastado,
+                    "cantidad_gastos", miembros.c.cantidad_gastos
+                ),
+                miembros.c.total_gastado.desc()
+            )), EMPTY_JSON_ARRAY)).scalar_subquery().label("miembros"),
+            select(func.coalesce(func.json_agg(aggregate_order_by(
+                func.json_build_object(
+                    "id_meta", metas.c.id_meta,
+                    "nombre", metas.c.nombre,
+                    "monto_objetivo", metas.c.monto_objetivo,
+                    "monto_acumulado", metas.c.monto_acumulado,
+                    "porcentaje_completado", metas.c.porcentaje_completado,
+                    "estado", metas.c.estado,
+                    "fecha_fin", metas.c.fecha_fin
+                ),
+                metas.c.id_meta
+            )), EMPTY_JSON_ARRAY)).scalar_subquery().label("metas"),
+            select(func.coalesce(func.json_agg(aggregate_order_by(
+                func.json_build_object(
+                    "tipo", recientes.c.tipo,
+                    "id", recientes.c.id,
+                    "descripcion", recientes.c.descripcion,
+                    "monto", recientes.c.monto,
+                    "fecha", recientes.c.fecha,
+                    "id_usuario", recientes.c.id_usuario
+                ),
+                recientes.c.fecha.desc(), recientes.c.id.desc()
+            )), EMPTY_JSON_ARRAY)).scalar_subquery().label("movimientos_recientes")
+        ).where(Grupo.id_grupo == group_id, Grupo.eliminando.is_(False))
+
+        row = self.db.execute(statement).mappings().first()
+        if not row:
+            return None
+
+        dashboard = dict(row)
+        dashboard["balance"] = float(dashboard["total_ingresos"]) - float(dashboard["total_gastos"])
+        return dashboard
@@ -1,12 +1,16 @@
 """
 Servicio para gestión de grupos
 """
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import update, delete, select, func, literal
+from sqlalchemy.dialects.postgresql import insert
+from typing import List, Optional, Tuple
 from datetime import datetime, timedelta
 from app.models.group import Grupo
+from app.models.user import Usuario
 from app.models.user_group import UsuarioGrupo, RolGrupo
 from app.schemas.group import GrupoCreate, GrupoUpdate
+from app.services.group_activity_service import GroupActivityService
 
 
 class GroupService:
@@ -20,7 +24,8 @@ class GroupService:
         db_group = Grupo(
             nombre=group_data.nombre,
             descripcion=group_data.descripcion,
-            creado_por=creator_id
+            creado_por=creator_id,
+            total_miembros=1
         )
 
         self.db.add(db_group)
@@ -33,24 +38,27 @@ class GroupService:
             rol=RolGrupo.admin
         )
         self.db.add(usuario_grupo)
+        GroupActivityService(self.db).record(db_group.id_grupo, "grupo_creado", creator_id, {"nombre": db_group.nombre})
         self.db.commit()
         self.db.refresh(db_group)
         return db_group
 
     def get_group_by_id(self, group_id: int) -> Optional[Grupo]:
         """Obtener grupo por ID"""
-        return self.db.query(Grupo).filter(Grupo.id_grupo == group_id).first()
+        return self.db.query(Grupo).filter(Grupo.id_grupo == group_id, Grupo.eliminando.is_(False)).first()
 
     def get_user_groups(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Grupo]:
         """Obtener todos los grupos a los que pertenece un usuario"""
         return self.db.query(Grupo).join(UsuarioGrupo).filter(
-            UsuarioGrupo.id_usuario == user_id
+            UsuarioGrupo.id_usuario == user_id,
+            Grupo.eliminando.is_(False)
         ).offset(skip).limit(limit).all()
 
     def get_groups_created_by_user(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Grupo]:
         """Obtener grupos creados por un usuario"""
         return self.db.query(Grupo).filter(
-            Grupo.creado_por == user_id
+            Grupo.creado_por == user_id,
+            Grupo.eliminando.is_(False)
         ).offset(skip).limit(limit).all()
 
     def update_group(self, group_id: int, group_data: GrupoUpdate, user_id: int) -> Optional[Grupo]:
@@ -71,32 +79,52 @@ class GroupService:
         self.db.refresh(group)
         return group
 
-    def delete_group(self, group_id: int, user_id: int) -> bool:
-        """Eliminar grupo (solo el creador puede eliminar)"""
-        group = self.get_group_by_id(group_id)
-        if not group:
-            return False
+    def get_data_version(self, group_id: int) -> Optional[int]:
+        """Obtener la versión de datos del grupo (None si no existe)"""
+        return self.db.query(Grupo.version_datos).filter(Grupo.id_grupo == group_id).scalar()
 
-        # Solo el creador puede eliminar
-        if group.creado_por != user_id:
-            return False
+    def bump_data_version(self, group_id: int):
+        """Incrementar atómicamente la versión de datos del grupo (sin commit)"""
+        self.db.execute(
+            update(Grupo).where(Grupo.id_grupo == group_id).values(version_datos=Grupo.version_datos + 1),
+            execution_options={"synchronize_session": False}
+        )
+
+    def adjust_member_count(self, group_ids: List[int], delta: int):
+        """Sumar `delta` al contador de miembros de los grupos indicados (sin commit)"""
+        if not group_ids:
+            return
+        self.db.execute(
+            update(Grupo).where(Grupo.id_grupo.in_(group_ids)).values(total_miembros=Grupo.total_miembros + delta),
+            execution_options={"synchronize_session": False}
+        )
 
-        self.db.delete(group)
+    def recount_members(self) -> int:
+        """Recalcular el contador de miembros de todos los grupos a partir de usuarios_grupos"""
+        counts = self.db.query(func.count(UsuarioGrupo.id_usuario)).filter(
+            UsuarioGrupo.id_grupo == Grupo.id_grupo
+        ).scalar_subquery()
+        result = self.db.execute(
+            update(Grupo).where(Grupo.total_miembros != counts).values(total_miembros=counts),
+            execution_options={"synchronize_session": False}
+        )
         self.db.commit()
-        return True
+        return result.rowcount
 
     def is_user_in_group(self, group_id: int, user_id: int) -> bool:
-        """Verificar si un usuario pertenece a un grupo"""
-        return self.db.query(UsuarioGrupo).filter(
+        """Verificar si un usuario pertenece a un grupo (que no esté en proceso de eliminación)"""
+        return self.db.query(UsuarioGrupo).join(Grupo).filter(
             UsuarioGrupo.id_grupo == group_id,
-            UsuarioGrupo.id_usuario == user_id
+            UsuarioGrupo.id_usuario == user_id,
+            Grupo.eliminando.is_(False)
         ).first() is not None
 
     def _is_group_admin(self, group_id: int, user_id: int) -> bool:
         """Verificar si un usuario es admin de un grupo"""
-        usuario_grupo = self.db.query(UsuarioGrupo).filter(
+        usuario_grupo = self.db.query(UsuarioGrupo).join(Grupo).filter(
             UsuarioGrupo.id_grupo == group_id,
-            UsuarioGrupo.id_usuario == user_id
+            UsuarioGrupo.id_usuario == user_id,
+            Grupo.eliminando.is_(False)
         ).first()
         
         if not usuario_grupo:
@@ -104,7 +132,7 @@ class GroupService:
         
         return usuario_grupo.rol == RolGrupo.admin
 
-    def add_user_to_group(self, group_id: int, user_id: int, rol: RolGrupo = RolGrupo.miembro) -> bool:
+    def add_user_to_group(self, group_id: int, user_id: int, rol: RolGrupo = RolGrupo.miembro, actor_id: Optional[int] = None) -> bool:
         """Agregar usuario a un grupo"""
         # Verificar que no esté ya en el grupo
         if self.is_user_in_group(group_id, user_id):
@@ -116,6 +144,10 @@ class GroupService:
             rol=rol
         )
         self.db.add(usuario_grupo)
+        self.adjust_member_count([group_id], 1)
+        GroupActivityService(self.db).record(
+            group_id, "miembro_agregado", actor_id or user_id, {"id_usuario": user_id, "rol": rol.value}
+        )
         self.db.commit()
         return True
 
@@ -139,14 +171,103 @@ class GroupService:
             return False
 
         self.db.delete(usuario_grupo)
+        self.adjust_member_count([group_id], -1)
+        GroupActivityService(self.db).record(group_id, "miembro_eliminado", remover_id, {"id_usuario": user_id})
         self.db.commit()
         return True
 
-    def get_group_members(self, group_id: int) -> List[UsuarioGrupo]:
-        """Obtener todos los miembros de un grupo"""
-        return self.db.query(UsuarioGrupo).filter(
+    def bulk_add_members(self, group_id: int, user_ids: List[int], rol: RolGrupo, admin_id: int) -> Optional[List[int]]:
+        """
+        Agregar varios usuarios al grupo con un solo INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+        Devuelve los ids agregados (los ya miembros o inexistentes se omiten); None si no es admin.
+        """
+        if not self._is_group_admin(group_id, admin_id):
+            return None
+
+        statement = insert(UsuarioGrupo).from_select(
+            [UsuarioGrupo.id_usuario, UsuarioGrupo.id_grupo, UsuarioGrupo.rol],
+            select(
+                Usuario.id_usuario,
+                literal(group_id),
+                literal(rol, UsuarioGrupo.rol.type)
+            ).where(Usuario.id_usuario.in_(user_ids))
+        ).on_conflict_do_nothing().returning(UsuarioGrupo.id_usuario)
+        added = sorted(self.db.execute(statement).scalars())
+
+        if added:
+            self.adjust_member_count([group_id], len(added))
+            GroupActivityService(self.db).record(
+                group_id, "miembros_agregados", admin_id, {"usuarios": added, "rol": rol.value}
+            )
+        self.db.commit()
+        return added
+
+    def bulk_remove_members(self, group_id: int, user_ids: List[int], admin_id: int) -> Optional[List[int]]:
+        """
+        Remover varios miembros del grupo con un solo DELETE (el creador nunca se remueve).
+        Devuelve los ids removidos; None si no es admin.
+        """
+        if not self._is_group_admin(group_id, admin_id):
+            return None
+
+        creator = select(Grupo.creado_por).where(Grupo.id_grupo == group_id).scalar_subquery()
+        statement = delete(UsuarioGrupo).where(
+            UsuarioGrupo.id_grupo == group_id,
+            UsuarioGrupo.id_usuario.in_(user_ids),
+            UsuarioGrupo.id_usuario != creator
+        ).returning(UsuarioGrupo.id_usuario)
+        removed = sorted(self.db.execute(statement, execution_options={"synchronize_session": False}).scalars())
+
+        if removed:
+            self.adjust_member_count([group_id], -len(removed))
+            GroupActivityService(self.db).record(group_id, "miembros_eliminados", admin_id, {"usuarios": removed})
+        self.db.commit()
+        return removed
+
+    def bulk_change_role(self, group_id: int, user_ids: List[int], new_rol: RolGrupo, admin_id: int) -> Optional[List[int]]:
+        """
+        Cambiar el rol de varios miembros con un solo UPDATE (el rol del creador nunca cambia,
+        así el grupo conserva siempre un admin). Devuelve los ids actualizados; None si no es admin.
+        """
+        if not self._is_group_admin(group_id, admin_id):
+            return None
+
+        creator = select(Grupo.creado_por).where(Grupo.id_grupo == group_id).scalar_subquery()
+        statement = update(UsuarioGrupo).where(
+            UsuarioGrupo.id_grupo == group_id,
+            UsuarioGrupo.id_usuario.in_(user_ids),
+            UsuarioGrupo.id_usuario != creator,
+            UsuarioGrupo.rol != new_rol
+        ).values(rol=new_rol).returning(UsuarioGrupo.id_usuario)
+        updated = sorted(self.db.execute(statement, execution_options={"synchronize_session": False}).scalars())
+
+        if updated:
+            GroupActivityService(self.db).record(
+                group_id, "roles_actualizados", admin_id, {"usuarios": updated, "rol": new_rol.value}
+            )
+        self.db.commit()
+        return updated
+
+    def get_group_with_creator(self, group_id: int) -> Optional[Grupo]:
+        """Obtener grupo junto con su creador en una sola consulta"""
+        return self.db.query(Grupo).options(
+            joinedload(Grupo.creador)
+        ).filter(Grupo.id_grupo == group_id, Grupo.eliminando.is_(False)).first()
+
+    def get_group_members(self, group_id: int, skip: int = 0, limit: Optional[int] = None) -> List[Tuple[UsuarioGrupo, Usuario]]:
+        """
+        Obtener una página de miembros de un grupo junto con su usuario en una sola consulta,
+        ordenados por fecha de unión
+        """
+        query = self.db.query(UsuarioGrupo, Usuario).join(
+            Usuario, Usuario.id_usuario == UsuarioGrupo.id_usuario
+        ).filter(
             UsuarioGrupo.id_grupo == group_id
-        ).all()
+        ).order_by(UsuarioGrupo.fecha_union, UsuarioGrupo.id_usuario).offset(skip)
+
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
 
     def change_member_role(self, group_id: int, user_id: int, new_rol: RolGrupo, admin_id: int) -> bool:
         """Cambiar el rol de un miembro (solo admin puede hacerlo)"""
@@ -162,6 +283,9 @@ class GroupService:
             return False
 
         usuario_grupo.rol = new_rol
+        GroupActivityService(self.db).record(
+            group_id, "rol_actualizado", admin_id, {"id_usuario": user_id, "rol": new_rol.value}
+        )
         self.db.commit()
         return True
 
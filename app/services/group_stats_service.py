@@ -0,0 +1,111 @@
+"""
+Servicio para estadísticas por miembro de un grupo
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, case, and_
+from typing import List, Optional
+from datetime import date, timedelta
+from app.core.cache import LRUCache
+from app.models.expense import Gasto
+from app.models.goal import Meta
+from app.models.goal_contribution import AporteMeta
+from app.models.income import Ingreso
+from app.models.user import Usuario
+from app.models.user_group import UsuarioGrupo
+from app.services.group_service import GroupService
+
+# Días de cada ventana con que se mide la tendencia de gasto
+TREND_WINDOW_DAYS = 30
+
+# Estadísticas calculadas, indexadas por (id_grupo, version_datos, día)
+_stats_cache = LRUCache(maxsize=1024)
+
+
+def _share(column):
+    """Porcentaje que representa el valor de cada miembro sobre el total del grupo"""
+    return func.round(column * 100 / func.nullif(func.sum(column).over(), 0), 2)
+
+
+class GroupStatsService:
+    """Servicio para comparar a los miembros de un grupo"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_member_stats(self, group_id: int, today: Optional[date] = None) -> Optional[List[dict]]:
+        """
+        Obtener por miembro el gasto, ingreso y aportes a metas del grupo, su participación
+        en cada total, su posición en el ranking de gasto y la tendencia de gasto de los
+        últimos TREND_WINDOW_DAYS días frente a los anteriores.
+
+        Se calcula con una sola sentencia (GROUP BY por tabla y funciones de ventana) y
+        se reutiliza mientras no cambie la versión de datos del grupo.
+        """
+        version = GroupService(self.db).get_data_version(group_id)
+        if version is None:
+            return None
+
+        today = today or date.today()
+        cache_key = (group_id, version, today)
+        stats = _stats_cache.get(cache_key)
+        if stats is not None:
+            return stats
+
+        window_start = today - timedelta(days=TREND_WINDOW_DAYS)
+        previous_start = window_start - timedelta(days=TREND_WINDOW_DAYS)
+
+        gastos = select(
+            Gasto.id_usuario,
+            func.sum(Gasto.monto).label("total"),
+            func.sum(case((Gasto.fecha > window_start, Gasto.monto), else_=0)).label("recientes"),
+            func.sum(case(
+                (and_(Gasto.fecha > previous_start, Gasto.fecha <= window_start), Gasto.monto), else_=0
+            )).label("anteriores")
+        ).where(Gasto.id_grupo == group_id).group_by(Gasto.id_usuario).cte("gastos_miembro")
+
+        ingresos = select(
+            Ingreso.id_usuario,
+            func.sum(Ingreso.monto).label("total")
+        ).where(Ingreso.id_grupo == group_id).group_by(Ingreso.id_usuario).cte("ingresos_miembro")
+
+        aportes = select(
+            AporteMeta.id_usuario,
+            func.sum(AporteMeta.monto).label("total")
+        ).join(Meta, Meta.id_meta == AporteMeta.id_meta).where(
+            Meta.id_grupo == group_id
+        ).group_by(AporteMeta.id_usuario).cte("aportes_miembro")
+
+        miembros = select(
+            UsuarioGrupo.id_usuario,
+            Usuario.nombre,
+            func.coalesce(gastos.c.total, 0).label("total_gastado"),
+            func.coalesce(ingresos.c.total, 0).label("total_ingresado"),
+            func.coalesce(aportes.c.total, 0).label("total_aportado"),
+            func.coalesce(gastos.c.recientes, 0).label("gasto_reciente"),
+            func.coalesce(gastos.c.anteriores, 0).label("gasto_anterior")
+        ).select_from(UsuarioGrupo).join(
+            Usuario, Usuario.id_usuario == UsuarioGrupo.id_usuario
+        ).outerjoin(
+            gastos, gastos.c.id_usuario == UsuarioGrupo.id_usuario
+        ).outerjoin(
+            ingresos, ingresos.c.id_usuario == UsuarioGrupo.id_usuario
+        ).outerjoin(
+            aportes, aportes.c.id_usuario == UsuarioGrupo.id_usuario
+        ).where(UsuarioGrupo.id_grupo == group_id).cte("miembros")
+
+        statement = select(
+            miembros,
+            _share(miembros.c.total_gastado).label("participacion_gasto"),
+            _share(miembros.c.total_ingresado).label("participacion_ingreso"),
+            _share(miembros.c.total_aportado).label("participacion_aportes"),
+            func.rank().over(order_by=miembros.c.total_gastado.desc()).label("ranking_gasto"),
+            func.round(
+                (miembros.c.gasto_reciente - miembros.c.gasto_anterior) * 100
+                / func.nullif(miembros.c.gasto_anterior, 0), 2
+            ).label("tendencia_gasto")
+        ).order_by("ranking_gasto", miembros.c.id_usuario)
+
+        stats = [dict(row) for row in self.db.execute(statement).mappings()]
+
+        _stats_cache.set(cache_key, stats)
+        return stats
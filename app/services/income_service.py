@@ -5,6 +5,9 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.models.income import Ingreso
 from app.schemas.income import IngresoCreate, IngresoUpdate
+from app.services.contribution_rule_service import ContributionRuleService
+from app.services.group_activity_service import GroupActivityService
+from app.services.group_service import GroupService
 
 
 class IncomeService:
@@ -21,6 +24,7 @@ class IncomeService:
         )
 
         self.db.add(db_income)
+        self._record_activity(db_income, "ingreso_creado", user_id)
         self.db.commit()
         self.db.refresh(db_income)
         return db_income
@@ -40,12 +44,7 @@ class IncomeService:
         
         # Si es ingreso de grupo, verificar que el usuario pertenece al grupo
         if income.id_grupo:
-            from app.models.user_group import UsuarioGrupo
-            user_in_group = self.db.query(UsuarioGrupo).filter(
-                UsuarioGrupo.id_usuario == user_id,
-                UsuarioGrupo.id_grupo == income.id_grupo
-            ).first()
-            if user_in_group:
+            if GroupService(self.db).is_user_in_group(income.id_grupo, user_id):
                 return income
         
         return None
@@ -97,10 +96,20 @@ class IncomeService:
             if not user_in_group:
                 return None
 
+        previous_group = income.id_grupo
         update_data = income_data.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(income, field, value)
 
+        # Rehacer los aportes automáticos si cambia lo que evalúan las reglas
+        if {'monto', 'fecha', 'id_grupo'} & update_data.keys():
+            ContributionRuleService(self.db).recompute_rules([income.id_ingreso], [])
+
+        # Avisar al grupo anterior si el ingreso cambió de grupo
+        if previous_group and previous_group != income.id_grupo:
+            self._record_activity(income, "ingreso_eliminado", user_id, previous_group)
+        self._record_activity(income, "ingreso_actualizado", user_id)
+
         self.db.commit()
         self.db.refresh(income)
         return income
@@ -111,10 +120,28 @@ class IncomeService:
         if not income:
             return False
 
+        ContributionRuleService(self.db).revert_rules([income.id_ingreso], [])
+        self._record_activity(income, "ingreso_eliminado", user_id)
         self.db.delete(income)
         self.db.commit()
         return True
 
+    def _record_activity(self, income: Ingreso, evento: str, actor_id: int, group_id: Optional[int] = None):
+        """Registrar la acción sobre el ingreso en la actividad de su grupo (sin commit)"""
+        group_id = income.id_grupo if group_id is None else group_id
+        if not group_id:
+            return
+
+        if income.id_ingreso is None:
+            self.db.flush()
+        GroupActivityService(self.db).record(group_id, evento, actor_id, {
+            "id_ingreso": income.id_ingreso,
+            "descripcion": income.descripcion,
+            "monto": income.monto,
+            "fecha": income.fecha,
+            "id_usuario": income.id_usuario
+        })
+
     def get_total_income_by_user(self, user_id: int, personal_only: bool = False) -> float:
         """Obtener el total de ingresos de un usuario (personales o todos)"""
         from sqlalchemy import func
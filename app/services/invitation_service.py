@@ -1,22 +1,35 @@
 """
 Servicio para gestión de invitaciones
 """
-from sqlalchemy.orm import Session
-from typing import Optional
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select, update, delete, exists, func, or_
+from sqlalchemy.dialects.postgresql import insert
+from typing import List, Optional
 from datetime import datetime, timedelta
-import base64
-import io
 from app.models.invitation import Invitacion, EstadoInvitacion
 from app.models.group import Grupo
+from app.models.user import Usuario
 from app.models.user_group import UsuarioGrupo, RolGrupo
-from app.schemas.invitation import InvitacionCreate
+from app.schemas.invitation import InvitacionCreate, InvitacionesLoteCreate
+from app.services.group_service import GroupService
+from app.services.group_activity_service import GroupActivityService
+from app.core.cache import LRUCache
 from app.core.config import settings
 
-try:
-    import qrcode
-    QR_AVAILABLE = True
-except ImportError:
-    QR_AVAILABLE = False
+# Vista resuelta (invitación + grupo + creador) por token. Cada proceso tiene la suya:
+# se invalida al aceptar, rechazar, revocar, expirar o eliminar la invitación (también al
+# eliminar su grupo), y el TTL acota lo que puede quedar desactualizado en otros procesos
+_token_views = LRUCache(maxsize=4096, ttl=300)
+
+# Tokens inexistentes, aparte para que los barridos de tokens al azar no desplacen
+# de la caché a las invitaciones reales
+_missing_tokens = LRUCache(maxsize=16384, ttl=600)
+
+
+def forget_invitation_views(tokens):
+    """Descartar de la caché de este proceso las vistas de los tokens indicados"""
+    for token in tokens:
+        _token_views.delete(token)
 
 
 class InvitationService:
@@ -54,8 +67,57 @@ class InvitationService:
         self.db.refresh(db_invitation)
         return db_invitation
 
+    def create_invitations_bulk(self, data: InvitacionesLoteCreate, creator_id: int) -> List[dict]:
+        """
+        Crear varias invitaciones con un solo INSERT: una por cada usuario de
+        `usuarios_invitados` (los inexistentes se omiten) o `cantidad` links anónimos.
+        """
+        if not self._is_group_admin(data.id_grupo, creator_id):
+            raise ValueError("Solo los administradores pueden crear invitaciones")
+
+        if data.usuarios_invitados:
+            requested = set(data.usuarios_invitados)
+            invitees = sorted(user_id for (user_id,) in self.db.query(Usuario.id_usuario).filter(
+                Usuario.id_usuario.in_(requested)
+            ))
+        else:
+            invitees = [None] * data.cantidad
+
+        if not invitees:
+            return []
+
+        fecha_expiracion = None
+        if data.dias_expiracion:
+            fecha_expiracion = datetime.utcnow() + timedelta(days=data.dias_expiracion)
+
+        rows = self.db.execute(
+            insert(Invitacion).returning(
+                Invitacion.id_invitacion,
+                Invitacion.token,
+                Invitacion.id_usuario_invitado,
+                Invitacion.fecha_expiracion,
+                sort_by_parameter_order=True
+            ),
+            [
+                {
+                    "id_grupo": data.id_grupo,
+                    "token": Invitacion.generar_token(),
+                    "creado_por": creator_id,
+                    "id_usuario_invitado": invitee,
+                    "estado": EstadoInvitacion.pendiente,
+                    "fecha_expiracion": fecha_expiracion
+                }
+                for invitee in invitees
+            ]
+        ).mappings().all()
+        self.db.commit()
+        return [dict(row) for row in rows]
+
     def get_invitation_by_token(self, token: str) -> Optional[Invitacion]:
-        """Obtener invitación por token"""
+        """
+        Obtener invitación por token (None si no existe o está vencida).
+        Es una lectura pura: el cambio de estado a expirada lo hace expire_invitations.
+        """
         invitation = self.db.query(Invitacion).filter(
             Invitacion.token == token
         ).first()
@@ -65,67 +127,157 @@ class InvitationService:
 
         # Verificar si está expirada
         if invitation.fecha_expiracion and invitation.fecha_expiracion < datetime.utcnow():
-            if invitation.estado == EstadoInvitacion.pendiente:
-                invitation.estado = EstadoInvitacion.expirada
-                self.db.commit()
             return None
 
         return invitation
 
-    def get_invitation_link(self, token: str) -> str:
-        """Generar link de invitación"""
-        return f"{self.base_url}/invitation/{token}"
-
-    def generate_qr_code(self, token: str) -> Optional[str]:
-        """Generar código QR en base64 para la invitación"""
-        if not QR_AVAILABLE:
+    def expire_invitations(self) -> int:
+        """
+        Marcar como expiradas todas las invitaciones pendientes vencidas con un solo
+        UPDATE (usa el índice parcial de invitaciones pendientes con fecha de expiración)
+        """
+        tokens = self.db.execute(
+            update(Invitacion).where(
+                Invitacion.estado == EstadoInvitacion.pendiente,
+                Invitacion.fecha_expiracion.isnot(None),
+                Invitacion.fecha_expiracion < datetime.utcnow()
+            ).values(estado=EstadoInvitacion.expirada).returning(Invitacion.token),
+            execution_options={"synchronize_session": False}
+        ).scalars().all()
+        self.db.commit()
+        forget_invitation_views(tokens)
+        return len(tokens)
+
+    def purge_closed_invitations(self, retention_days: int = settings.INVITATION_RETENTION_DAYS) -> int:
+        """Eliminar las invitaciones aceptadas, rechazadas o expiradas hace más de `retention_days` días"""
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        closed_at = func.coalesce(Invitacion.fecha_aceptacion, Invitacion.fecha_expiracion, Invitacion.fecha_creacion)
+        tokens = self.db.execute(
+            delete(Invitacion).where(
+                Invitacion.estado != EstadoInvitacion.pendiente,
+                closed_at < cutoff
+            ).returning(Invitacion.token),
+            execution_options={"synchronize_session": False}
+        ).scalars().all()
+        self.db.commit()
+        forget_invitation_views(tokens)
+        return len(tokens)
+
+    def get_invitation_view(self, token: str) -> Optional[dict]:
+        """
+        Obtener la invitación con los datos de su grupo y creador (None si no existe o
+        está vencida). Se sirve desde caché, incluidos los tokens inexistentes, así que
+        las vistas previas de links repetidas no consultan la base de datos.
+        """
+        if _missing_tokens.get(token):
             return None
 
-        try:
-            link = self.get_invitation_link(token)
-            qr = qrcode.QRCode(version=1, box_size=10, border=5)
-            qr.add_data(link)
-            qr.make(fit=True)
-
-            img = qr.make_image(fill_color="black", back_color="white")
-            buffer = io.BytesIO()
-            img.save(buffer, format='PNG')
-            buffer.seek(0)
-
-            qr_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-            return qr_base64
-        except Exception as e:
-            print(f"Error generando QR: {e}")
+        view = _token_views.get(token)
+        if view is None:
+            invitation = self.db.query(Invitacion).options(
+                joinedload(Invitacion.grupo),
+                joinedload(Invitacion.creador)
+            ).filter(Invitacion.token == token).first()
+
+            if not invitation:
+                _missing_tokens.set(token, True)
+                return None
+
+            group = invitation.grupo
+            # La invitación de un grupo en proceso de eliminación ya no es válida
+            if group and group.eliminando:
+                return None
+
+            creador = invitation.creador
+            view = {
+                "id_invitacion": invitation.id_invitacion,
+                "id_grupo": invitation.id_grupo,
+                "token": invitation.token,
+                "link_invitacion": self.get_invitation_link(invitation.token),
+                "estado": invitation.estado.value,
+                "fecha_creacion": invitation.fecha_creacion,
+                "fecha_expiracion": invitation.fecha_expiracion,
+                "creado_por": invitation.creado_por,
+                "id_usuario_invitado": invitation.id_usuario_invitado,
+                "grupo_nombre": group.nombre if group else None,
+                "grupo_descripcion": group.descripcion if group else None,
+                "creador_nombre": creador.nombre if creador else None
+            }
+            _token_views.set(token, view)
+
+        # El vencimiento se comprueba en cada lectura: la vista cacheada no caduca con él
+        if view["fecha_expiracion"] and view["fecha_expiracion"] < datetime.utcnow():
             return None
+        return view
+
+    def get_invitation_link(self, token: str) -> str:
+        """Generar link de invitación"""
+        return f"{self.base_url}/invitation/{token}"
 
     def accept_invitation(self, token: str, user_id: int) -> bool:
-        """Aceptar invitación y agregar usuario al grupo"""
-        invitation = self.get_invitation_by_token(token)
-        
-        if not invitation:
-            return False
+        """
+        Aceptar invitación y agregar usuario al grupo.
+
+        La invitación se reclama con un UPDATE condicional ... RETURNING y la membresía se
+        crea con INSERT ... ON CONFLICT DO NOTHING, en una sola transacción. Si varias
+        personas aceptan el mismo token a la vez, la fila se toma con SKIP LOCKED: una
+        gana y las demás reciben False de inmediato, sin esperar bloqueos ni errores de
+        clave duplicada.
+        """
+        now = datetime.utcnow()
+        candidate = select(Invitacion.id_invitacion).where(
+            Invitacion.token == token,
+            Invitacion.estado == EstadoInvitacion.pendiente,
+            or_(Invitacion.fecha_expiracion.is_(None), Invitacion.fecha_expiracion >= now)
+        ).with_for_update(skip_locked=True).scalar_subquery()
+
+        claimed = self.db.execute(
+            update(Invitacion).where(
+                Invitacion.id_invitacion == candidate,
+                # Quien ya es miembro no consume la invitación
+                ~exists().where(
+                    UsuarioGrupo.id_grupo == Invitacion.id_grupo,
+                    UsuarioGrupo.id_usuario == user_id
+                ),
+                # Un grupo en proceso de eliminación no admite miembros nuevos
+                exists().where(
+                    Grupo.id_grupo == Invitacion.id_grupo,
+                    Grupo.eliminando.is_(False)
+                )
+            ).values(
+                estado=EstadoInvitacion.aceptada,
+                fecha_aceptacion=now,
+                usado=True
+            ).returning(Invitacion.id_invitacion, Invitacion.id_grupo),
+            execution_options={"synchronize_session": False}
+        ).first()
 
-        if invitation.estado != EstadoInvitacion.pendiente:
+        if claimed is None:
+            self.db.rollback()
             return False
 
-        # Verificar que el usuario no esté ya en el grupo
-        if self._is_user_in_group(invitation.id_grupo, user_id):
-            return False
+        id_invitacion, group_id = claimed
+        joined = self.db.execute(
+            insert(UsuarioGrupo).values(
+                id_usuario=user_id,
+                id_grupo=group_id,
+                rol=RolGrupo.miembro
+            ).on_conflict_do_nothing().returning(UsuarioGrupo.id_grupo)
+        ).first()
 
-        # Agregar usuario al grupo
-        usuario_grupo = UsuarioGrupo(
-            id_usuario=user_id,
-            id_grupo=invitation.id_grupo,
-            rol=RolGrupo.miembro
-        )
-        self.db.add(usuario_grupo)
+        if joined is None:
+            # Se unió por otra vía mientras tanto: la invitación sigue pendiente
+            self.db.rollback()
+            return False
 
-        # Actualizar estado de la invitación
-        invitation.estado = EstadoInvitacion.aceptada
-        invitation.fecha_aceptacion = datetime.utcnow()
-        invitation.usado = True
+        # La fila del grupo (contador y versión) se actualiza al final para bloquearla lo menos posible
+        GroupActivityService(self.db).record(group_id, "miembro_agregado", user_id, {
+            "id_usuario": user_id, "rol": RolGrupo.miembro.value, "id_invitacion": id_invitacion
+        })
+        GroupService(self.db).adjust_member_count([group_id], 1)
 
         self.db.commit()
+        _token_views.delete(token)
         return True
 
     def reject_invitation(self, token: str, user_id: int) -> bool:
@@ -140,6 +292,7 @@ class InvitationService:
 
         invitation.estado = EstadoInvitacion.rechazada
         self.db.commit()
+        _token_views.delete(token)
         return True
 
     def get_group_invitations(self, group_id: int, user_id: int) -> list:
@@ -169,24 +322,18 @@ class InvitationService:
 
         invitation.estado = EstadoInvitacion.expirada
         self.db.commit()
+        _token_views.delete(invitation.token)
         return True
 
     def _is_group_admin(self, group_id: int, user_id: int) -> bool:
-        """Verificar si un usuario es admin de un grupo"""
-        usuario_grupo = self.db.query(UsuarioGrupo).filter(
+        """Verificar si un usuario es admin de un grupo (que no esté en proceso de eliminación)"""
+        usuario_grupo = self.db.query(UsuarioGrupo).join(Grupo).filter(
             UsuarioGrupo.id_grupo == group_id,
-            UsuarioGrupo.id_usuario == user_id
+            UsuarioGrupo.id_usuario == user_id,
+            Grupo.eliminando.is_(False)
         ).first()
         
         if not usuario_grupo:
             return False
         
         return usuario_grupo.rol == RolGrupo.admin
-
-    def _is_user_in_group(self, group_id: int, user_id: int) -> bool:
-        """Verificar si un usuario pertenece a un grupo"""
-        return self.db.query(UsuarioGrupo).filter(
-            UsuarioGrupo.id_grupo == group_id,
-            UsuarioGrupo.id_usuario == user_id
-        ).first() is not None
-
@@ -0,0 +1,186 @@
+"""
+Servicio para detectar pagos recurrentes en el historial de gastos
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from typing import List
+from datetime import date, datetime, timedelta
+import json
+import numpy as np
+from app.models.ai_history import HistorialAI, TipoHistorial
+from app.models.expense import Gasto
+
+ORIGEN_RECURRENTE = "gasto_recurrente"
+
+# Frecuencias reconocidas y su intervalo típico en días
+FRECUENCIAS = {
+    "semanal": 7,
+    "quincenal": 15,
+    "mensual": 30.44,
+    "bimestral": 60.88,
+    "trimestral": 91.31,
+    "anual": 365.25,
+}
+
+# Salto relativo de monto que separa dos bandas (cargos a menos de 10% caen juntos)
+AMOUNT_BAND = 1.10
+
+
+class RecurringDetectionService:
+    """Servicio para sugerir reglas de gasto recurrente a partir de los datos"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def detect_recurring(
+        self,
+        chunk_size: int = 10000,
+        min_occurrences: int = 4,
+        max_variation: float = 0.2,
+        today: date = None
+    ) -> int:
+        """
+        Recorrer los gastos de todos los usuarios en bloques de `chunk_size` filas y
+        emitir sugerencias para los conceptos que se repiten con intervalo regular.
+
+        Los gastos se leen en streaming ordenados por usuario; cada bloque se procesa
+        cuando termina el último usuario que contiene, así la memoria queda acotada por
+        el tamaño del bloque. Las sugerencias anteriores se reemplazan.
+        """
+        today = today or date.today()
+        self.db.query(HistorialAI).filter(
+            HistorialAI.origen == ORIGEN_RECURRENTE
+        ).delete(synchronize_session=False)
+
+        rows = self.db.query(
+            Gasto.id_usuario,
+            Gasto.descripcion,
+            Gasto.monto,
+            Gasto.fecha,
+            Gasto.recurrente,
+            Gasto.id_categoria
+        ).order_by(Gasto.id_usuario, Gasto.fecha).yield_per(chunk_size)
+
+        total = 0
+        buffer = []
+        for row in rows:
+            if len(buffer) >= chunk_size and row.id_usuario != buffer[-1].id_usuario:
+                total += self._process_chunk(buffer, min_occurrences, max_variation, today)
+                buffer = []
+            buffer.append(row)
+
+        if buffer:
+            total += self._process_chunk(buffer, min_occurrences, max_variation, today)
+
+        self.db.commit()
+        return total
+
+    def get_user_suggestions(self, user_id: int) -> List[HistorialAI]:
+        """Obtener las sugerencias de gasto recurrente de un usuario"""
+        return self.db.query(HistorialAI).filter(
+            HistorialAI.id_usuario == user_id,
+            HistorialAI.origen == ORIGEN_RECURRENTE
+        ).order_by(HistorialAI.id_historial).all()
+
+    def _process_chunk(self, rows: list, min_occurrences: int, max_variation: float, today: date) -> int:
+        """Analizar en una pasada vectorizada todos los grupos de un bloque de gastos"""
+        rows = [row for row in rows if row.monto and row.monto > 0]
+        if not rows:
+            return 0
+        montos = np.array([float(row.monto) for row in rows])
+
+        # Clave de grupo: usuario + descripción normalizada + banda de monto.
+        # Las bandas se forman ordenando los montos de cada descripción y cortando
+        # donde un monto supera al anterior en más de AMOUNT_BAND.
+        labels = [
+            f"{row.id_usuario}|{Gasto.normalizar_descripcion(row.descripcion)}"
+            for row in rows
+        ]
+        _, label_codes = np.unique(np.array(labels), return_inverse=True)
+        label_codes = label_codes.ravel()
+        by_amount = np.lexsort((montos, label_codes))
+        breaks = np.ones(len(rows), dtype=bool)
+        breaks[1:] = (label_codes[by_amount][1:] != label_codes[by_amount][:-1]) \
+            | (montos[by_amount][1:] > montos[by_amount][:-1] * AMOUNT_BAND)
+        group = np.empty(len(rows), dtype=np.int64)
+        group[by_amount] = np.cumsum(breaks) - 1
+        days = np.array([row.fecha.toordinal() for row in rows], dtype=np.int64)
+
+        # Ordenar por grupo y fecha para calcular intervalos consecutivos
+        order = np.lexsort((days, group))
+        group, days, montos = group[order], days[order], montos[order]
+        same_group = group[1:] == group[:-1]
+        intervals = np.diff(days).astype(float)
+
+        n_groups = group.max() + 1
+        counts = np.bincount(group, minlength=n_groups)
+        interval_group = group[1:][same_group]
+        interval_values = intervals[same_group]
+        n_intervals = np.bincount(interval_group, minlength=n_groups)
+        sums = np.bincount(interval_group, weights=interval_values, minlength=n_groups)
+        squares = np.bincount(interval_group, weights=interval_values ** 2, minlength=n_groups)
+
+        amount_sums = np.bincount(group, weights=montos, minlength=n_groups)
+        amount_squares = np.bincount(group, weights=montos ** 2, minlength=n_groups)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = sums / n_intervals
+            std = np.sqrt(np.maximum(squares / n_intervals - mean ** 2, 0))
+            variation = std / mean
+            amount_mean = amount_sums / counts
+            amount_variation = np.sqrt(np.maximum(amount_squares / counts - amount_mean ** 2, 0)) / amount_mean
+
+        periods = np.array(list(FRECUENCIAS.values()))
+        nearest = np.argmin(np.abs(mean[:, None] - periods[None, :]), axis=1)
+        period_error = np.abs(mean - periods[nearest]) / periods[nearest]
+
+        candidates = np.flatnonzero(
+            (counts >= min_occurrences)
+            & (mean > 0)
+            & (variation <= max_variation)
+            & (period_error <= max_variation)
+            & (amount_variation <= max_variation / 2)
+        )
+        if not len(candidates):
+            return 0
+
+        # Última fila de cada grupo (el orden es por grupo y fecha)
+        last_index = np.flatnonzero(np.append(group[1:] != group[:-1], True))
+        frequency_names = list(FRECUENCIAS.keys())
+        now = datetime.utcnow()
+
+        inserts = []
+        for g in candidates:
+            last = rows[order[last_index[g]]]
+            if last.recurrente:
+                continue
+            period_days = float(mean[g])
+            next_date = last.fecha + timedelta(days=round(period_days))
+            # Conceptos que dejaron de cobrarse hace más de dos periodos no se sugieren
+            if (today - last.fecha).days > 2 * period_days:
+                continue
+
+            frecuencia = frequency_names[nearest[g]]
+            monto_promedio = round(float(amount_mean[g]), 2)
+            inserts.append({
+                "id_usuario": last.id_usuario,
+                "tipo": TipoHistorial.recomendacion,
+                "origen": ORIGEN_RECURRENTE,
+                "fecha": now,
+                "contenido": json.dumps({
+                    "descripcion": last.descripcion,
+                    "id_categoria": last.id_categoria,
+                    "monto_promedio": monto_promedio,
+                    "frecuencia": frecuencia,
+                    "intervalo_dias": round(period_days, 1),
+                    "ocurrencias": int(counts[g]),
+                    "ultima_fecha": last.fecha.isoformat(),
+                    "proxima_fecha": next_date.isoformat(),
+                    "mensaje": f"'{last.descripcion}' parece un pago {frecuencia} de ~{monto_promedio:.2f}. "
+                               f"¿Quieres marcarlo como recurrente?"
+                }, ensure_ascii=False)
+            })
+
+        if inserts:
+            self.db.execute(insert(HistorialAI), inserts)
+        return len(inserts)
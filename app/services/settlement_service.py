@@ -0,0 +1,92 @@
+"""
+Servicio para calcular la liquidación de deudas de un grupo
+"""
+from sqlalchemy.orm import Session
+from typing import List, Optional, Tuple
+import heapq
+from app.core.cache import LRUCache
+from app.models.group_balance import BalanceGrupo
+from app.models.user import Usuario
+from app.services.group_service import GroupService
+
+# Planes calculados, indexados por (id_grupo, version_datos)
+_settlement_cache = LRUCache(maxsize=1024)
+
+
+def minimal_transfers(balances: List[Tuple[int, int]]) -> List[Tuple[int, int, int]]:
+    """
+    Calcular transferencias (deudor, acreedor, centavos) que dejan todos los saldos en cero.
+
+    `balances` son pares (id_usuario, saldo en centavos). En cada paso el mayor deudor
+    paga al mayor acreedor usando dos montículos; cada transferencia salda al menos a
+    uno de los dos, así que hay como máximo n - 1 transferencias en O(n log n).
+    """
+    creditors = [(-amount, user_id) for user_id, amount in balances if amount > 0]
+    debtors = [(amount, user_id) for user_id, amount in balances if amount < 0]
+    heapq.heapify(creditors)
+    heapq.heapify(debtors)
+
+    transfers = []
+    while creditors and debtors:
+        credit, creditor = heapq.heappop(creditors)
+        debt, debtor = heapq.heappop(debtors)
+        amount = min(-credit, -debt)
+        transfers.append((debtor, creditor, amount))
+
+        if -credit > amount:
+            heapq.heappush(creditors, (credit + amount, creditor))
+        if -debt > amount:
+            heapq.heappush(debtors, (debt + amount, debtor))
+
+    return transfers
+
+
+class SettlementService:
+    """Servicio para responder "quién le paga a quién" en un grupo"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_settlement_plan(self, group_id: int) -> Optional[dict]:
+        """Obtener el plan de transferencias del grupo, reutilizándolo mientras no cambien los datos"""
+        version = GroupService(self.db).get_data_version(group_id)
+        if version is None:
+            return None
+
+        cache_key = (group_id, version)
+        plan = _settlement_cache.get(cache_key)
+        if plan is not None:
+            return plan
+
+        rows = self.db.query(
+            BalanceGrupo.id_usuario,
+            Usuario.nombre,
+            BalanceGrupo.total_pagado - BalanceGrupo.total_adeudado
+        ).join(
+            Usuario, Usuario.id_usuario == BalanceGrupo.id_usuario
+        ).filter(
+            BalanceGrupo.id_grupo == group_id
+        ).all()
+
+        names = {user_id: nombre for user_id, nombre, _ in rows}
+        balances = [(user_id, int(round(saldo * 100))) for user_id, _, saldo in rows]
+
+        transfers = minimal_transfers(balances)
+        plan = {
+            "id_grupo": group_id,
+            "version_datos": version,
+            "total_transferencias": len(transfers),
+            "transferencias": [
+                {
+                    "id_usuario_origen": debtor,
+                    "nombre_origen": names.get(debtor),
+                    "id_usuario_destino": creditor,
+                    "nombre_destino": names.get(creditor),
+                    "monto": cents / 100
+                }
+                for debtor, creditor, cents in transfers
+            ]
+        }
+
+        _settlement_cache.set(cache_key, plan)
+        return plan
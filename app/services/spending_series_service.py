@@ -0,0 +1,73 @@
+"""
+Servicio para construir series mensuales de gasto en NumPy
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import func, extract
+from typing import List, Optional, Tuple
+from datetime import date
+import numpy as np
+from app.models.expense import Gasto
+
+
+def month_start(value: date, offset: int = 0) -> date:
+    """Primer día del mes de `value` desplazado `offset` meses"""
+    index = value.year * 12 + (value.month - 1) + offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class SpendingSeriesService:
+    """Servicio para cargar el gasto por usuario y categoría como matriz mensual"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def load_monthly_category_series(
+        self,
+        months: int,
+        end_date: Optional[date] = None,
+        user_ids: Optional[List[int]] = None
+    ) -> Tuple[np.ndarray, np.ndarray, List[date]]:
+        """
+        Cargar el gasto mensual de cada par (usuario, categoría) con una sola consulta agregada.
+
+        Devuelve `(claves, matriz, periodos)`: `claves` es un arreglo (n, 2) con
+        id_usuario e id_categoria, `matriz` es (n, months) con el gasto de cada mes
+        (0 si no hubo gasto) y `periodos` lista el primer día de cada columna.
+        El último mes es el de `end_date` (hoy por defecto).
+        """
+        end_date = end_date or date.today()
+        first_period = month_start(end_date, -(months - 1))
+        periods = [month_start(first_period, i) for i in range(months)]
+
+        year = extract('year', Gasto.fecha)
+        month = extract('month', Gasto.fecha)
+        query = self.db.query(
+            Gasto.id_usuario,
+            Gasto.id_categoria,
+            year,
+            month,
+            func.sum(Gasto.monto)
+        ).filter(
+            Gasto.id_categoria.isnot(None),
+            Gasto.fecha >= first_period,
+            Gasto.fecha < month_start(end_date, 1)
+        )
+
+        if user_ids is not None:
+            query = query.filter(Gasto.id_usuario.in_(user_ids))
+
+        rows = query.group_by(Gasto.id_usuario, Gasto.id_categoria, year, month).all()
+
+        if not rows:
+            return np.empty((0, 2), dtype=np.int64), np.zeros((0, months)), periods
+
+        data = np.array([[float(value) for value in row] for row in rows])
+        pairs = data[:, :2].astype(np.int64)
+        column = (data[:, 2].astype(np.int64) * 12 + data[:, 3].astype(np.int64) - 1) \
+            - (first_period.year * 12 + first_period.month - 1)
+
+        keys, row_index = np.unique(pairs, axis=0, return_inverse=True)
+        matrix = np.zeros((len(keys), months))
+        np.add.at(matrix, (row_index.ravel(), column), data[:, 4])
+
+        return keys, matrix, periods
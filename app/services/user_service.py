@@ -35,12 +35,12 @@ class UserService:
         return db_user
     
     def get_user_by_email(self, email: str) -> Optional[Usuario]:
-        """Obtener usuario por email"""
-        return self.db.query(Usuario).filter(Usuario.correo == email).first()
+        """Obtener usuario por email (excepto cuentas en proceso de eliminación)"""
+        return self.db.query(Usuario).filter(Usuario.correo == email, Usuario.eliminando.is_(False)).first()
     
     def get_user_by_id(self, user_id: int) -> Optional[Usuario]:
-        """Obtener usuario por ID"""
-        return self.db.query(Usuario).filter(Usuario.id_usuario == user_id).first()
+        """Obtener usuario por ID (excepto cuentas en proceso de eliminación)"""
+        return self.db.query(Usuario).filter(Usuario.id_usuario == user_id, Usuario.eliminando.is_(False)).first()
     
     def authenticate_user(self, email: str, password: str) -> Optional[Usuario]:
         """Autenticar usuario"""
@@ -72,50 +72,3 @@ class UserService:
         user.contrasena_hash = get_password_hash(new_password)
         self.db.commit()
         return True
-
-    def delete_user(self, user_id: int) -> bool:
-        """Eliminar usuario y todos sus datos relacionados"""
-        user = self.get_user_by_id(user_id)
-        if not user:
-            return False
-
-        try:
-            # Eliminar en orden para respetar las restricciones de clave foránea
-            # Primero eliminar relaciones que dependen del usuario
-
-            # Eliminar aportes a metas
-            from app.models.goal_contribution import AporteMeta
-            self.db.query(AporteMeta).filter(AporteMeta.id_usuario == user_id).delete()
-
-            # Eliminar historial de AI
-            from app.models.ai_history import HistorialAI
-            self.db.query(HistorialAI).filter(HistorialAI.id_usuario == user_id).delete()
-
-            # Eliminar categorías personales
-            from app.models.category import Categoria
-            self.db.query(Categoria).filter(Categoria.id_usuario == user_id).delete()
-
-            # Eliminar metas personales
-            from app.models.goal import Meta
-            self.db.query(Meta).filter(Meta.id_usuario == user_id).delete()
-
-            # Eliminar ingresos
-            from app.models.income import Ingreso
-            self.db.query(Ingreso).filter(Ingreso.id_usuario == user_id).delete()
-
-            # Eliminar gastos
-            from app.models.expense import Gasto
-            self.db.query(Gasto).filter(Gasto.id_usuario == user_id).delete()
-
-            # Eliminar asociaciones con grupos
-            from app.models.user_group import UsuarioGrupo
-            self.db.query(UsuarioGrupo).filter(UsuarioGrupo.id_usuario == user_id).delete()
-
-            # Finalmente eliminar el usuario
-            self.db.delete(user)
-            self.db.commit()
-            return True
-
-        except Exception as e:
-            self.db.rollback()
-            raise e
@@ -9,7 +9,8 @@ CREATE TABLE usuarios (
   moneda_preferida VARCHAR(10),
   fecha_registro TIMESTAMP DEFAULT NOW(),
   foto_perfil VARCHAR(255),
-  tipo_usuario VARCHAR(20) DEFAULT 'normal' CHECK (tipo_usuario IN ('normal', 'admin'))
+  tipo_usuario VARCHAR(20) DEFAULT 'normal' CHECK (tipo_usuario IN ('normal', 'admin')),
+  eliminando BOOLEAN NOT NULL DEFAULT FALSE
 );
 
 -- =====================================
@@ -20,7 +21,10 @@ CREATE TABLE grupos (
   nombre VARCHAR(100) NOT NULL,
   descripcion TEXT,
   fecha_creacion TIMESTAMP DEFAULT NOW(),
-  creado_por INT REFERENCES usuarios(id_usuario) ON DELETE CASCADE
+  creado_por INT REFERENCES usuarios(id_usuario) ON DELETE CASCADE,
+  version_datos INT NOT NULL DEFAULT 0,
+  total_miembros INT NOT NULL DEFAULT 0,
+  eliminando BOOLEAN NOT NULL DEFAULT FALSE
 );
 
 -- =====================================
@@ -34,6 +38,8 @@ CREATE TABLE usuarios_grupos (
   PRIMARY KEY (id_usuario, id_grupo)
 );
 
+CREATE INDEX idx_usuarios_grupos_grupo ON usuarios_grupos(id_grupo, fecha_union);
+
 -- =====================================
 -- TABLA INVITACIONES
 -- =====================================
@@ -53,6 +59,10 @@ CREATE TABLE invitaciones (
 -- Índice para búsqueda rápida por token
 CREATE INDEX idx_invitaciones_token ON invitaciones(token);
 
+-- Índice parcial para el barrido de invitaciones vencidas
+CREATE INDEX idx_invitaciones_pendientes_expiracion ON invitaciones(fecha_expiracion)
+  WHERE estado = 'pendiente' AND fecha_expiracion IS NOT NULL;
+
 -- =====================================
 -- TABLA CATEGORIAS
 -- =====================================
@@ -79,9 +89,55 @@ CREATE TABLE gastos (
   recurrente BOOLEAN DEFAULT FALSE,
   id_categoria INT REFERENCES categorias(id_categoria) ON DELETE SET NULL,
   id_usuario INT REFERENCES usuarios(id_usuario) ON DELETE CASCADE,
-  id_grupo INT REFERENCES grupos(id_grupo) ON DELETE CASCADE
+  id_grupo INT REFERENCES grupos(id_grupo) ON DELETE CASCADE,
+  hash_contenido VARCHAR(64),
+  tipo_division VARCHAR(20) CHECK (tipo_division IN ('igual','porcentaje','exacto'))
+);
+
+-- Índice para detectar gastos duplicados por hash de contenido
+CREATE INDEX idx_gastos_usuario_hash ON gastos(id_usuario, hash_contenido);
+
+-- Índice para totales y movimientos recientes de un grupo
+CREATE INDEX idx_gastos_grupo_fecha ON gastos(id_grupo, fecha);
+
+-- =====================================
+-- TABLA DIVISIONES_GASTOS
+-- =====================================
+CREATE TABLE divisiones_gastos (
+  id_division SERIAL PRIMARY KEY,
+  id_gasto INT REFERENCES gastos(id_gasto) ON DELETE CASCADE NOT NULL,
+  id_usuario INT REFERENCES usuarios(id_usuario) ON DELETE CASCADE NOT NULL,
+  monto DECIMAL(12,2) NOT NULL CHECK (monto >= 0),
+  porcentaje DECIMAL(5,2),
+  CONSTRAINT uq_divisiones_gastos_gasto_usuario UNIQUE (id_gasto, id_usuario)
+);
+
+-- =====================================
+-- TABLA BALANCES_GRUPOS
+-- =====================================
+CREATE TABLE balances_grupos (
+  id_grupo INT REFERENCES grupos(id_grupo) ON DELETE CASCADE,
+  id_usuario INT REFERENCES usuarios(id_usuario) ON DELETE CASCADE,
+  total_pagado DECIMAL(12,2) NOT NULL DEFAULT 0,
+  total_adeudado DECIMAL(12,2) NOT NULL DEFAULT 0,
+  PRIMARY KEY (id_grupo, id_usuario)
+);
+
+-- =====================================
+-- TABLA ACTIVIDAD_GRUPO
+-- =====================================
+CREATE TABLE actividad_grupo (
+  id_actividad SERIAL PRIMARY KEY,
+  id_grupo INT REFERENCES grupos(id_grupo) ON DELETE CASCADE NOT NULL,
+  id_usuario INT REFERENCES usuarios(id_usuario) ON DELETE SET NULL,
+  evento VARCHAR(50) NOT NULL,
+  datos TEXT NOT NULL,
+  fecha TIMESTAMP NOT NULL DEFAULT NOW()
 );
 
+-- Índice para leer el historial de un grupo por páginas (más reciente primero)
+CREATE INDEX idx_actividad_grupo_grupo_id ON actividad_grupo(id_grupo, id_actividad);
+
 -- =====================================
 -- TABLA INGRESOS
 -- =====================================
@@ -96,6 +152,8 @@ CREATE TABLE ingresos (
   id_grupo INT REFERENCES grupos(id_grupo) ON DELETE CASCADE
 );
 
+CREATE INDEX idx_ingresos_grupo_fecha ON ingresos(id_grupo, fecha);
+
 -- =====================================
 -- TABLA METAS
 -- =====================================
@@ -104,6 +162,7 @@ CREATE TABLE metas (
   nombre VARCHAR(100) NOT NULL,
   monto_objetivo DECIMAL(12,2) NOT NULL,
   monto_acumulado DECIMAL(12,2) DEFAULT 0,
+  total_aportes INT NOT NULL DEFAULT 0,
   fecha_inicio DATE,
   fecha_fin DATE,
   estado VARCHAR(20) CHECK (estado IN ('activa','completada','cancelada')),
@@ -119,9 +178,38 @@ CREATE TABLE aportes_metas (
   id_meta INT REFERENCES metas(id_meta) ON DELETE CASCADE,
   id_usuario INT REFERENCES usuarios(id_usuario) ON DELETE CASCADE,
   monto DECIMAL(12,2) NOT NULL CHECK (monto >= 0),
-  fecha DATE DEFAULT CURRENT_DATE
+  fecha DATE DEFAULT CURRENT_DATE,
+  -- Ingreso o gasto que generó el aporte mediante una regla automática (NULL para aportes manuales)
+  id_ingreso INT REFERENCES ingresos(id_ingreso) ON DELETE SET NULL,
+  id_gasto INT REFERENCES gastos(id_gasto) ON DELETE SET NULL
 );
 
+-- Índice para los aportes de una meta por fecha (listados y último aporte)
+CREATE INDEX idx_aportes_metas_meta_fecha ON aportes_metas(id_meta, fecha);
+
+-- Índice para el listado paginado por cursor de los aportes de una meta
+CREATE INDEX idx_aportes_metas_meta_id ON aportes_metas(id_meta, id_aporte);
+
+-- Índices para revertir los aportes automáticos al editar o eliminar el movimiento que los generó
+CREATE INDEX idx_aportes_metas_ingreso ON aportes_metas(id_ingreso) WHERE id_ingreso IS NOT NULL;
+CREATE INDEX idx_aportes_metas_gasto ON aportes_metas(id_gasto) WHERE id_gasto IS NOT NULL;
+
+-- =====================================
+-- TABLA REGLAS_APORTES
+-- =====================================
+CREATE TABLE reglas_aportes (
+  id_regla SERIAL PRIMARY KEY,
+  id_usuario INT NOT NULL REFERENCES usuarios(id_usuario) ON DELETE CASCADE,
+  id_meta INT NOT NULL REFERENCES metas(id_meta) ON DELETE CASCADE,
+  tipo VARCHAR(30) NOT NULL CHECK (tipo IN ('porcentaje_ingreso','monto_fijo_ingreso','redondeo_gasto')),
+  valor DECIMAL(12,2) NOT NULL CHECK (valor > 0),
+  activa BOOLEAN NOT NULL DEFAULT TRUE,
+  fecha_creacion TIMESTAMP DEFAULT NOW()
+);
+
+-- Índice para evaluar las reglas de un usuario al registrar sus ingresos y gastos
+CREATE INDEX idx_reglas_aportes_usuario_tipo ON reglas_aportes(id_usuario, tipo);
+
 -- =====================================
 -- TABLA HISTORIAL_AI
 -- =====================================
@@ -130,9 +218,51 @@ CREATE TABLE historial_ai (
   id_usuario INT REFERENCES usuarios(id_usuario) ON DELETE CASCADE,
   tipo VARCHAR(20) CHECK (tipo IN ('recomendacion','alerta','analisis')),
   contenido TEXT NOT NULL,
-  fecha TIMESTAMP DEFAULT NOW()
+  fecha TIMESTAMP DEFAULT NOW(),
+  origen VARCHAR(50)
+);
+
+-- Índice para leer las entradas generadas por cada proceso
+CREATE INDEX idx_historial_ai_usuario_origen ON historial_ai(id_usuario, origen, fecha);
+
+-- =====================================
+-- TABLA PRESUPUESTOS
+-- =====================================
+CREATE TABLE presupuestos (
+  id_presupuesto SERIAL PRIMARY KEY,
+  id_categoria INT REFERENCES categorias(id_categoria) ON DELETE CASCADE NOT NULL,
+  id_usuario INT REFERENCES usuarios(id_usuario) ON DELETE CASCADE NOT NULL,
+  id_grupo INT REFERENCES grupos(id_grupo) ON DELETE CASCADE,
+  monto_limite DECIMAL(12,2) NOT NULL CHECK (monto_limite >= 0),
+  monto_gastado DECIMAL(12,2) NOT NULL DEFAULT 0,
+  fecha_inicio DATE NOT NULL,
+  fecha_fin DATE NOT NULL,
+  CHECK (fecha_fin >= fecha_inicio)
 );
 
+-- Índice para localizar los presupuestos afectados por un gasto
+CREATE INDEX idx_presupuestos_categoria_periodo ON presupuestos(id_categoria, fecha_inicio, fecha_fin);
+
+-- =====================================
+-- TABLA ELIMINACIONES
+-- =====================================
+CREATE TABLE eliminaciones (
+  id_eliminacion SERIAL PRIMARY KEY,
+  entidad VARCHAR(20) NOT NULL CHECK (entidad IN ('grupo','usuario')),
+  id_entidad INT NOT NULL,
+  id_solicitante INT,
+  estado VARCHAR(20) NOT NULL DEFAULT 'pendiente' CHECK (estado IN ('pendiente','en_proceso','completada','error')),
+  paso VARCHAR(50),
+  filas_eliminadas INT NOT NULL DEFAULT 0,
+  error TEXT,
+  fecha_solicitud TIMESTAMP NOT NULL DEFAULT NOW(),
+  fecha_actualizacion TIMESTAMP NOT NULL DEFAULT NOW(),
+  fecha_fin TIMESTAMP
+);
+
+-- Índice parcial: el proceso solo busca trabajos sin terminar
+CREATE INDEX idx_eliminaciones_pendientes ON eliminaciones(fecha_solicitud) WHERE estado IN ('pendiente','en_proceso');
+
 -- =====================================
 -- DATOS INICIALES - CATEGORÍAS GLOBALES
 -- =====================================
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark de concurrencia para la aceptación de invitaciones
+Requiere la API en ejecución. Mide dos escenarios:
+1. Ráfaga sobre el mismo QR: muchos usuarios aceptan el mismo token a la vez.
+   Debe haber exactamente una aceptación y ningún error 5xx.
+2. Aceptaciones independientes: cada usuario acepta su propia invitación del
+   mismo grupo a la vez. Todas deben tener éxito.
+
+Uso: python bench_accept_invitations.py [usuarios] [hilos]
+"""
+
+import requests
+import json
+import sys
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+# Configuración
+BASE_URL = "http://localhost:8000"
+API_BASE = f"{BASE_URL}/api"
+PASSWORD = "Bench123456"
+
+# Colores para la salida
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+    BOLD = '\033[1m'
+
+def print_step(step: int, message: str):
+    """Imprimir un paso del proceso"""
+    print(f"\n{Colors.BOLD}{Colors.BLUE}=== Paso {step}: {message} ==={Colors.RESET}")
+
+def print_success(message: str):
+    """Imprimir mensaje de éxito"""
+    print(f"{Colors.GREEN}✓ {message}{Colors.RESET}")
+
+def print_error(message: str):
+    """Imprimir mensaje de error"""
+    print(f"{Colors.RED}✗ {message}{Colors.RESET}")
+
+def print_info(message: str):
+    """Imprimir información"""
+    print(f"{Colors.YELLOW}ℹ {message}{Colors.RESET}")
+
+def create_user(email: str) -> Optional[str]:
+    """Registrar un usuario e iniciar sesión; devuelve el token de acceso"""
+    requests.post(f"{API_BASE}/auth/register", json={
+        "nombre": email.split("@")[0],
+        "correo": email,
+        "contrasena": PASSWORD,
+        "moneda_preferida": "COP"
+    })
+    response = requests.post(f"{API_BASE}/auth/login", data={"username": email, "password": PASSWORD})
+    if response.status_code != 200:
+        print_error(f"Error al iniciar sesión con {email}: {response.status_code}")
+        return None
+    return response.json()["access_token"]
+
+def auth(token: str) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+def create_invitations(admin_token: str, group_id: int, cantidad: int) -> List[str]:
+    """Crear invitaciones en lote y devolver sus tokens"""
+    response = requests.post(
+        f"{API_BASE}/invitations/bulk?formato=ndjson",
+        json={"id_grupo": group_id, "cantidad": cantidad},
+        headers=auth(admin_token)
+    )
+    if response.status_code != 201:
+        print_error(f"Error al crear invitaciones: {response.status_code} {response.text}")
+        return []
+    return [json.loads(line)["token"] for line in response.text.splitlines() if line]
+
+def accept(user_token: str, invitation_token: str) -> tuple:
+    """Aceptar una invitación; devuelve (código de estado, segundos)"""
+    start = time.perf_counter()
+    try:
+        response = requests.post(
+            f"{API_BASE}/invitations/accept",
+            json={"token": invitation_token},
+            headers=auth(user_token)
+        )
+        status_code = response.status_code
+    except requests.exceptions.RequestException:
+        status_code = 0
+    return status_code, time.perf_counter() - start
+
+def run_burst(pairs: List[tuple], threads: int) -> tuple:
+    """Ejecutar todas las aceptaciones a la vez y devolver (resultados, segundos)"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lambda pair: accept(*pair), pairs))
+    return results, time.perf_counter() - start
+
+def report(name: str, results: List[tuple], elapsed: float) -> Counter:
+    """Mostrar códigos de estado, rendimiento y latencias"""
+    codes = Counter(code for code, _ in results)
+    latencies = sorted(seconds for _, seconds in results)
+    p50 = latencies[len(latencies) // 2] * 1000
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+    print_info(f"{name}: {len(results)} solicitudes en {elapsed:.2f}s ({len(results) / elapsed:.1f}/s)")
+    print_info(f"Latencia p50 {p50:.0f} ms, p95 {p95:.0f} ms, máx {latencies[-1] * 1000:.0f} ms")
+    print_info(f"Códigos de estado: {dict(sorted(codes.items()))}")
+    return codes
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    run_id = uuid.uuid4().hex[:8]
+    ok = True
+
+    print_step(1, f"Preparar {users} usuarios y un grupo")
+    admin_token = create_user(f"bench_admin_{run_id}@test.com")
+    if not admin_token:
+        return
+    response = requests.post(f"{API_BASE}/groups/", json={"nombre": f"Benchmark {run_id}"}, headers=auth(admin_token))
+    group_id = response.json()["id_grupo"]
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        user_tokens = [t for t in pool.map(create_user, [f"bench_{run_id}_{i}@test.com" for i in range(users * 2)]) if t]
+    burst_users, independent_users = user_tokens[:users], user_tokens[users:]
+    print_success(f"Grupo {group_id} y {len(user_tokens)} usuarios listos")
+
+    print_step(2, "Ráfaga sobre el mismo QR")
+    shared = create_invitations(admin_token, group_id, 1)
+    results, elapsed = run_burst([(user_token, shared[0]) for user_token in burst_users], threads)
+    codes = report("Mismo token", results, elapsed)
+    if codes.get(200) == 1 and not any(code >= 500 or code == 0 for code in codes):
+        print_success("Exactamente una aceptación y ningún error del servidor")
+    else:
+        print_error("Se esperaba exactamente una aceptación (200) y el resto 400")
+        ok = False
+
+    print_step(3, "Aceptaciones independientes en el mismo grupo")
+    tokens = create_invitations(admin_token, group_id, len(independent_users))
+    results, elapsed = run_burst(list(zip(independent_users, tokens)), threads)
+    codes = report("Tokens distintos", results, elapsed)
+    if codes.get(200) == len(tokens):
+        print_success("Todas las invitaciones se aceptaron")
+    else:
+        print_error("Algunas aceptaciones fallaron")
+        ok = False
+
+    details = requests.get(f"{API_BASE}/groups/{group_id}", headers=auth(admin_token)).json()
+    expected = 1 + 1 + len(tokens)
+    if details.get("total_miembros") == expected:
+        print_success(f"Contador de miembros consistente: {expected}")
+    else:
+        print_error(f"Contador de miembros {details.get('total_miembros')}, se esperaba {expected}")
+        ok = False
+
+    print(f"\n{Colors.BOLD}{'Benchmark completado' if ok else 'Benchmark con errores'}{Colors.RESET}")
+
+if __name__ == "__main__":
+    main()
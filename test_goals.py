@@ -111,6 +111,88 @@ def get_goal_progress(token: str, goal_id: int) -> Optional[Dict]:
     except:
         return None
 
+def create_rule(token: str, goal_id: int, tipo: str, valor: float) -> Optional[Dict]:
+    url = f"{API_BASE}/contribution-rules/"
+    headers = {"Authorization": f"Bearer {token}"}
+    data = {"id_meta": goal_id, "tipo": tipo, "valor": valor}
+    try:
+        response = requests.post(url, json=data, headers=headers)
+        return response.json() if response.status_code == 201 else None
+    except:
+        return None
+
+def create_income(token: str, monto: float) -> Optional[Dict]:
+    url = f"{API_BASE}/incomes/"
+    headers = {"Authorization": f"Bearer {token}"}
+    data = {
+        "descripcion": "Salario",
+        "monto": monto,
+        "fecha": "2024-02-01",
+        "fuente": "Trabajo",
+        "id_categoria": None,
+        "id_grupo": None
+    }
+    try:
+        response = requests.post(url, json=data, headers=headers)
+        return response.json() if response.status_code == 201 else None
+    except:
+        return None
+
+def create_expense(token: str, monto: float) -> Optional[Dict]:
+    url = f"{API_BASE}/expenses/"
+    headers = {"Authorization": f"Bearer {token}"}
+    data = {
+        "descripcion": "Mercado",
+        "monto": monto,
+        "fecha": "2024-02-02",
+        "metodo_pago": "efectivo",
+        "nota": None,
+        "id_categoria": None,
+        "id_grupo": None
+    }
+    try:
+        response = requests.post(url, json=data, headers=headers)
+        return response.json() if response.status_code == 201 else None
+    except:
+        return None
+
+def delete_income(token: str, income_id: int) -> bool:
+    url = f"{API_BASE}/incomes/{income_id}"
+    headers = {"Authorization": f"Bearer {token}"}
+    try:
+        return requests.delete(url, headers=headers).status_code == 200
+    except:
+        return False
+
+def get_goal_contributions(token: str, goal_id: int) -> Optional[list]:
+    url = f"{API_BASE}/goal-contributions/goal/{goal_id}"
+    headers = {"Authorization": f"Bearer {token}"}
+    try:
+        response = requests.get(url, headers=headers)
+        return response.json() if response.status_code == 200 else None
+    except:
+        return None
+
+def check_rule_contribution(token: str, goal_id: int, source: str, source_id: int,
+                            monto: float, total_aportes: int) -> bool:
+    """Verificar el aporte generado por una regla y los totales de la meta"""
+    ok = True
+    contributions = get_goal_contributions(token, goal_id) or []
+    generated = [c for c in contributions if c.get(source) == source_id]
+    if len(generated) == 1 and float(generated[0]["monto"]) == monto:
+        print_success(f"Aporte automático generado: ${monto:,.2f} ({source} {source_id})")
+    else:
+        print_error(f"Aporte automático inesperado: {generated}")
+        ok = False
+
+    progress = get_goal_progress(token, goal_id) or {}
+    if float(progress.get("monto_acumulado", -1)) == monto and progress.get("total_aportes") == total_aportes:
+        print_success(f"Meta actualizada: acumulado ${monto:,.2f}, {total_aportes} aporte(s)")
+    else:
+        print_error(f"Totales de la meta inesperados: {progress}")
+        ok = False
+    return ok
+
 def main():
     print(f"\n{Colors.BOLD}{Colors.BLUE}{'='*60}")
     print("SCRIPT DE PRUEBAS - METAS Y APORTES")
@@ -169,6 +251,43 @@ def main():
             if contrib_group:
                 print_success(f"Aporte grupal: ${contrib_group.get('monto')}")
     
+    print_step(6, "Regla de porcentaje sobre ingresos")
+    goal_rule = create_goal(token, "Meta con Reglas", 10000000.00)
+    rule = create_rule(token, goal_rule["id_meta"], "porcentaje_ingreso", 10) if goal_rule else None
+    if not rule:
+        print_error("No se pudo crear la regla de porcentaje")
+        return
+    print_success(f"Regla creada: {rule.get('tipo')} {rule.get('valor')}% (ID: {rule.get('id_regla')})")
+    income = create_income(token, 1500000.00)
+    if not income:
+        print_error("No se pudo crear el ingreso")
+        return
+    if not check_rule_contribution(token, goal_rule["id_meta"], "id_ingreso", income["id_ingreso"], 150000.00, 1):
+        return
+
+    print_step(7, "Eliminar el ingreso revierte su aporte automático")
+    if delete_income(token, income["id_ingreso"]):
+        progress = get_goal_progress(token, goal_rule["id_meta"]) or {}
+        if float(progress.get("monto_acumulado", -1)) == 0 and progress.get("total_aportes") == 0:
+            print_success("Aporte automático revertido")
+        else:
+            print_error(f"El aporte no se revirtió: {progress}")
+            return
+
+    print_step(8, "Regla de redondeo sobre gastos")
+    goal_round = create_goal(token, "Meta Redondeo", 1000000.00)
+    rule = create_rule(token, goal_round["id_meta"], "redondeo_gasto", 1000) if goal_round else None
+    if not rule:
+        print_error("No se pudo crear la regla de redondeo")
+        return
+    print_success(f"Regla creada: {rule.get('tipo')} a múltiplos de {rule.get('valor')} (ID: {rule.get('id_regla')})")
+    expense = create_expense(token, 23450.00)
+    if not expense:
+        print_error("No se pudo crear el gasto")
+        return
+    if not check_rule_contribution(token, goal_round["id_meta"], "id_gasto", expense["id_gasto"], 550.00, 1):
+        return
+    
     print(f"\n{Colors.BOLD}{Colors.GREEN}{'='*60}")
     print("PRUEBAS COMPLETADAS EXITOSAMENTE")
     print(f"{'='*60}{Colors.RESET}\n")